@@ -1,9 +1,14 @@
+"""Print the identifier and first cell of a few timetable pages
+Usage: python analyze_structure.py [pdf_path]
+"""
+import sys
 import pdfplumber
-import re
 
-pdf = pdfplumber.open(r'D:\shivansh Programming\KISKIBREAKKAB\B3 3rd year roomwise_5th Jan.pdf')
+from tt_page_index import page_label
 
-pages_to_check = [0, 1, 2, 12, 13, 20]
+pdf = pdfplumber.open(sys.argv[1] if len(sys.argv) > 1 else 'B3 3rd year roomwise_5th Jan.pdf')
+
+pages_to_check = [i for i in [0, 1, 2, 12, 13, 20] if i < len(pdf.pages)]
 
 print('Analyzing timetable structure:\n')
 print('='*80)
@@ -13,12 +18,7 @@ for i in pages_to_check:
     text = page.extract_text()
     
     # Find the identifier (room/section number)
-    lines = text.split('\n')
-    identifier = None
-    for line in lines[:10]:
-        if re.match(r'^\d{3}$', line.strip()) or re.match(r'^[A-Z]+-\d+$', line.strip()):
-            identifier = line.strip()
-            break
+    identifier = page_label(text)
     
     # Get first cell content
     tables = page.extract_tables()
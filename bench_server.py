@@ -0,0 +1,139 @@
+"""
+Load test for the HTTP query service
+Starts tt_server.py in a subprocess, then drives it from many concurrent
+keep-alive connections with a mix of vacancy, schedule and full-week
+matrix queries, and reports latency percentiles and throughput.
+Usage: python bench_server.py [timetable_path] [connections] [requests_per_connection]
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import subprocess
+from urllib.parse import quote
+
+
+DEFAULT_SOURCE = "timetable_data.json"
+HOST = "127.0.0.1"
+
+
+def free_port():
+    """An unused local TCP port"""
+    with socket.socket() as s:
+        s.bind((HOST, 0))
+        return s.getsockname()[1]
+
+
+async def request(reader, writer, path):
+    """Send one GET on an open connection; return (status, body)"""
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {HOST}\r\n\r\n".encode("latin-1"))
+    await writer.drain()
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+    status = int(head.split(" ", 2)[1])
+    length = 0
+    for line in head.split("\r\n")[1:]:
+        name, _, value = line.partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def wait_ready(port, timeout):
+    """Poll /health until the timetable is loaded"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            reader, writer = await asyncio.open_connection(HOST, port)
+            _, body = await request(reader, writer, "/health")
+            writer.close()
+            health = json.loads(body)
+            if health["status"] == "ok":
+                return health
+            if health["status"] == "error":
+                raise RuntimeError("server failed to load the timetable")
+        except OSError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("server did not become ready in time")
+
+
+async def client(port, paths, latencies, errors):
+    """One keep-alive connection issuing its requests back to back"""
+    reader, writer = await asyncio.open_connection(HOST, port)
+    for path in paths:
+        start = time.perf_counter()
+        status, _ = await request(reader, writer, path)
+        latencies.append(time.perf_counter() - start)
+        if status != 200:
+            errors.append((path, status))
+    writer.close()
+
+
+async def run_load(port, connections, per_connection):
+    health = await wait_ready(port, timeout=300)
+    
+    reader, writer = await asyncio.open_connection(HOST, port)
+    _, body = await request(reader, writer, "/rooms")
+    writer.close()
+    rooms = json.loads(body)["rooms"]
+    
+    # Mix of the query endpoints
+    paths = []
+    for i in range(per_connection):
+        kind = i % 4
+        if kind == 0:
+            paths.append(f"/vacant?day={['Mo', 'Tu', 'We', 'Th', 'Fr'][i % 5]}&slot={i % 8 + 1}")
+        elif kind == 1:
+            paths.append("/vacant/now")
+        elif kind == 2:
+            paths.append(f"/rooms/{quote(rooms[i % len(rooms)])}/schedule")
+        else:
+            paths.append("/vacancy-matrix")
+    
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, paths, latencies, errors) for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+    return health, latencies, errors, elapsed
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_SOURCE
+    connections = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    per_connection = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "tt_server.py", source, str(port), HOST],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        health, latencies, errors, elapsed = asyncio.run(
+            run_load(port, connections, per_connection))
+    finally:
+        server.terminate()
+        server.wait()
+    
+    print(f"\n{'='*60}")
+    print("QUERY SERVICE LOAD TEST")
+    print(f"{'='*60}")
+    print(f"  Source:        {source} ({health['rooms']} rooms)")
+    print(f"  Connections:   {connections}")
+    print(f"  Requests:      {len(latencies)} ({len(errors)} errors)")
+    print(f"  p50 latency:   {percentile(latencies, 0.50) * 1000:8.2f} ms")
+    print(f"  p99 latency:   {percentile(latencies, 0.99) * 1000:8.2f} ms")
+    print(f"  Throughput:    {len(latencies) / elapsed:8.0f} req/s")
+    print(f"{'='*60}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Startup benchmark for query-only processes
+Runs `python -X importtime` in fresh interpreters to measure what importing
+tt_parser costs, and times a complete short-lived query process that loads
+timetable_data.json through TimetableParser.from_json.
+Usage: python bench_startup.py [json_path] [runs]
+"""
+
+import os
+import sys
+import time
+import subprocess
+
+
+DEFAULT_JSON = "timetable_data.json"
+
+
+def import_times(statement):
+    """Run a statement under -X importtime; return {module: cumulative us}"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        # "import time:      self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+def wall_time(statement, runs):
+    """Best wall-clock time of a fresh interpreter running a statement"""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], check=True,
+                       stdout=subprocess.DEVNULL,
+                       cwd=os.path.dirname(os.path.abspath(__file__)))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    json_path = os.path.abspath(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_JSON)
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    
+    parser_imports = import_times("import tt_parser")
+    plumber_imports = import_times("import pdfplumber")
+    
+    query = ("from tt_parser import TimetableParser; "
+             f"p = TimetableParser.from_json({json_path!r}); "
+             "print(p.find_vacant_rooms('Mo', 3))")
+    query_eager = "import pdfplumber; " + query
+    
+    print(f"\n{'='*60}")
+    print("STARTUP BENCHMARK")
+    print(f"{'='*60}")
+    print(f"  import tt_parser:             {parser_imports['tt_parser'] / 1000:8.1f} ms")
+    print(f"  pdfplumber imported:          {'yes' if 'pdfplumber' in parser_imports else 'no':>8}")
+    print(f"  import pdfplumber (avoided):  {plumber_imports['pdfplumber'] / 1000:8.1f} ms")
+    print(f"  query process, lazy import:   {wall_time(query, runs) * 1000:8.1f} ms")
+    print(f"  query process, eager import:  {wall_time(query_eager, runs) * 1000:8.1f} ms")
+    print(f"{'='*60}")
+    
+    print("\nHeaviest imports when loading tt_parser (cumulative):")
+    heaviest = sorted(parser_imports.items(), key=lambda item: -item[1])[:10]
+    for module, cumulative in heaviest:
+        print(f"  {cumulative / 1000:8.1f} ms  {module}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Peak memory benchmark for the streaming page pipeline
+Parses each PDF in a fresh process, once holding every page the way the
+old parse_pdf loop did and once through iter_page_occupancy, and reports
+the peak RSS of both. Pass PDFs of growing page count to see how memory
+scales.
+Usage: python bench_streaming.py [pdf_path ...]
+"""
+
+import sys
+import json
+import time
+import resource
+import subprocess
+
+
+DEFAULT_PDF = "B3 3rd year roomwise_5th Jan.pdf"
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_mode(mode, pdf_path):
+    """Parse one PDF in the given mode and print stats as JSON"""
+    start = time.perf_counter()
+    pages = 0
+    
+    if mode == "all-pages":
+        import pdfplumber
+        from tt_parser import _table_records
+        
+        # The pre-streaming loop: every visited page keeps its parsed objects
+        with pdfplumber.open(pdf_path) as pdf:
+            for page in pdf.pages:
+                tables = page.extract_tables()
+                if tables:
+                    _table_records(tables[0])
+                pages += 1
+    else:
+        from tt_parser import iter_page_occupancy
+        
+        for _ in iter_page_occupancy(pdf_path):
+            pages += 1
+    
+    print(json.dumps({
+        "mode": mode,
+        "pages": pages,
+        "seconds": round(time.perf_counter() - start, 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }))
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--run":
+        run_mode(sys.argv[2], sys.argv[3])
+        return
+    
+    pdf_paths = sys.argv[1:] or [DEFAULT_PDF]
+    
+    print(f"\n{'='*60}")
+    print("STREAMING PARSE MEMORY BENCHMARK")
+    print(f"{'='*60}")
+    print(f"{'Mode':12} {'Pages':>6} {'Seconds':>9} {'Peak RSS (MB)':>15}  PDF")
+    
+    for pdf_path in pdf_paths:
+        for mode in ("all-pages", "streaming"):
+            # A fresh process per run so peaks do not carry over
+            output = subprocess.run(
+                [sys.executable, __file__, "--run", mode, pdf_path],
+                capture_output=True, text=True, check=True,
+            ).stdout
+            stats = json.loads(output.strip().splitlines()[-1])
+            print(f"{stats['mode']:12} {stats['pages']:>6} {stats['seconds']:>9} "
+                  f"{stats['peak_rss_mb']:>15}  {pdf_path}")
+    
+    print(f"{'='*60}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""
+Offline benchmark suite for parsing and querying
+Times, on the bundled PDF or a synthetic one from tt_synth.py:
+  - parse_pdf end to end, and per page through iter_page_occupancy
+  - the same with fast=True (tt_geometry's template extraction), checking
+    that it yields exactly the records of the extract_tables path
+  - pdfplumber's extract_tables on a sample of pages
+  - extract_room_from_cell throughput, uncached and memoized
+  - find_vacant_rooms and get_room_occupancy latency
+Results are written as JSON (with the git commit, Python version and input
+PDF) so runs can be compared over time; --compare prints the change against
+an earlier results file.
+Usage: python bench_suite.py [pdf_path] [--scale 10] [--output results.json] [--compare old.json]
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import hashlib
+import platform
+import argparse
+import tempfile
+import subprocess
+import statistics
+from contextlib import redirect_stdout
+
+from tt_parser import TimetableParser, DAYS, TIME_SLOTS, iter_page_occupancy, tokenize_cell, _open_pdf
+from tt_synth import REFERENCE_PAGES, write_timetable_pdf
+from tt_metrics import RecordingMetrics
+from tt_geometry import iter_page_occupancy_fast
+
+
+DEFAULT_PDF = "B3 3rd year roomwise_5th Jan.pdf"
+
+# Pages used for the extract_tables and tokenizer measurements
+SAMPLE_PAGES = 20
+
+
+def _stats_ms(seconds):
+    """Summary of a list of durations, in milliseconds"""
+    ordered = sorted(seconds)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 4),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 4),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] * 1000, 4),
+        "max_ms": round(ordered[-1] * 1000, 4),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_parse(pdf_path, workers):
+    """End-to-end parse_pdf time, per-page extraction times and the stage breakdown"""
+    parser = TimetableParser()
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        parser.parse_pdf(pdf_path, workers=workers)
+    total = time.perf_counter() - start
+    
+    metrics = RecordingMetrics(outliers=5)
+    page_times = []
+    start = time.perf_counter()
+    for _ in iter_page_occupancy(pdf_path, metrics=metrics):
+        now = time.perf_counter()
+        page_times.append(now - start)
+        start = now
+    
+    summary = metrics.summary()
+    return parser, {
+        "workers": workers,
+        "seconds": round(total, 3),
+        "pages": len(page_times),
+        "pages_per_second": round(len(page_times) / total, 2) if total else None,
+        "per_page": _stats_ms(page_times),
+        "stages": {name: stage["seconds"] for name, stage in summary["stages"].items()},
+        "slowest_pages": summary["pages"]["slowest"],
+    }
+
+
+def bench_parse_fast(pdf_path, workers, parser, parse):
+    """bench_parse with template extraction, compared against the extract_tables parse"""
+    fast_parser = TimetableParser()
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        fast_parser.parse_pdf(pdf_path, workers=workers, fast=True)
+    total = time.perf_counter() - start
+    
+    metrics = RecordingMetrics(outliers=5)
+    page_times = []
+    start = time.perf_counter()
+    for _ in iter_page_occupancy_fast(pdf_path, metrics=metrics):
+        now = time.perf_counter()
+        page_times.append(now - start)
+        start = now
+    
+    mismatched = [key for key, records in parser.page_records.items()
+                  if fast_parser.page_records.get(key) != records]
+    summary = metrics.summary()
+    return {
+        "workers": workers,
+        "seconds": round(total, 3),
+        "speedup": round(parse["seconds"] / total, 2) if total else None,
+        "pages_per_second": round(len(page_times) / total, 2) if total else None,
+        "per_page": _stats_ms(page_times),
+        "template_fallbacks": summary["counters"].get("template_fallbacks", 0),
+        "mismatched_pages": len(mismatched),
+        "stages": {name: stage["seconds"] for name, stage in summary["stages"].items()},
+    }
+
+
+def bench_extract_tables(pdf_path):
+    """pdfplumber table extraction alone, on the first SAMPLE_PAGES pages"""
+    times, cells = [], []
+    with _open_pdf(pdf_path) as pdf:
+        for page in pdf.pages[:SAMPLE_PAGES]:
+            start = time.perf_counter()
+            tables = page.extract_tables()
+            times.append(time.perf_counter() - start)
+            if tables:
+                cells.extend(str(cell) if cell else "" for row in tables[0][1:] for cell in row[1:])
+            page.close()
+    return {"per_page": _stats_ms(times)}, cells
+
+
+def bench_tokenizer(parser, cells, repeat=20):
+    """extract_room_from_cell throughput over real cell texts"""
+    uncached = tokenize_cell.__wrapped__
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for cell in cells:
+            uncached(cell)
+    uncached_seconds = time.perf_counter() - start
+    
+    tokenize_cell.cache_clear()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for cell in cells:
+            parser.extract_room_from_cell(cell)
+    cached_seconds = time.perf_counter() - start
+    
+    calls = repeat * len(cells)
+    return {
+        "cells": len(cells),
+        "distinct_cells": len(set(cells)),
+        "uncached_cells_per_second": round(calls / uncached_seconds) if uncached_seconds else None,
+        "cached_cells_per_second": round(calls / cached_seconds) if cached_seconds else None,
+    }
+
+
+def bench_queries(parser, repeat=200):
+    """Latency of find_vacant_rooms (cold and warm) and get_room_occupancy"""
+    cells = [(day, slot) for day in DAYS for slot in TIME_SLOTS]
+    
+    # Cold: the first query after a parse builds the derived indexes
+    cold = []
+    for _ in range(20):
+        parser.invalidate_index()
+        start = time.perf_counter()
+        parser.find_vacant_rooms(*cells[0])
+        cold.append(time.perf_counter() - start)
+    
+    warm = []
+    for _ in range(repeat):
+        for day, slot in cells:
+            start = time.perf_counter()
+            parser.find_vacant_rooms(day, slot)
+            warm.append(time.perf_counter() - start)
+    
+    rooms = sorted(parser.all_rooms)
+    occupancy = []
+    for _ in range(max(1, repeat // 20)):
+        for room in rooms:
+            start = time.perf_counter()
+            parser.get_room_occupancy(room)
+            occupancy.append(time.perf_counter() - start)
+    
+    return {
+        "find_vacant_rooms_cold": _stats_ms(cold),
+        "find_vacant_rooms": _stats_ms(warm),
+        "get_room_occupancy": _stats_ms(occupancy),
+    }
+
+
+def _flatten(results, prefix=""):
+    """{"a": {"b": 1}} -> {"a.b": 1} for numeric leaves"""
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def print_comparison(old, new):
+    """Relative change of every shared numeric result"""
+    old_flat, new_flat = _flatten(old["results"]), _flatten(new["results"])
+    print(f"\nChange vs {old.get('commit') or '?'} ({old.get('timestamp', '?')}):")
+    for key in sorted(set(old_flat) & set(new_flat)):
+        before, after = old_flat[key], new_flat[key]
+        change = f"{(after - before) / before * 100:+7.1f}%" if before else "    n/a"
+        print(f"  {key:50} {before:>12} -> {after:>12}  {change}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Parsing and query benchmark suite")
+    arg_parser.add_argument("pdf", nargs="?", default=DEFAULT_PDF,
+                            help="timetable PDF (ignored with --scale)")
+    arg_parser.add_argument("--scale", type=float,
+                            help=f"benchmark a synthetic PDF of scale x {REFERENCE_PAGES} pages instead")
+    arg_parser.add_argument("--seed", type=int, default=0, help="seed for the synthetic PDF")
+    arg_parser.add_argument("--workers", type=int, default=1, help="parse_pdf worker processes")
+    arg_parser.add_argument("--output", help="write JSON results to this file")
+    arg_parser.add_argument("--compare", help="earlier JSON results to compare against")
+    args = arg_parser.parse_args()
+    
+    pdf_path = args.pdf
+    tmp_dir = None
+    if args.scale:
+        tmp_dir = tempfile.TemporaryDirectory()
+        pdf_path = os.path.join(tmp_dir.name, f"synthetic_x{args.scale:g}.pdf")
+        print(f"[INFO] Generating synthetic PDF ({args.scale:g}x)...")
+        write_timetable_pdf(pdf_path, max(1, round(REFERENCE_PAGES * args.scale)), args.seed)
+    
+    try:
+        with open(pdf_path, "rb") as f:
+            pdf_sha = hashlib.sha256(f.read()).hexdigest()
+        
+        print("[INFO] Timing parse_pdf...")
+        parser, parse = bench_parse(pdf_path, args.workers)
+        print("[INFO] Timing parse_pdf(fast=True)...")
+        parse_fast = bench_parse_fast(pdf_path, args.workers, parser, parse)
+        print("[INFO] Timing extract_tables...")
+        extract, cells = bench_extract_tables(pdf_path)
+        print("[INFO] Timing the cell tokenizer...")
+        tokenizer = bench_tokenizer(parser, cells)
+        print("[INFO] Timing queries...")
+        queries = bench_queries(parser)
+    finally:
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+    
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pdf": {
+            "path": os.path.basename(pdf_path),
+            "synthetic_scale": args.scale,
+            "seed": args.seed if args.scale else None,
+            "sha256": pdf_sha,
+            "rooms": len(parser.all_rooms),
+        },
+        "results": {
+            "parse_pdf": parse,
+            "parse_pdf_fast": parse_fast,
+            "extract_tables": extract,
+            "extract_room_from_cell": tokenizer,
+            "queries": queries,
+        },
+    }
+    
+    print(f"\n{'='*60}")
+    print("BENCHMARK SUITE")
+    print(f"{'='*60}")
+    print(f"  PDF:                      {report['pdf']['path']} ({parse['pages']} pages, "
+          f"{len(parser.all_rooms)} rooms)")
+    print(f"  parse_pdf:                {parse['seconds']:10.2f} s ({parse['pages_per_second']} pages/s)")
+    print(f"  page extraction p50/p95:  {parse['per_page']['p50_ms']:10.1f} / "
+          f"{parse['per_page']['p95_ms']:.1f} ms")
+    for name, seconds in parse["stages"].items():
+        print(f"    {name:22}  {seconds:10.3f} s")
+    print(f"  parse_pdf(fast=True):     {parse_fast['seconds']:10.2f} s ({parse_fast['speedup']}x, "
+          f"{parse_fast['template_fallbacks']} fallback page(s), "
+          f"{parse_fast['mismatched_pages']} mismatched)")
+    print(f"  fast page p50/p95:        {parse_fast['per_page']['p50_ms']:10.1f} / "
+          f"{parse_fast['per_page']['p95_ms']:.1f} ms")
+    print(f"  extract_tables p50:       {extract['per_page']['p50_ms']:10.1f} ms")
+    print(f"  tokenizer (uncached):     {tokenizer['uncached_cells_per_second']:10} cells/s")
+    print(f"  tokenizer (memoized):     {tokenizer['cached_cells_per_second']:10} cells/s")
+    print(f"  find_vacant_rooms p50:    {queries['find_vacant_rooms']['p50_ms'] * 1000:10.1f} us")
+    print(f"  find_vacant_rooms cold:   {queries['find_vacant_rooms_cold']['p50_ms']:10.2f} ms")
+    print(f"  get_room_occupancy p50:   {queries['get_room_occupancy']['p50_ms'] * 1000:10.1f} us")
+    print(f"{'='*60}")
+    
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            print_comparison(json.load(f), report)
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n[OK] Results written to {args.output}")
+    else:
+        print(json.dumps(report))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
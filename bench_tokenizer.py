@@ -0,0 +1,99 @@
+"""
+Micro-benchmark for timetable cell tokenizing
+Compares the original multi-regex room extraction with tt_parser.tokenize_cell
+on every cell of the bundled PDF.
+Usage: python bench_tokenizer.py [pdf_path] [rounds]
+"""
+
+import re
+import sys
+import time
+import pdfplumber
+from tt_parser import tokenize_cell
+
+
+DEFAULT_PDF = "B3 3rd year roomwise_5th Jan.pdf"
+
+
+def legacy_extract_room(cell_text):
+    """Room extraction as it was before the single-pass tokenizer"""
+    if not cell_text or cell_text.strip() in ["", "None"]:
+        return None
+    
+    room_patterns = [
+        r'\b([A-Z]{2,3}-\d+)\b',
+        r'\b([A-Z]-\d{3,4})\b',
+        r'(?<!\d)(\d{3})(?!\d)',
+    ]
+    
+    for pattern in room_patterns:
+        match = re.search(pattern, cell_text)
+        if match:
+            room = match.group(1)
+            if not re.search(r'(18|19|20)\d{2,3}|[Ee]\d{4,5}', room):
+                return room
+    
+    return None
+
+
+def load_cells(pdf_path):
+    """Collect the raw text of every timetable cell in the PDF"""
+    cells = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages:
+            tables = page.extract_tables()
+            if not tables:
+                continue
+            for row in tables[0][1:]:
+                for cell in row[1:9]:
+                    cells.append(str(cell) if cell else "")
+    return cells
+
+
+def time_cells(func, cells, rounds):
+    """Best cells-per-second over several rounds"""
+    best = 0.0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for cell in cells:
+            func(cell)
+        elapsed = time.perf_counter() - start
+        best = max(best, len(cells) / elapsed)
+    return best
+
+
+def main():
+    pdf_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PDF
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    
+    print(f"[INFO] Loading cells from {pdf_path}...")
+    cells = load_cells(pdf_path)
+    print(f"  {len(cells)} cells, {len(set(cells))} distinct")
+    
+    mismatches = sum(1 for cell in cells if legacy_extract_room(cell) != tokenize_cell(cell).room)
+    
+    legacy = time_cells(legacy_extract_room, cells, rounds)
+    
+    # Uncached: every cell scanned; one pass: a single parse starting from an
+    # empty cache; memoized: a re-parse where every cell text was seen before
+    cold = time_cells(tokenize_cell.__wrapped__, cells, rounds)
+    tokenize_cell.cache_clear()
+    one_pass = time_cells(tokenize_cell, cells, 1)
+    warm = time_cells(tokenize_cell, cells, rounds)
+    
+    print(f"\n{'='*60}")
+    print(f"CELL TOKENIZER BENCHMARK (cells/second, best of {rounds})")
+    print(f"{'='*60}")
+    # Headline: one parse from an empty cache, against the old room-only
+    # regexes; the uncached scan also extracts section and subject
+    print(f"  Legacy regexes (room only): {legacy:12,.0f}")
+    print(f"  Tokenizer, cold parse:      {one_pass:12,.0f}  ({one_pass / legacy:.1f}x)")
+    print(f"  Tokenizer, no cache:        {cold:12,.0f}  ({cold / legacy:.1f}x)")
+    print(f"  Room mismatches:            {mismatches:12}")
+    print(f"{'='*60}")
+    # Only re-parses of already seen cell texts get this; the gain is the
+    # lru_cache, not the scanner
+    print(f"  Memoized re-parse:          {warm:12,.0f}  ({warm / legacy:.1f}x, cache hits only)")
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,14 @@
-"""Debug script to inspect PDF table structure"""
+"""Debug script to inspect PDF table structure
+Usage: python debug_pdf.py [pdf_path]
+"""
+import sys
 import pdfplumber
 
-pdf_path = r"D:\shivansh Programming\KISKIBREAKKAB\B3 3rd year roomwise_5th Jan.pdf"
+pdf_path = sys.argv[1] if len(sys.argv) > 1 else "B3 3rd year roomwise_5th Jan.pdf"
 
 with pdfplumber.open(pdf_path) as pdf:
     # Check first page (Room 104 from the image)
-    for page_num in [1, 2]:  # Check first 2 pages
+    for page_num in [1, 2][:len(pdf.pages)]:  # Check first 2 pages
         page = pdf.pages[page_num - 1]
         print(f"\n{'='*80}")
         print(f"PAGE {page_num}")
@@ -1,10 +1,36 @@
 """
 CLI Tool to query vacant rooms from parsed timetable data
-Usage: python query_rooms.py
+Usage: python query_rooms.py                     (interactive menu)
+       python query_rooms.py [--data timetable_data.snap] [--calendar calendar.json]
+                             ["vacant Mo 3" ...] [< queries.txt]
+
+Batch mode (any argument, or queries piped in) answers one query per
+argument or stdin line and prints one JSON object per line:
+    vacant Mo 3              vacant rooms in a slot
+    window Mo 3 5            rooms vacant for slots 3 to 5
+    date 2026-10-20 3        vacant rooms in a slot on a date
+    now [2026-10-20T11:30]   vacant rooms right now (or at a time)
+    schedule S-606           a room's weekly schedule
+    rooms                    every known room
+The exit status is 1 if any query failed and 2 if the timetable or the
+calendar could not be loaded.
 """
 
-from tt_parser import TimetableParser, TIME_SLOTS, DAYS
-from datetime import datetime
+import os
+import sys
+import json
+import argparse
+from contextlib import redirect_stdout
+from typing import Dict, Iterable, List
+
+from tt_parser import TimetableParser, TIME_SLOTS, DAYS, SLOT_CLOCK
+from tt_cache import ParseCache
+from tt_metrics import RecordingMetrics
+from tt_reload import ReloadManager
+from datetime import date, datetime
+
+# Batch mode data: the snapshot if there is one, else the JSON export
+DEFAULT_DATA_FILES = ["timetable_data.snap", "timetable_data.json"]
 
 
 def display_menu():
@@ -24,31 +50,24 @@ def display_menu():
 def find_rooms_now(parser):
     """Find and display vacant rooms right now"""
     now = datetime.now()
-    day_names = ["Mo", "Tu", "We", "Th", "Fr", "Sa", "Su"]
     
     if now.weekday() >= 5:
         print("\n[INFO] It's the weekend! All rooms are vacant.")
         print(f"Total rooms: {len(parser.all_rooms)}")
         return
     
-    day = DAYS[now.weekday()]
-    current_time = now.time()
-    
-    # Find current slot
-    current_slot = None
-    for slot_num, slot in TIME_SLOTS.items():
-        start = datetime.strptime(slot.start_time, "%H:%M").time()
-        end = datetime.strptime(slot.end_time, "%H:%M").time()
-        
-        if start <= current_time < end:
-            current_slot = slot_num
-            break
+    target = SLOT_CLOCK.slot_for_vacancy(now)
     
-    if current_slot is None:
+    if target is None:
         print("\n[INFO] Outside class hours. All rooms are vacant.")
         print(f"Total rooms: {len(parser.all_rooms)}")
         return
     
+    day, current_slot = target
+    if SLOT_CLOCK.slot_at(now) is None:
+        print(f"\n[INFO] Break until {TIME_SLOTS[current_slot].start_time}, "
+              f"showing the next slot.")
+    
     parser.print_vacancy_report(day, current_slot)
 
 
@@ -106,15 +125,19 @@ def view_room_schedule(parser):
     print(f"{'='*60}\n")
     
     for day in DAYS:
-        day_schedule = [s for s in schedule if s.day == day]
+        day_schedule = schedule.get(day)
         if day_schedule:
             print(f"\n{day} (Monday to Friday)[{['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday'][DAYS.index(day)]}]:")
             for slot_num in range(1, 9):
-                slot_entry = next((s for s in day_schedule if s.slot_number == slot_num), None)
+                entries = day_schedule.get(slot_num)
                 time_slot = TIME_SLOTS[slot_num]
                 
-                if slot_entry and not slot_entry.is_vacant:
-                    status = f"OCCUPIED - {slot_entry.subject_code}"
+                if entries:
+                    classes = ", ".join(
+                        f"{subject or '?'} ({section})" if section else (subject or "?")
+                        for section, subject in entries
+                    )
+                    status = f"OCCUPIED - {classes}"
                 else:
                     status = "VACANT"
                 
@@ -135,19 +158,164 @@ def list_all_rooms(parser):
     print("\n")
 
 
+def _slot_number(value: str) -> int:
+    if not value.isdigit():
+        raise ValueError(f"Invalid slot number '{value}'")
+    return int(value)
+
+
+def _expect(args: List[str], count: int, usage: str):
+    if len(args) != count:
+        raise ValueError(f"Usage: {usage}")
+
+
+def run_query(parser: TimetableParser, query: str) -> Dict:
+    """Answer one batch query; raises ValueError for a malformed query"""
+    command, _, rest = query.strip().partition(" ")
+    args = rest.split()
+    
+    if command == "vacant":
+        _expect(args, 2, "vacant <day> <slot>")
+        day, slot = args[0], _slot_number(args[1])
+        return {"day": day, "slot": slot, "vacant_rooms": parser.find_vacant_rooms(day, slot)}
+    
+    if command == "window":
+        _expect(args, 3, "window <day> <start_slot> <end_slot>")
+        day, start, end = args[0], _slot_number(args[1]), _slot_number(args[2])
+        return {"day": day, "start_slot": start, "end_slot": end,
+                "vacant_rooms": parser.find_vacant_rooms_range(day, start, end)}
+    
+    if command == "date":
+        _expect(args, 2, "date <YYYY-MM-DD> <slot>")
+        on, slot = date.fromisoformat(args[0]), _slot_number(args[1])
+        return {"date": on.isoformat(), "day": parser.calendar.grid_day(on), "slot": slot,
+                "vacant_rooms": parser.find_vacant_rooms_on(on, slot)}
+    
+    if command == "now":
+        if len(args) > 1:
+            raise ValueError("Usage: now [YYYY-MM-DDTHH:MM]")
+        now = datetime.fromisoformat(args[0]) if args else datetime.now()
+        target = parser.get_vacancy_slot(now)
+        return {"at": now.isoformat(timespec="minutes"), "day": target and target[0],
+                "slot": target and target[1], "vacant_rooms": parser.find_vacant_rooms_now(now)}
+    
+    if command == "schedule":
+        # Room names may contain spaces, e.g. "201(Apple lab)"
+        room = rest.strip()
+        if room not in parser.all_rooms:
+            raise ValueError(f"Room '{room}' not found")
+        schedule = {
+            day: {str(slot): [{"section": section, "subject": subject}
+                              for section, subject in entries]
+                  for slot, entries in slots.items()}
+            for day, slots in parser.get_room_schedule(room).items()
+        }
+        return {"room": room, "schedule": schedule}
+    
+    if command == "rooms":
+        return {"rooms": sorted(parser.all_rooms)}
+    
+    raise ValueError(f"Unknown query '{command}'")
+
+
+def run_batch(parser: TimetableParser, queries: Iterable[str], out=None) -> int:
+    """
+    Answer queries in order, writing one JSON line per query as soon as it
+    is answered. Blank lines and lines starting with # are skipped.
+    
+    Returns:
+        Number of queries that failed
+    """
+    out = out or sys.stdout
+    failed = 0
+    for query in queries:
+        query = query.strip()
+        if not query or query.startswith("#"):
+            continue
+        try:
+            result = dict(query=query, **run_query(parser, query))
+        except ValueError as e:
+            failed += 1
+            result = {"query": query, "error": str(e)}
+        out.write(json.dumps(result) + "\n")
+        out.flush()
+    return failed
+
+
+def _load_failed(path: str, error: Exception) -> int:
+    reason = f"missing key {error}" if isinstance(error, KeyError) else str(error)
+    print(f"[ERROR] Could not load {path}: {reason}", file=sys.stderr)
+    return 2
+
+
+def batch_main(argv: List[str]) -> int:
+    """Non-interactive mode: queries from argv or stdin, JSON lines out"""
+    arg_parser = argparse.ArgumentParser(
+        description="Answer vacancy queries as JSON lines (see the module docstring)")
+    arg_parser.add_argument("queries", nargs="*",
+                            help='queries such as "vacant Mo 3"; read from stdin if none are given')
+    arg_parser.add_argument("--data", help="timetable to load: .snap, .json, PDF or folder "
+                                           "(default: timetable_data.snap or timetable_data.json)")
+    arg_parser.add_argument("--calendar", help="holiday/exception calendar (see tt_calendar)")
+    args = arg_parser.parse_args(argv)
+    
+    data = args.data or next((path for path in DEFAULT_DATA_FILES if os.path.exists(path)),
+                             DEFAULT_DATA_FILES[-1])
+    # The parse methods report errors instead of raising; the errors
+    # counter tells a failed parse from an empty timetable
+    metrics = RecordingMetrics()
+    try:
+        # Progress messages would break the JSON stream on stdout
+        with redirect_stdout(sys.stderr):
+            parser = TimetableParser.from_file(data, cache=ParseCache(), metrics=metrics)
+    except (OSError, ValueError, KeyError) as e:
+        return _load_failed(data, e)
+    if metrics.counters.get("errors"):
+        print(f"[ERROR] Could not parse the timetable PDF(s) at {data}", file=sys.stderr)
+        return 2
+    if not parser.all_rooms:
+        # e.g. a folder without PDFs; every answer would be an empty list
+        print(f"[ERROR] No rooms found in {data}", file=sys.stderr)
+        return 2
+    
+    if args.calendar:
+        try:
+            parser.load_calendar(args.calendar)
+            # Compile now, so a bad entry fails here rather than in every date query
+            parser.calendar
+        except (OSError, ValueError, KeyError) as e:
+            return _load_failed(args.calendar, e)
+    
+    failed = run_batch(parser, args.queries or sys.stdin)
+    return 1 if failed else 0
+
+
 def main():
     """Main CLI loop"""
-    parser = TimetableParser()
+    if len(sys.argv) > 1 or not sys.stdin.isatty():
+        return batch_main(sys.argv[1:])
+    
     pdf_path = r"D:\shivansh Programming\KISKIBREAKKAB\B3 3rd year roomwise_5th Jan.pdf"
+    # Unchanged PDFs are loaded from the cache instead of being re-parsed
+    cache = ParseCache()
+    # Watches the PDF and swaps in new editions in the background
+    reloader = ReloadManager(pdf_path, cache=cache)
     
     print("\n[INFO] Loading timetable data...")
-    parser.parse_pdf(pdf_path)
+    try:
+        reloader.load()
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        return
+    reloader.start()
     
     while True:
         display_menu()
         
         try:
             choice = input("\nEnter your choice (1-6): ").strip()
+            # The newest parsed edition; each command uses one consistent parser
+            parser = reloader.parser
             
             if choice == "1":
                 find_rooms_now(parser)
@@ -158,9 +326,10 @@ def main():
             elif choice == "4":
                 list_all_rooms(parser)
             elif choice == "5":
-                print("\n[INFO] Re-parsing PDF...")
-                parser = TimetableParser()
-                parser.parse_pdf(pdf_path)
+                # Only pages that changed are re-extracted, in the background;
+                # queries keep using the current edition until it is ready
+                print("\n[INFO] Checking the PDF for changes in the background...")
+                reloader.request_check()
             elif choice == "6":
                 print("\n[INFO] Goodbye!")
                 break
@@ -172,7 +341,9 @@ def main():
             break
         except Exception as e:
             print(f"\n[ERROR] An error occurred: {str(e)}")
+    
+    reloader.stop()
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
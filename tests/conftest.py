@@ -0,0 +1,20 @@
+"""Shared helpers for the parser tests"""
+
+import os
+import sys
+
+# The tt_* modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tt_parser import CellRecord, TimetableParser, _source_name
+
+
+def cell(section, day, slot, room, subject="SUB"):
+    return CellRecord(section, day, slot, room, subject)
+
+
+def parser_with(records, source="timetable.pdf"):
+    """A parser holding the given records as one page of one source PDF"""
+    parser = TimetableParser()
+    parser._set_page((_source_name(source), 1), "page-1", list(records))
+    return parser
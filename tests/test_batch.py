@@ -0,0 +1,62 @@
+"""Batch mode of query_rooms: queries in, JSON lines out"""
+
+import io
+import json
+
+import pytest
+
+from conftest import cell, parser_with
+from query_rooms import batch_main, run_batch
+from tt_parser import TimetableParser
+
+
+@pytest.fixture
+def data_path(tmp_path):
+    parser = parser_with([cell("23BCS_F", "Mo", 3, "S-606"), cell("23BCS_K", "Tu", 1, "604")])
+    path = tmp_path / "timetable.json"
+    parser.export_to_json(str(path))
+    return str(path)
+
+
+def test_answers_one_line_per_query(data_path, capsys):
+    assert batch_main(["--data", data_path, "vacant Mo 3", "rooms"]) == 0
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert lines[0]["vacant_rooms"] == ["604"]
+    assert lines[1]["rooms"] == ["604", "S-606"]
+
+
+def test_failed_queries_set_the_exit_status(data_path):
+    out = io.StringIO()
+    parser = TimetableParser.from_json(data_path)
+    assert run_batch(parser, ["vacant Sa 3", "# comment", "", "vacant Mo 3"], out) == 1
+    results = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert "error" in results[0] and len(results) == 2
+
+
+@pytest.mark.parametrize("name, content", [
+    ("missing.pdf", None),
+    ("missing.json", None),
+    ("empty.json", "{}"),
+    ("broken.json", "not json"),
+    ("broken.snap", "not a snapshot" * 8),
+])
+def test_unloadable_data_fails_without_answering(tmp_path, capsys, name, content):
+    path = tmp_path / name
+    if content is not None:
+        path.write_text(content)
+    assert batch_main(["--data", str(path), "vacant Mo 3"]) == 2
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert "[ERROR] Could not" in captured.err
+
+
+def test_folder_without_pdfs_fails(tmp_path, capsys):
+    assert batch_main(["--data", str(tmp_path), "vacant Mo 3"]) == 2
+    assert capsys.readouterr().out == ""
+
+
+def test_bad_calendar_fails(data_path, tmp_path, capsys):
+    calendar_path = tmp_path / "calendar.json"
+    calendar_path.write_text(json.dumps({"day_swaps": [{"date": "2026-10-24", "follows": "Sa"}]}))
+    assert batch_main(["--data", data_path, "--calendar", str(calendar_path), "rooms"]) == 2
+    assert "Invalid day 'Sa'" in capsys.readouterr().err
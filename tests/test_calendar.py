@@ -0,0 +1,219 @@
+"""Date-aware vacancy: holidays, day swaps, cancellations and bookings"""
+
+import json
+from datetime import date, datetime
+
+import pytest
+
+from conftest import cell, parser_with
+from tt_calendar import OccupancyCalendar
+from tt_parser import TIME_SLOTS
+from tt_reload import ReloadManager
+from tt_server import TimetableService
+
+MONDAY = date(2026, 10, 19)
+TUESDAY = date(2026, 10, 20)
+WEDNESDAY = date(2026, 10, 21)
+SATURDAY = date(2026, 10, 24)
+SUNDAY = date(2026, 10, 25)
+
+CALENDAR = {
+    "holidays": ["2026-10-20", {"from": "2026-11-09", "to": "2026-11-11", "name": "Exams"},
+                 "2026-10-31"],
+    "day_swaps": [{"date": "2026-10-24", "follows": "Mo"},
+                  {"date": "2026-10-31", "follows": "Tu"}],
+    "cancellations": [{"date": "2026-10-21", "slot": 3, "rooms": ["S-606"]},
+                      {"date": "2026-10-22", "rooms": ["604"]}],
+    "bookings": [{"date": "2026-10-20", "slot": 3, "rooms": ["S-606", "LT-1"]},
+                 {"date": "2026-10-21", "slot": 5, "rooms": ["604", "not-a-room"]},
+                 {"date": "2026-10-25", "slot": 2, "rooms": ["604"]}],
+}
+
+
+@pytest.fixture
+def parser():
+    parser = parser_with([
+        cell("23BCS_F", "Mo", 3, "S-606"),
+        cell("23BCS_F", "Mo", 4, "S-606"),
+        cell("23BCS_K", "Tu", 1, "604"),
+        cell("23BCS_K", "We", 3, "S-606"),
+        cell("23BCS_K", "We", 3, "604"),
+        cell("23BCS_K", "Th", 2, "604"),
+        cell("23BCS_K", "Th", 5, "604"),
+        cell("23BCS_F", "Fr", 8, "LT-1"),
+    ])
+    parser.calendar_config = CALENDAR
+    return parser
+
+
+def _at(on, hour, minute):
+    return datetime(on.year, on.month, on.day, hour, minute)
+
+
+def test_plain_dates_follow_their_weekday(parser):
+    for day_offset, day in enumerate(["Mo", "Tu", "We", "Th", "Fr"]):
+        on = date(2026, 10, 26 + day_offset)
+        assert parser.calendar.grid_day(on) == day
+        for slot in TIME_SLOTS:
+            assert parser.find_vacant_rooms_on(on, slot) == parser.find_vacant_rooms(day, slot)
+
+
+def test_no_config_changes_nothing(parser):
+    calendar = OccupancyCalendar(parser.index)
+    assert calendar.grid_day(TUESDAY) == "Tu"
+    assert calendar.vacant_rooms(TUESDAY, 1) == parser.find_vacant_rooms("Tu", 1)
+    assert calendar.grid_day(SATURDAY) is None
+    assert calendar.vacant_rooms(SATURDAY, 3) == sorted(parser.all_rooms)
+
+
+def test_holiday_frees_classes_but_keeps_bookings(parser):
+    assert parser.calendar.grid_day(TUESDAY) is None
+    assert parser.calendar.holidays[TUESDAY] == "Holiday"
+    # The Tuesday class in 604 does not happen
+    assert "604" in parser.find_vacant_rooms_on(TUESDAY, 1)
+    assert parser.find_vacant_rooms_on(TUESDAY, 3) == ["604"]
+    assert parser.find_vacant_rooms_on(TUESDAY, 4) == sorted(parser.all_rooms)
+
+
+def test_holiday_ranges(parser):
+    for day in (9, 10, 11):
+        on = date(2026, 11, day)
+        assert parser.calendar.holidays[on] == "Exams"
+        assert parser.find_vacant_rooms_on(on, 3) == sorted(parser.all_rooms)
+    assert parser.calendar.grid_day(date(2026, 11, 12)) == "Th"
+
+
+def test_day_swap_follows_other_weekday(parser):
+    assert parser.calendar.grid_day(SATURDAY) == "Mo"
+    for slot in TIME_SLOTS:
+        assert parser.find_vacant_rooms_on(SATURDAY, slot) == parser.find_vacant_rooms("Mo", slot)
+
+
+def test_holiday_wins_over_day_swap(parser):
+    halloween = date(2026, 10, 31)
+    assert parser.calendar.grid_day(halloween) is None
+    assert parser.find_vacant_rooms_on(halloween, 1) == sorted(parser.all_rooms)
+
+
+def test_cancellations(parser):
+    assert parser.find_vacant_rooms_on(WEDNESDAY, 3) == ["LT-1", "S-606"]
+    # Without a slot, the room is freed all day
+    thursday = date(2026, 10, 22)
+    for slot in (2, 5):
+        assert "604" in parser.find_vacant_rooms_on(thursday, slot)
+
+
+def test_bookings_ignore_unknown_rooms(parser):
+    assert parser.find_vacant_rooms_on(WEDNESDAY, 5) == ["LT-1", "S-606"]
+    assert parser.find_vacant_rooms_on(SUNDAY, 2) == ["LT-1", "S-606"]
+
+
+def test_invalid_entries_raise(parser):
+    with pytest.raises(ValueError, match="Sa"):
+        OccupancyCalendar(parser.index, {"day_swaps": [{"date": "2026-10-24", "follows": "Sa"}]})
+    with pytest.raises(ValueError, match="slot 9"):
+        OccupancyCalendar(parser.index, {"bookings": [{"date": "2026-10-24", "slot": 9,
+                                                       "rooms": ["604"]}]})
+    with pytest.raises(ValueError):
+        parser.find_vacant_rooms_on(MONDAY, 0)
+
+
+def test_vacancy_slot_on_a_holiday_with_bookings(parser):
+    # 11:30 is in slot 3
+    now = _at(TUESDAY, 11, 30)
+    assert parser.get_vacancy_slot(now) == (None, 3)
+    assert parser.find_vacant_rooms_now(now) == ["604"]
+    # Outside class hours every room is vacant, bookings or not
+    assert parser.get_vacancy_slot(_at(TUESDAY, 7, 0)) is None
+    assert parser.find_vacant_rooms_now(_at(TUESDAY, 7, 0)) == sorted(parser.all_rooms)
+
+
+def test_vacancy_slot_without_bookings(parser):
+    # Saturday follows Monday; an exam day has nothing booked
+    assert parser.get_vacancy_slot(_at(SATURDAY, 11, 30)) == ("Mo", 3)
+    assert parser.find_vacant_rooms_now(_at(SATURDAY, 11, 30)) == ["604", "LT-1"]
+    assert parser.get_vacancy_slot(_at(date(2026, 11, 10), 11, 30)) is None
+
+
+def test_current_slot_follows_calendar(parser):
+    assert parser.get_current_slot(_at(MONDAY, 11, 30)) == ("Mo", 3)
+    assert parser.get_current_slot(_at(SATURDAY, 11, 30)) == ("Mo", 3)
+    # A holiday with extra bookings still has class periods, but no grid day
+    assert parser.get_current_slot(_at(TUESDAY, 9, 45)) == (None, 1)
+    assert parser.get_current_slot(_at(date(2026, 11, 10), 9, 45)) is None
+    assert parser.get_current_slot(_at(MONDAY, 11, 15)) is None
+
+
+def test_free_for_follows_calendar(parser):
+    # 604 has class on Tuesdays in slot 1, but not on the holiday
+    assert "604" not in parser.find_rooms_free_for(60, _at(date(2026, 10, 27), 9, 30))
+    assert "604" in parser.find_rooms_free_for(60, _at(TUESDAY, 9, 30))
+    # The holiday's bookings still count
+    assert parser.find_rooms_free_for(180, _at(TUESDAY, 9, 30)) == ["604"]
+    # Cancelled on Wednesday slot 3, booked in slot 5
+    assert parser.find_rooms_free_for(50, _at(WEDNESDAY, 11, 20)) == ["LT-1", "S-606"]
+    assert "604" not in parser.find_rooms_free_for(120, _at(WEDNESDAY, 12, 10))
+
+
+def test_free_for_spans_dates(parser):
+    # From Friday afternoon over the weekend: Saturday follows Monday
+    friday = date(2026, 10, 23)
+    assert "S-606" not in parser.find_rooms_free_for(24 * 60, _at(friday, 17, 0))
+    assert "LT-1" in parser.find_rooms_free_for(24 * 60, _at(friday, 17, 0))
+
+
+def test_next_transition_follows_calendar(parser):
+    # 604 would be busy Tuesday 09:30; the holiday moves that to Wednesday slot 3
+    assert parser.next_room_transition("604", _at(TUESDAY, 7, 0)) == (_at(WEDNESDAY, 11, 20), "BUSY")
+    # S-606 next has class on Saturday, which follows Monday
+    assert parser.next_room_transition("S-606", _at(date(2026, 10, 23), 12, 0)) == (
+        _at(SATURDAY, 11, 20), "BUSY")
+    # Busy through Saturday's slots 3 and 4
+    assert parser.next_room_transition("S-606", _at(SATURDAY, 11, 30)) == (
+        _at(SATURDAY, 13, 0), "FREE")
+    # Booked on the holiday: free again when the booked slot ends
+    assert parser.next_room_transition("LT-1", _at(TUESDAY, 11, 30)) == (_at(TUESDAY, 12, 10), "FREE")
+
+
+def test_next_transition_across_a_long_holiday(parser):
+    # Exams 9-11 November: LT-1 (Fridays, slot 8) is untouched; S-606's next
+    # class after Friday 6 November is Monday the 16th
+    assert parser.next_room_transition("S-606", _at(date(2026, 11, 6), 8, 0)) == (
+        _at(date(2026, 11, 16), 11, 20), "BUSY")
+    assert parser.next_room_transition("unknown", _at(MONDAY, 8, 0)) is None
+
+
+def test_calendar_config_can_be_replaced(parser):
+    assert parser.calendar.grid_day(TUESDAY) is None
+    parser.calendar_config = None
+    assert parser.calendar.grid_day(TUESDAY) == "Tu"
+
+
+def test_server_reports_the_slot_it_looked_up(parser):
+    service = TimetableService("unused.json", reload_interval=0)
+    service.reloader.parser = parser
+    
+    result = service.handle("/vacant/now", {"at": "2026-10-20T11:30"})
+    assert (result["day"], result["slot"], result["vacant_rooms"]) == (None, 3, ["604"])
+    result = service.handle("/vacant/now", {"at": "2026-10-24T11:30"})
+    assert (result["day"], result["slot"]) == ("Mo", 3)
+    assert result["vacant_rooms"] == parser.find_vacant_rooms("Mo", 3)
+    result = service.handle("/vacant", {"date": "2026-10-20", "slot": "3"})
+    assert result["day"] is None and result["vacant_rooms"] == ["604"]
+
+
+def test_reload_keeps_the_calendar(parser, tmp_path):
+    data_path, calendar_path = tmp_path / "timetable.json", tmp_path / "calendar.json"
+    parser.export_to_json(str(data_path))
+    calendar_path.write_text(json.dumps(CALENDAR))
+    
+    manager = ReloadManager(str(data_path), interval=0, calendar_path=str(calendar_path))
+    manager.load()
+    assert manager.parser.find_vacant_rooms_on(TUESDAY, 3) == ["604"]
+    
+    data = json.loads(data_path.read_text())
+    data_path.write_text(json.dumps(data, indent=1))
+    assert manager.check()
+    assert manager.generation == 2
+    assert manager.parser.calendar.grid_day(SATURDAY) == "Mo"
+    assert manager.parser.find_vacant_rooms_on(TUESDAY, 3) == ["604"]
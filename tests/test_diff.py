@@ -0,0 +1,117 @@
+"""Occupancy diff between two timetable editions"""
+
+import random
+
+import pytest
+
+from conftest import cell, parser_with
+from tt_diff import _cell_masks_diff, _room_masks_diff, diff_editions, diff_indexes
+from tt_occupancy import OccupancyIndex
+from tt_parser import DAYS, TIME_SLOTS
+
+ROOMS = ["001", "604", "LT-1", "S-606", "S-607", "201(Apple lab)"]
+
+
+def _expected(old, new):
+    """The diff by set differences over occupied_rooms"""
+    changes = []
+    for day in DAYS:
+        for slot in TIME_SLOTS:
+            before, after = old.occupied_rooms[day][slot], new.occupied_rooms[day][slot]
+            if before != after:
+                changes.append((day, slot, sorted(before - after), sorted(after - before)))
+    return changes
+
+
+def _random_parser(rng, rooms):
+    return parser_with([cell("23BCS_F", day, slot, room)
+                        for day in DAYS for slot in TIME_SLOTS for room in rooms
+                        if rng.random() < 0.3])
+
+
+def _as_tuples(diff):
+    return [tuple(change) for change in diff.changes]
+
+
+def test_same_room_table_uses_cell_masks():
+    old = parser_with([cell("A", "Mo", 1, "604"), cell("A", "Mo", 2, "S-606"),
+                       cell("B", "Tu", 3, "LT-1")])
+    new = parser_with([cell("A", "Mo", 1, "S-606"), cell("A", "Mo", 2, "S-606"),
+                       cell("B", "Tu", 4, "604"), cell("B", "We", 1, "LT-1")])
+    assert old.index.rooms == new.index.rooms
+    
+    diff = diff_indexes(old.index, new.index)
+    assert _as_tuples(diff) == [
+        ("Mo", 1, ["604"], ["S-606"]),
+        ("Tu", 3, ["LT-1"], []),
+        ("Tu", 4, [], ["604"]),
+        ("We", 1, [], ["LT-1"]),
+    ]
+    assert diff.rooms_added == diff.rooms_removed == []
+    assert diff.changed_cells == 5
+
+
+def test_different_room_tables_match_rooms_by_name():
+    old = parser_with([cell("A", "Mo", 1, "604"), cell("A", "Mo", 1, "S-606"),
+                       cell("B", "Fr", 8, "001")])
+    new = parser_with([cell("A", "Mo", 1, "S-606"), cell("A", "Mo", 1, "LT-1"),
+                       cell("B", "Fr", 8, "604")])
+    
+    diff = diff_indexes(old.index, new.index)
+    assert _as_tuples(diff) == [
+        ("Mo", 1, ["604"], ["LT-1"]),
+        ("Fr", 8, ["001"], ["604"]),
+    ]
+    assert diff.rooms_added == ["LT-1"]
+    assert diff.rooms_removed == ["001"]
+    assert diff.changed_cells == 4
+    assert diff.to_dict() == {
+        "changed_cells": 4,
+        "freed": {"Mo": {"1": ["604"]}, "Fr": {"8": ["001"]}},
+        "occupied": {"Mo": {"1": ["LT-1"]}, "Fr": {"8": ["604"]}},
+        "rooms_added": ["LT-1"],
+        "rooms_removed": ["001"],
+    }
+
+
+def test_no_changes():
+    parser = parser_with([cell("A", "Mo", 1, "604")])
+    diff = diff_indexes(parser.index, parser_with([cell("A", "Mo", 1, "604")]).index)
+    assert not diff
+    assert diff.changed_cells == 0
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_editions_match_set_differences(seed):
+    rng = random.Random(seed)
+    old = _random_parser(rng, ROOMS)
+    same_rooms = _random_parser(rng, ROOMS)
+    other_rooms = _random_parser(rng, rng.sample(ROOMS, 4) + ["N-101"])
+    
+    if old.index.rooms == same_rooms.index.rooms:
+        assert _cell_masks_diff(old.index, same_rooms.index) == diff_indexes(
+            old.index, same_rooms.index).changes
+    for new in (same_rooms, other_rooms):
+        diff = diff_indexes(old.index, new.index)
+        assert _as_tuples(diff) == _expected(old, new)
+        assert diff.rooms_added == sorted(new.all_rooms - old.all_rooms)
+        assert diff.rooms_removed == sorted(old.all_rooms - new.all_rooms)
+        assert diff.changed_cells == sum(len(f) + len(o) for _, _, f, o in _expected(old, new))
+        # Both strategies agree whenever both apply
+        assert _room_masks_diff(old.index, new.index) == diff.changes
+
+
+def test_editions_from_files(tmp_path):
+    old = parser_with([cell("A", "Mo", 1, "604")])
+    new = parser_with([cell("A", "Mo", 2, "604"), cell("A", "Tu", 1, "LT-1")])
+    old_path, new_path = str(tmp_path / "old.json"), str(tmp_path / "new.snap")
+    old.export_to_json(old_path)
+    new.export_snapshot(new_path)
+    assert diff_editions(old_path, new_path) == diff_editions(old, new.index)
+
+
+def test_different_grids_raise():
+    index = parser_with([cell("A", "Mo", 1, "604")]).index
+    other = OccupancyIndex(DAYS[:3], list(TIME_SLOTS), ["604"])
+    with pytest.raises(ValueError, match="different days or slots"):
+        diff_indexes(index, other)
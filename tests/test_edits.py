@@ -0,0 +1,65 @@
+"""Direct edits of the public occupied_rooms/all_rooms reach every query"""
+
+import pytest
+
+from conftest import cell, parser_with
+
+
+@pytest.fixture
+def parser():
+    parser = parser_with([cell("23BCS_F", "Mo", 3, "S-606"), cell("23BCS_K", "Tu", 1, "604")])
+    # Build every derived index before editing
+    parser.index
+    parser.vacancy_matrix_json()
+    parser.section_masks
+    return parser
+
+
+def test_adding_an_occupied_room(parser):
+    parser.occupied_rooms["Mo"][3].add("604")
+    assert parser.find_vacant_rooms("Mo", 3) == []
+    assert parser.vacancy_matrix["Mo"][3] == []
+
+
+def test_removing_an_occupied_room(parser):
+    parser.occupied_rooms["Mo"][3].discard("S-606")
+    assert parser.find_vacant_rooms("Mo", 3) == ["604", "S-606"]
+
+
+def test_in_place_operators(parser):
+    parser.occupied_rooms["Mo"][3] |= {"604"}
+    assert parser.find_vacant_rooms("Mo", 3) == []
+    parser.occupied_rooms["Mo"][3] -= {"604", "S-606"}
+    assert parser.find_vacant_rooms("Mo", 3) == ["604", "S-606"]
+
+
+def test_replacing_sets_and_days(parser):
+    parser.occupied_rooms["We"][2] = {"604"}
+    assert parser.find_vacant_rooms("We", 2) == ["S-606"]
+    # The replacement set is tracked as well
+    parser.occupied_rooms["We"][2].add("S-606")
+    assert parser.find_vacant_rooms("We", 2) == []
+    parser.occupied_rooms["Mo"] = {slot: set() for slot in range(1, 9)}
+    assert parser.find_vacant_rooms("Mo", 3) == ["604", "S-606"]
+
+
+def test_new_room(parser):
+    parser.all_rooms.add("LT-1")
+    assert "LT-1" in parser.find_vacant_rooms("Fr", 8)
+    parser.all_rooms = {"604"}
+    assert parser.find_vacant_rooms("Fr", 8) == ["604"]
+
+
+def test_report_agrees_with_query(parser, capsys):
+    parser.occupied_rooms["Tu"][1].add("S-606")
+    parser.print_vacancy_report("Tu", 1)
+    report = capsys.readouterr().out
+    assert "Occupied: 2" in report and "Vacant: 0" in report
+    assert "[NONE] No vacant rooms" in report
+
+
+def test_copies_are_independent(parser):
+    copy = parser.copy()
+    copy.occupied_rooms["Mo"][3].add("604")
+    assert parser.find_vacant_rooms("Mo", 3) == ["604"]
+    assert copy.find_vacant_rooms("Mo", 3) == []
@@ -0,0 +1,27 @@
+"""Template-based table extraction (parse_pdf(fast=True)) against extract_tables"""
+
+import pytest
+
+from tt_metrics import RecordingMetrics
+from tt_parser import TimetableParser
+from tt_synth import write_timetable_pdf
+
+
+def _parse(path, fast):
+    parser = TimetableParser(metrics=RecordingMetrics())
+    parser.parse_pdf(path, fast=fast)
+    return parser
+
+
+@pytest.mark.parametrize("seed, fill_rate", [(0, 0.6), (1, 0.2), (2, 1.0)])
+def test_fast_parse_matches_extract_tables(tmp_path, seed, fill_rate):
+    path = str(tmp_path / "timetable.pdf")
+    write_timetable_pdf(path, pages=5, seed=seed, fill_rate=fill_rate)
+    
+    slow, fast = _parse(path, fast=False), _parse(path, fast=True)
+    assert slow.page_records
+    assert fast.page_records == slow.page_records
+    assert fast.page_fingerprints == slow.page_fingerprints
+    assert fast.occupied_rooms == slow.occupied_rooms
+    # Only the first page goes through find_tables; the rest use its template
+    assert fast.metrics.counters["template_fallbacks"] == 1
@@ -0,0 +1,78 @@
+"""Room locations and nearest-vacant ranking (tt_rooms)"""
+
+import random
+
+import pytest
+
+from tt_rooms import RoomModel, parse_room
+
+ROOMS = sorted(
+    [f"{block}-{floor}{number:02d}" for block in ("S", "OT", "PP", "N")
+     for floor in range(1, 9) for number in (1, 2, 5, 6, 9, 14, 30)]
+    + [f"{floor}{number:02d}" for floor in range(1, 9) for number in (1, 4, 6, 20)]
+    + ["RG-1", "RG-2", "RG-12", "LT-1", "12", "201(Apple lab)", "Lab"]
+)
+
+CONFIG = {
+    "block_cost": 3,
+    "blocks": {"S": {"x": 0, "y": 0}, "OT": {"x": 2, "y": 1}, "PP": {"x": 0.5, "y": 0}},
+    "rooms": {"RG-1": {"block": "RG", "floor": 0}, "Lab": {"block": "S", "floor": 2, "number": 215},
+              "604": {"block": "S"}},
+}
+
+ORIGINS = ["S-606", "OT-801", "604", "RG-1", "12", "Lab", "S-999", "X-1", "N-101"]
+
+
+def _full_sort(model, vacant_mask, origin, limit):
+    origin_info = model.locate(origin)
+    ranked = sorted(
+        (model.distance(origin_info, model.info[room]), room)
+        for room_id, room in enumerate(model.rooms) if vacant_mask >> room_id & 1
+    )
+    if limit is not None:
+        ranked = ranked[:limit]
+    return [(room, round(distance, 4)) for distance, room in ranked]
+
+
+def test_parse_room():
+    assert parse_room("S-606") == ("S-606", "S", 6, 606)
+    assert parse_room("604") == ("604", "", 6, 604)
+    assert parse_room("RG-1") == ("RG-1", "RG", None, 1)
+    assert parse_room("Lab") == ("Lab", "", None, None)
+
+
+def test_corridor_position_ignores_the_floor():
+    model = RoomModel(ROOMS)
+    origin = model.locate("S-606")
+    # Same floor, next door beats the same corridor position one floor up
+    assert model.distance(origin, model.locate("S-605")) < model.distance(origin, model.locate("S-706"))
+    assert model.distance(origin, model.locate("S-601")) == pytest.approx(0.05)
+
+
+@pytest.mark.parametrize("config", [None, CONFIG], ids=["default", "config"])
+@pytest.mark.parametrize("limit", [None, 1, 2, 5, 17, 1000])
+def test_nearest_matches_a_full_sort(config, limit):
+    model = RoomModel(ROOMS, config)
+    rng = random.Random(limit or 0)
+    all_rooms = (1 << len(ROOMS)) - 1
+    for _ in range(40):
+        vacant_mask = sum(1 << i for i in range(len(ROOMS)) if rng.random() < rng.choice([0.05, 0.5, 1]))
+        for origin in ORIGINS:
+            expected = _full_sort(model, vacant_mask, origin, limit)
+            assert model.nearest(vacant_mask, model.locate(origin), limit) == expected
+    assert len(model.nearest(all_rooms, model.locate("S-606"), limit)) == min(limit or len(ROOMS), len(ROOMS))
+
+
+def test_limit_zero_and_nothing_vacant():
+    model = RoomModel(ROOMS)
+    assert model.nearest((1 << len(ROOMS)) - 1, model.locate("S-606"), 0) == []
+    assert model.nearest(0, model.locate("S-606"), 5) == []
+
+
+def test_config_overrides():
+    model = RoomModel(ROOMS, CONFIG)
+    assert model.locate("Lab") == ("Lab", "S", 2, 215)
+    assert model.locate("604").block == "S"
+    assert model.block_distance("S", "OT") == pytest.approx(5 ** 0.5)
+    # Unknown blocks are one unit apart
+    assert model.block_distance("S", "N") == 1.0
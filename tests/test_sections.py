@@ -0,0 +1,132 @@
+"""Per-section occupancy masks and common free slots/windows"""
+
+import json
+
+import pytest
+
+from conftest import cell, parser_with
+from tt_parser import DAYS, TIME_SLOTS, TimetableParser
+from tt_server import HTTPError, TimetableService
+
+
+@pytest.fixture
+def parser():
+    return parser_with([
+        cell("23BCS_F", "Mo", 1, "S-606"),
+        cell("23BCS_F", "Mo", 2, "S-606"),
+        cell("23BCS_F", "Mo", 5, "S-607"),
+        cell("23BCS_F", "Fr", 8, "S-606"),
+        cell("23BCS_K", "Mo", 3, "604"),
+        cell("23BCS_K", "Mo", 4, "604"),
+        cell("23BCS_K", "Tu", 1, "604"),
+        # Two sections sharing a room and a slot (a combined lecture)
+        cell("23BCS_K", "We", 6, "LT-1"),
+        cell("23BCS_F", "We", 6, "LT-1"),
+    ])
+
+
+def test_section_masks_use_index_cell_ids(parser):
+    index = parser.index
+    expected = 0
+    for day, slot in [("Mo", 1), ("Mo", 2), ("Mo", 5), ("Fr", 8), ("We", 6)]:
+        expected |= 1 << index.cell_id(day, slot)
+    assert parser.section_masks["23BCS_F"] == expected
+
+
+def test_common_free_slots(parser):
+    free = parser.find_common_free_slots(["23BCS_F", "23BCS_K"])
+    assert free["Mo"] == [6, 7, 8]
+    assert free["Tu"] == [2, 3, 4, 5, 6, 7, 8]
+    assert free["We"] == [1, 2, 3, 4, 5, 7, 8]
+    assert free["Fr"] == [1, 2, 3, 4, 5, 6, 7]
+    assert free["Th"] == list(TIME_SLOTS)
+
+
+def test_day_without_common_free_slot_is_left_out():
+    parser = parser_with([cell("A", "Mo", slot, "101") for slot in TIME_SLOTS]
+                         + [cell("A", "Tu", 1, "101")])
+    free = parser.find_common_free_slots(["A"])
+    assert "Mo" not in free
+    assert free["Tu"] == list(TIME_SLOTS)[1:]
+
+
+def test_common_free_windows(parser):
+    windows = parser.find_common_free_windows(["23BCS_F", "23BCS_K"])
+    assert windows == [
+        ("Mo", 6, 8),
+        ("Tu", 2, 8),
+        ("We", 1, 5), ("We", 7, 8),
+        ("Th", 1, 8),
+        ("Fr", 1, 7),
+    ]
+
+
+def test_common_free_windows_min_length(parser):
+    windows = parser.find_common_free_windows(["23BCS_F", "23BCS_K"], min_length=4)
+    assert windows == [("Tu", 2, 8), ("We", 1, 5), ("Th", 1, 8), ("Fr", 1, 7)]
+
+
+def test_windows_match_free_slots(parser):
+    sections = ["23BCS_F", "23BCS_K"]
+    free = parser.find_common_free_slots(sections)
+    covered = {}
+    for day, start, end in parser.find_common_free_windows(sections):
+        covered.setdefault(day, []).extend(range(start, end + 1))
+    assert covered == free
+
+
+def test_single_section_matches_its_schedule(parser):
+    schedule = parser.get_section_schedule("23BCS_K")
+    free = parser.find_common_free_slots(["23BCS_K"])
+    for day in DAYS:
+        busy = set(schedule.get(day, {}))
+        assert set(free.get(day, [])) == set(TIME_SLOTS) - busy
+
+
+def test_unknown_section_raises(parser):
+    with pytest.raises(ValueError, match="23BCS_Z"):
+        parser.find_common_free_windows(["23BCS_F", "23BCS_Z"])
+
+
+def test_masks_follow_page_updates(parser):
+    parser.section_masks
+    parser._set_page(("timetable.pdf", 2), "page-2", [cell("23BCS_K", "Th", 2, "604")])
+    assert ("Th", 2, 2) not in parser.find_common_free_windows(["23BCS_K"])
+    assert 2 not in parser.find_common_free_slots(["23BCS_K"])["Th"]
+
+
+def test_json_export_keeps_sections(parser, tmp_path):
+    path = str(tmp_path / "timetable.json")
+    parser.export_to_json(path)
+    loaded = TimetableParser.from_json(path)
+    assert loaded.page_records == parser.page_records
+    assert loaded.occupied_rooms == parser.occupied_rooms
+    assert loaded.section_masks == parser.section_masks
+    assert loaded.get_room_schedule("LT-1") == parser.get_room_schedule("LT-1")
+
+
+def test_json_export_without_pages_still_loads(parser, tmp_path):
+    path = tmp_path / "timetable.json"
+    parser.export_to_json(str(path))
+    data = json.loads(path.read_text())
+    del data["pages"]
+    path.write_text(json.dumps(data))
+    loaded = TimetableParser.from_json(str(path))
+    assert loaded.occupied_rooms == parser.occupied_rooms
+    assert loaded.find_vacant_rooms("We", 6) == parser.find_vacant_rooms("We", 6)
+    with pytest.raises(ValueError, match="no section data"):
+        loaded.find_common_free_slots(["23BCS_F"])
+
+
+def test_server_reports_missing_section_data(parser, tmp_path):
+    path = str(tmp_path / "timetable.snap")
+    parser.export_snapshot(path)
+    service = TimetableService(path, reload_interval=0)
+    service.reloader.parser = TimetableParser.from_snapshot(path)
+    with pytest.raises(HTTPError) as error:
+        service.handle("/sections/free", {"sections": "23BCS_F"})
+    assert error.value.status == 503
+    
+    service.reloader.parser = parser
+    result = service.handle("/sections/free", {"sections": "23BCS_F,23BCS_K", "min_length": "4"})
+    assert result["windows"][0] == {"day": "Tu", "start_slot": 2, "end_slot": 8}
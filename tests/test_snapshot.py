@@ -0,0 +1,115 @@
+"""Binary snapshot round trip (tt_snapshot)"""
+
+import random
+
+import pytest
+
+from conftest import cell, parser_with
+from tt_parser import DAYS, TIME_SLOTS, TimetableParser
+from tt_snapshot import SNAPSHOT_MAGIC, SNAPSHOT_VERSION, Snapshot, _HEADER, write_snapshot
+
+# More than 8 rooms, so rows of the cell matrix span several bytes, and
+# names that are not ASCII or sort differently in bytes and code points
+ROOMS = ["001", "104", "201(Apple lab)", "604", "B-2", "LT-1", "N-101", "PP-802",
+         "RG-1", "S-606", "S-607", "Salle Å", "Raum Ü-3", "कक्ष-1", "教室-2"]
+
+
+@pytest.fixture
+def parser():
+    rng = random.Random(0)
+    return parser_with([cell("23BCS_F", day, slot, room)
+                        for day in DAYS for slot in TIME_SLOTS for room in ROOMS
+                        if rng.random() < 0.4])
+
+
+@pytest.fixture
+def snapshot_path(parser, tmp_path):
+    path = str(tmp_path / "timetable.snap")
+    write_snapshot(parser.index, path)
+    return path
+
+
+def test_queries_match_the_index(parser, snapshot_path):
+    index = parser.index
+    with Snapshot(snapshot_path) as snapshot:
+        assert snapshot.rooms == index.rooms == sorted(ROOMS)
+        assert snapshot.days == DAYS and snapshot.slots == list(TIME_SLOTS)
+        for day in DAYS:
+            for slot in TIME_SLOTS:
+                assert snapshot.vacant_rooms(day, slot) == parser.find_vacant_rooms(day, slot)
+                assert snapshot.occupied_mask(day, slot) == index.occupied_mask(day, slot)
+                for room in ROOMS:
+                    assert snapshot.is_occupied(room, day, slot) == (
+                        room in parser.occupied_rooms[day][slot])
+        for room in ROOMS:
+            assert snapshot.room_id(room) == index.room_ids[room]
+            assert snapshot.room_mask(room) == index.room_mask(room)
+
+
+def test_unknown_rooms(snapshot_path):
+    with Snapshot(snapshot_path) as snapshot:
+        assert snapshot.room_id("Z-999") is None
+        assert snapshot.room_id("") is None
+        assert not snapshot.is_occupied("Z-999", "Mo", 1)
+        with pytest.raises(KeyError):
+            snapshot.room_mask("Z-999")
+
+
+def test_to_index_and_from_snapshot(parser, snapshot_path):
+    with Snapshot(snapshot_path) as snapshot:
+        index = snapshot.to_index()
+    assert index.cell_masks == parser.index.cell_masks
+    assert index.room_masks == parser.index.room_masks
+    
+    loaded = TimetableParser.from_snapshot(snapshot_path)
+    assert loaded.occupied_rooms == parser.occupied_rooms
+    assert loaded.all_rooms == parser.all_rooms
+
+
+def test_empty_timetable(tmp_path):
+    path = str(tmp_path / "empty.snap")
+    write_snapshot(TimetableParser().index, path)
+    with Snapshot(path) as snapshot:
+        assert snapshot.rooms == []
+        assert snapshot.vacant_rooms("Mo", 1) == []
+
+
+def _rewrite_header(path, **fields):
+    with open(path, "rb") as f:
+        data = bytearray(f.read())
+    names = ["magic", "version", "n_days", "n_slots", "n_rooms",
+             "offsets_at", "names_at", "cells_at", "rooms_at"]
+    header = dict(zip(names, _HEADER.unpack_from(data, 0)))
+    header.update(fields)
+    _HEADER.pack_into(data, 0, *(header[name] for name in names))
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def test_bad_magic(snapshot_path):
+    _rewrite_header(snapshot_path, magic=b"NOTSNAP\x00")
+    with pytest.raises(ValueError, match="Not a timetable snapshot"):
+        Snapshot(snapshot_path)
+
+
+def test_bad_version(snapshot_path):
+    _rewrite_header(snapshot_path, version=SNAPSHOT_VERSION + 1)
+    with pytest.raises(ValueError, match="Unsupported snapshot version"):
+        Snapshot(snapshot_path)
+
+
+@pytest.mark.parametrize("content", [b"", SNAPSHOT_MAGIC, b"x" * (_HEADER.size - 1)])
+def test_short_files(tmp_path, content):
+    path = tmp_path / "short.snap"
+    path.write_bytes(content)
+    with pytest.raises(ValueError):
+        Snapshot(str(path))
+
+
+def test_truncated_file(snapshot_path):
+    with open(snapshot_path, "rb") as f:
+        data = f.read()
+    with open(snapshot_path, "wb") as f:
+        f.write(data[:-1])
+    with pytest.raises(ValueError, match="Truncated"):
+        Snapshot(snapshot_path)
@@ -0,0 +1,122 @@
+"""Incremental re-parse of new editions (update_pdf, remove_pdf)"""
+
+import shutil
+
+import pypdfium2 as pdfium
+import pytest
+
+from tt_parser import TimetableParser
+from tt_synth import write_timetable_pdf
+
+
+@pytest.fixture(scope="module")
+def source_pdfs(tmp_path_factory):
+    """Two synthetic timetables to cut editions from"""
+    directory = tmp_path_factory.mktemp("sources")
+    first, second = str(directory / "first.pdf"), str(directory / "second.pdf")
+    write_timetable_pdf(first, pages=6, seed=0)
+    write_timetable_pdf(second, pages=2, seed=1)
+    return first, second
+
+
+@pytest.fixture
+def edition(source_pdfs, tmp_path):
+    """
+    write(pages) makes timetable.pdf an edition built from pages of the
+    source PDFs: ("a", 0) is page 1 of the first, ("b", 0) of the second
+    """
+    path = str(tmp_path / "timetable.pdf")
+    sources = dict(zip("ab", source_pdfs))
+    
+    def write(pages):
+        doc = pdfium.PdfDocument.new()
+        for name, index in pages:
+            doc.import_pages(pdfium.PdfDocument(sources[name]), [index])
+        doc.save(path)
+        return path
+    
+    return write
+
+
+def _state(parser):
+    return (
+        parser.occupied_rooms,
+        parser.all_rooms,
+        dict(parser._occupancy_refs),
+        dict(parser._room_refs),
+        parser.page_records,
+        parser.page_fingerprints,
+    )
+
+
+def _fresh(path):
+    parser = TimetableParser()
+    parser.parse_pdf(path)
+    return parser
+
+
+FIRST_EDITION = [("a", i) for i in range(6)]
+
+
+def test_unchanged_edition_extracts_nothing(edition):
+    path = edition(FIRST_EDITION)
+    parser = _fresh(path)
+    before = _state(parser)
+    assert parser.update_pdf(path) == []
+    assert _state(parser) == before
+
+
+def test_inserted_and_removed_pages(edition):
+    parser = _fresh(edition(FIRST_EDITION))
+    # A new page 3 shifts the old pages 3-5 down, the old page 6 is gone
+    path = edition([("a", 0), ("a", 1), ("b", 0), ("a", 2), ("a", 3), ("a", 4)])
+    assert parser.update_pdf(path) == [3]
+    assert _state(parser) == _state(_fresh(path))
+
+
+def test_removed_pages_are_retracted(edition):
+    parser = _fresh(edition(FIRST_EDITION))
+    path = edition([("a", 1), ("a", 4)])
+    assert parser.update_pdf(path) == []
+    assert _state(parser) == _state(_fresh(path))
+    assert sorted(key[1] for key in parser.page_records) == [1, 2]
+
+
+def test_reordered_pages_are_reused(edition):
+    parser = _fresh(edition(FIRST_EDITION))
+    path = edition(list(reversed(FIRST_EDITION)))
+    assert parser.update_pdf(path) == []
+    assert _state(parser) == _state(_fresh(path))
+
+
+def test_round_trip_restores_first_edition(edition):
+    path = edition(FIRST_EDITION)
+    parser = _fresh(path)
+    before = _state(_fresh(path))
+    edition([("b", 1), ("a", 5), ("b", 0)])
+    parser.update_pdf(path)
+    edition(FIRST_EDITION)
+    assert parser.update_pdf(path) == [1, 2, 3, 4, 5]
+    assert _state(parser) == before
+
+
+def test_update_invalidates_queries(edition):
+    parser = _fresh(edition(FIRST_EDITION))
+    matrix = parser.vacancy_matrix
+    path = edition([("b", 0), ("b", 1)])
+    parser.update_pdf(path)
+    fresh = _fresh(path)
+    assert parser.vacancy_matrix == fresh.vacancy_matrix
+    assert parser.vacancy_matrix != matrix
+
+
+def test_remove_pdf_keeps_other_sources(edition, tmp_path):
+    path = edition(FIRST_EDITION)
+    other = str(tmp_path / "other.pdf")
+    shutil.copy(edition([("b", 0), ("b", 1)]), other)
+    edition(FIRST_EDITION)
+    
+    parser = TimetableParser()
+    parser.parse_pdfs([path, other], workers=1)
+    assert parser.remove_pdf(path) == 6
+    assert _state(parser) == _state(_fresh(other))
@@ -0,0 +1,101 @@
+"""
+On-disk parse cache for timetable PDFs.
+Entries are keyed by the PDF's content hash plus the parser version, so an
+unchanged PDF is never handed to pdfplumber twice and a parser upgrade
+invalidates every old entry automatically.
+"""
+
+import os
+import json
+import hashlib
+from typing import Dict, Optional
+
+
+DEFAULT_CACHE_DIR = ".tt_cache"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024  # 64 MB
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Hash a file's content without reading it into memory at once"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """Content-addressed cache of parsed timetable data with size-bounded eviction"""
+    
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+    
+    def key_for(self, pdf_path: str, parser_version: str) -> str:
+        """Cache key for a PDF: hash of its content and the parser version"""
+        return f"{file_sha256(pdf_path)[:32]}-v{parser_version}"
+    
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+    
+    def load(self, key: str) -> Optional[Dict]:
+        """Return the cached data for a key, or None on a miss"""
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        
+        # Touch the entry so eviction drops the least recently used first
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+    
+    def store(self, key: str, data: Dict):
+        """Write an entry atomically, then evict old entries over the size limit"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._entry_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+        
+        self.evict(keep=path)
+    
+    def evict(self, keep: Optional[str] = None):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+    
+    def clear(self):
+        """Remove every cache entry"""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.json'):
+                os.remove(os.path.join(self.cache_dir, name))
@@ -0,0 +1,150 @@
+"""
+Date-aware occupancy: the weekly grid plus a calendar of exceptions.
+The calendar is a JSON file:
+
+    {
+        "holidays": ["2026-10-20", {"from": "2026-11-09", "to": "2026-11-13", "name": "Exams"}],
+        "day_swaps": [{"date": "2026-10-24", "follows": "Mo"}],
+        "cancellations": [{"date": "2026-10-21", "slot": 3, "rooms": ["S-606"]},
+                          {"date": "2026-10-22", "rooms": ["604"]}],
+        "bookings": [{"date": "2026-10-22", "slot": 5, "rooms": ["604", "605"]}]
+    }
+
+Holidays have no classes. A swapped date follows another weekday's grid
+(e.g. a Saturday running Monday's timetable). Cancellations free rooms on
+a date (every room if "rooms" is left out, every slot if "slot" is), and
+bookings occupy them; rooms that are not in the timetable are ignored.
+Exceptions are compiled once into per-date lists of per-slot occupied
+masks; dates without exceptions share their weekday's list, so a date
+query is a dict lookup and a mask read, never a replay of the overrides.
+"""
+
+import json
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from tt_occupancy import OccupancyIndex
+
+
+def _date(value: str) -> date:
+    return date.fromisoformat(value)
+
+
+class OccupancyCalendar:
+    """
+    Effective occupancy of an OccupancyIndex on calendar dates.
+    
+    Args:
+        index: Weekly occupancy index
+        config: Parsed calendar config (see module docstring), or None
+    """
+    
+    def __init__(self, index: OccupancyIndex, config: Optional[Dict] = None):
+        self.index = index
+        self._slot_ids = {slot: i for i, slot in enumerate(index.slots)}
+        n_slots = len(index.slots)
+        # Occupied mask per slot for each weekday; days without classes are empty
+        empty = [0] * n_slots
+        self._weekday_masks: List[List[int]] = [
+            [index.occupied_mask(index.days[weekday], slot) for slot in index.slots]
+            if weekday < len(index.days) else empty
+            for weekday in range(7)
+        ]
+        # Dates that do not follow their own weekday: the day they follow,
+        # or None for holidays
+        self.follows: Dict[date, Optional[str]] = {}
+        self.holidays: Dict[date, str] = {}
+        # Compiled masks of every date with an exception
+        self._masks: Dict[date, List[int]] = {}
+        self._compile(config or {})
+    
+    @classmethod
+    def from_config_file(cls, index: OccupancyIndex, config_path: str) -> "OccupancyCalendar":
+        with open(config_path, "r", encoding="utf-8") as f:
+            return cls(index, json.load(f))
+    
+    def _rooms_mask(self, rooms: Optional[Iterable[str]]) -> int:
+        if rooms is None:
+            return self.index.all_rooms_mask
+        room_ids = self.index.room_ids
+        mask = 0
+        for room in rooms:
+            if room in room_ids:
+                mask |= 1 << room_ids[room]
+        return mask
+    
+    def _slot_indexes(self, entry: Dict) -> List[int]:
+        if "slot" not in entry:
+            return list(range(len(self.index.slots)))
+        slot = entry["slot"]
+        if slot not in self._slot_ids:
+            raise ValueError(f"Invalid slot {slot} in calendar entry for {entry.get('date')}")
+        return [self._slot_ids[slot]]
+    
+    def _editable_masks(self, on: date) -> List[int]:
+        masks = self._masks.get(on)
+        if masks is None:
+            masks = self._masks[on] = list(self.occupied_masks(on))
+        return masks
+    
+    def _compile(self, config: Dict):
+        """Fold every exception into the per-date masks"""
+        days = self.index.days
+        for entry in config.get("day_swaps", []):
+            if entry["follows"] not in days:
+                raise ValueError(f"Invalid day '{entry['follows']}'. Must be one of {days}")
+            self.follows[_date(entry["date"])] = entry["follows"]
+        
+        # A holiday wins over a day swap on the same date
+        for entry in config.get("holidays", []):
+            if isinstance(entry, str):
+                entry = {"date": entry}
+            first = _date(entry.get("date") or entry["from"])
+            last = _date(entry["to"]) if "to" in entry else first
+            for offset in range((last - first).days + 1):
+                on = first + timedelta(days=offset)
+                self.follows[on] = None
+                self.holidays[on] = entry.get("name", "Holiday")
+        
+        for on, day in self.follows.items():
+            self._masks[on] = (list(self._weekday_masks[days.index(day)]) if day is not None
+                               else [0] * len(self.index.slots))
+        
+        for entry in config.get("cancellations", []):
+            masks = self._editable_masks(_date(entry["date"]))
+            freed = self._rooms_mask(entry.get("rooms"))
+            for i in self._slot_indexes(entry):
+                masks[i] &= ~freed
+        
+        for entry in config.get("bookings", []):
+            masks = self._editable_masks(_date(entry["date"]))
+            booked = self._rooms_mask(entry["rooms"])
+            for i in self._slot_indexes(entry):
+                masks[i] |= booked
+    
+    @property
+    def last_exception(self) -> Optional[date]:
+        """Last date with an exception; the weekly grid repeats after it"""
+        return max(self._masks, default=None)
+    
+    def grid_day(self, on: date) -> Optional[str]:
+        """Weekday whose timetable a date follows; None on holidays and weekends"""
+        if on in self.follows:
+            return self.follows[on]
+        weekday = on.weekday()
+        return self.index.days[weekday] if weekday < len(self.index.days) else None
+    
+    def occupied_masks(self, on: date) -> List[int]:
+        """Occupied room mask of every slot on a date, in slot order"""
+        masks = self._masks.get(on)
+        return masks if masks is not None else self._weekday_masks[on.weekday()]
+    
+    def occupied_mask(self, on: date, slot: int) -> int:
+        if slot not in self._slot_ids:
+            raise ValueError(f"Invalid slot number {slot}. Must be one of {self.index.slots}")
+        return self.occupied_masks(on)[self._slot_ids[slot]]
+    
+    def vacant_rooms(self, on: date, slot: int) -> List[str]:
+        """Rooms vacant in a slot on a date, exceptions included"""
+        index = self.index
+        return index.rooms_from_mask(index.all_rooms_mask & ~self.occupied_mask(on, slot))
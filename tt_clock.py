@@ -0,0 +1,126 @@
+"""
+Temporal index over the weekly slot grid.
+Slot boundaries are precomputed once as minute-of-week offsets and searched
+with bisect, so "what slot is it" never re-parses time strings. Cells are
+numbered in time order (day by day, slot by slot), the same order
+OccupancyIndex uses for its room masks, which lets "next free/busy" lookups
+work directly on those masks.
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+
+def _minutes(hh_mm: str) -> int:
+    hours, minutes = hh_mm.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+class SlotClock:
+    """Minute-of-week boundaries of every (day, slot) cell"""
+    
+    def __init__(self, days: List[str], time_slots: Dict):
+        self.days = list(days)
+        slots = sorted(time_slots)
+        self.slots_per_day = len(slots)
+        # cells[i] is the i-th class period of the week
+        self.cells: List[Tuple[str, int]] = []
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        for d, day in enumerate(self.days):
+            for slot in slots:
+                self.cells.append((day, slot))
+                self.starts.append(d * MINUTES_PER_DAY + _minutes(time_slots[slot].start_time))
+                self.ends.append(d * MINUTES_PER_DAY + _minutes(time_slots[slot].end_time))
+    
+    @staticmethod
+    def minute_of_week(moment: datetime) -> int:
+        """Minutes since Monday 00:00 (seconds are dropped)"""
+        return moment.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+    
+    @staticmethod
+    def minute_of_day(moment: datetime) -> int:
+        """Minutes since midnight; the first day's cells use the same offsets"""
+        return moment.hour * 60 + moment.minute
+    
+    @staticmethod
+    def week_start(moment: datetime) -> datetime:
+        """Monday 00:00 of the week containing moment"""
+        midnight = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+        return midnight - timedelta(days=moment.weekday())
+    
+    def to_datetime(self, moment: datetime, minute_of_week: int) -> datetime:
+        """Turn a minute-of-week offset (may exceed one week) into a datetime"""
+        return self.week_start(moment) + timedelta(minutes=minute_of_week)
+    
+    def locate(self, minute: int) -> Tuple[Optional[int], Optional[int]]:
+        """
+        (current cell, next cell) for a minute of the week.
+        The current cell is None between slots; the next cell is None after
+        the last slot of the week.
+        """
+        i = bisect_right(self.starts, minute) - 1
+        current = i if i >= 0 and minute < self.ends[i] else None
+        upcoming = i + 1 if i + 1 < len(self.cells) else None
+        return current, upcoming
+    
+    def same_day(self, a: int, b: int) -> bool:
+        """Whether two cells fall on the same day"""
+        return a // self.slots_per_day == b // self.slots_per_day
+    
+    def slot_at(self, moment: datetime) -> Optional[Tuple[str, int]]:
+        """(day, slot) running at a moment, or None outside class periods"""
+        current, _ = self.locate(self.minute_of_week(moment))
+        return self.cells[current] if current is not None else None
+    
+    def slot_for_vacancy(self, moment: datetime,
+                         day: Optional[str] = None) -> Optional[Tuple[str, int]]:
+        """
+        The slot a "vacant now" question is about: the running slot, or
+        during a short break between two slots of a day, the one about to
+        start. None before the first and after the last slot of a day.
+        With day given, moment's time of day is looked up in that day's
+        slots instead of its own weekday's (for dates that follow another
+        day's timetable).
+        """
+        minute = self.minute_of_week(moment)
+        if day is not None:
+            minute = self.days.index(day) * MINUTES_PER_DAY + minute % MINUTES_PER_DAY
+        current, upcoming = self.locate(minute)
+        if current is not None:
+            return self.cells[current]
+        if upcoming is not None and upcoming > 0 and self.same_day(upcoming - 1, upcoming):
+            return self.cells[upcoming]
+        return None
+    
+    def day_slots_overlapping(self, moment: datetime, minutes: int) -> List[Tuple[date, List[int]]]:
+        """
+        Slot positions (0-based, in slot order) whose class period overlaps
+        the given number of minutes from moment, per calendar date; for
+        lookups on dates that may not follow their own weekday
+        """
+        n_slots = self.slots_per_day
+        starts, ends = self.starts[:n_slots], self.ends[:n_slots]
+        start = self.minute_of_day(moment)
+        end = start + minutes
+        result = []
+        for offset in range(0, max(end, 1), MINUTES_PER_DAY):
+            first = bisect_right(ends, max(start, offset) - offset)
+            last = bisect_left(starts, min(end, offset + MINUTES_PER_DAY) - offset)
+            if first < last:
+                result.append((moment.date() + timedelta(days=offset // MINUTES_PER_DAY),
+                               list(range(first, last))))
+        return result
+    
+    def cells_overlapping(self, start_minute: int, end_minute: int) -> List[int]:
+        """Cells whose class period overlaps [start_minute, end_minute), wrapping into next week"""
+        first = bisect_right(self.ends, start_minute)
+        last = bisect_left(self.starts, end_minute)
+        cells = list(range(first, max(first, last)))
+        if end_minute > MINUTES_PER_WEEK:
+            cells.extend(range(0, bisect_left(self.starts, end_minute - MINUTES_PER_WEEK)))
+        return cells
@@ -0,0 +1,177 @@
+"""
+Occupancy diff between two timetable editions.
+Each room's week is a bitmask with one bit per (day, slot) cell, so the
+cells a room changed in are old_mask ^ new_mask: bits also set in the old
+mask were freed, bits set in the new mask were newly occupied. Rooms are
+matched by name, so editions with different room tables (rooms added or
+dropped, hence different room IDs) line up without remapping any masks.
+When both editions have the same room table, whole (day, slot) cell masks
+are XOR-ed instead.
+Usage: python tt_diff.py old_timetable new_timetable [--json output.json]
+"""
+
+import sys
+import json
+import argparse
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Union
+
+from tt_occupancy import OccupancyIndex
+
+if TYPE_CHECKING:
+    from tt_parser import TimetableParser
+
+
+class SlotChange(NamedTuple):
+    """Rooms whose occupancy changed in one (day, slot) cell"""
+    day: str
+    slot: int
+    freed: List[str]
+    occupied: List[str]
+
+
+class EditionDiff(NamedTuple):
+    """Everything that changed between two editions, in (day, slot) order"""
+    changes: List[SlotChange]
+    rooms_added: List[str]
+    rooms_removed: List[str]
+    
+    def __bool__(self) -> bool:
+        return bool(self.changes or self.rooms_added or self.rooms_removed)
+    
+    @property
+    def changed_cells(self) -> int:
+        """Number of changed (room, day, slot) cells"""
+        return sum(len(change.freed) + len(change.occupied) for change in self.changes)
+    
+    def to_dict(self) -> Dict:
+        """Compact JSON-able change list: {"freed": {day: {slot: [rooms]}}, ...}"""
+        freed: Dict[str, Dict[str, List[str]]] = {}
+        occupied: Dict[str, Dict[str, List[str]]] = {}
+        for change in self.changes:
+            if change.freed:
+                freed.setdefault(change.day, {})[str(change.slot)] = change.freed
+            if change.occupied:
+                occupied.setdefault(change.day, {})[str(change.slot)] = change.occupied
+        return {
+            "changed_cells": self.changed_cells,
+            "freed": freed,
+            "occupied": occupied,
+            "rooms_added": self.rooms_added,
+            "rooms_removed": self.rooms_removed,
+        }
+
+
+# Anything diff_editions can compare: a parser, an index, or a timetable path
+# (JSON export, .snap snapshot, PDF or folder of PDFs)
+Edition = Union[str, OccupancyIndex, "TimetableParser"]
+
+
+def load_index(edition: Edition) -> OccupancyIndex:
+    """The occupancy index of a parser, snapshot or timetable file"""
+    if isinstance(edition, OccupancyIndex):
+        return edition
+    if isinstance(edition, str):
+        if edition.lower().endswith(".snap"):
+            # Snapshots already hold the masks; no parser needed
+            from tt_snapshot import Snapshot
+            with Snapshot(edition) as snapshot:
+                return snapshot.to_index()
+        from tt_parser import TimetableParser
+        return TimetableParser.from_file(edition).index
+    return edition.index
+
+
+def _cell_masks_diff(old: OccupancyIndex, new: OccupancyIndex) -> List[SlotChange]:
+    """Per-cell XOR, for two indexes with the same room table"""
+    changes = []
+    for cell_id, (old_mask, new_mask) in enumerate(zip(old.cell_masks, new.cell_masks)):
+        changed = old_mask ^ new_mask
+        if changed:
+            day = new.days[cell_id // len(new.slots)]
+            slot = new.slots[cell_id % len(new.slots)]
+            changes.append(SlotChange(day, slot, new.rooms_from_mask(changed & old_mask),
+                                      new.rooms_from_mask(changed & new_mask)))
+    return changes
+
+
+def _room_masks_diff(old: OccupancyIndex, new: OccupancyIndex) -> List[SlotChange]:
+    """Per-room XOR of week masks, matching rooms by name"""
+    n_cells = len(new.cell_masks)
+    freed: List[List[str]] = [[] for _ in range(n_cells)]
+    occupied: List[List[str]] = [[] for _ in range(n_cells)]
+    
+    # Sorted, so every cell's room lists come out sorted
+    for room in sorted(set(old.rooms) | set(new.rooms)):
+        old_id, new_id = old.room_ids.get(room), new.room_ids.get(room)
+        old_mask = old.room_masks[old_id] if old_id is not None else 0
+        new_mask = new.room_masks[new_id] if new_id is not None else 0
+        changed = old_mask ^ new_mask
+        while changed:
+            low = changed & -changed
+            cell_id = low.bit_length() - 1
+            (freed if old_mask & low else occupied)[cell_id].append(room)
+            changed ^= low
+    
+    return [
+        SlotChange(new.days[cell_id // len(new.slots)], new.slots[cell_id % len(new.slots)],
+                   freed[cell_id], occupied[cell_id])
+        for cell_id in range(n_cells)
+        if freed[cell_id] or occupied[cell_id]
+    ]
+
+
+def diff_indexes(old: OccupancyIndex, new: OccupancyIndex) -> EditionDiff:
+    """Occupancy changes from one index to another"""
+    if old.days != new.days or old.slots != new.slots:
+        raise ValueError("Cannot diff timetables with different days or slots")
+    
+    if old.rooms == new.rooms:
+        return EditionDiff(_cell_masks_diff(old, new), [], [])
+    
+    old_rooms, new_rooms = set(old.rooms), set(new.rooms)
+    return EditionDiff(_room_masks_diff(old, new),
+                       sorted(new_rooms - old_rooms), sorted(old_rooms - new_rooms))
+
+
+def diff_editions(old: Edition, new: Edition) -> EditionDiff:
+    """Occupancy changes between two editions (parsers, indexes or timetable paths)"""
+    return diff_indexes(load_index(old), load_index(new))
+
+
+def print_diff(diff: EditionDiff):
+    """Print a readable change list"""
+    print(f"\n{'='*60}")
+    print("TIMETABLE CHANGES")
+    print(f"{'='*60}")
+    if not diff:
+        print("[OK] No occupancy changes")
+    for change in diff.changes:
+        if change.freed:
+            print(f"  {change.day} slot {change.slot}: freed    {', '.join(change.freed)}")
+        if change.occupied:
+            print(f"  {change.day} slot {change.slot}: occupied {', '.join(change.occupied)}")
+    if diff.rooms_added:
+        print(f"  New rooms: {', '.join(diff.rooms_added)}")
+    if diff.rooms_removed:
+        print(f"  Rooms no longer in the timetable: {', '.join(diff.rooms_removed)}")
+    print(f"{'='*60}")
+    print(f"  {diff.changed_cells} changed cell(s) in {len(diff.changes)} slot(s)")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Occupancy changes between two timetable editions")
+    arg_parser.add_argument("old", help="old edition: JSON export, .snap, PDF or folder of PDFs")
+    arg_parser.add_argument("new", help="new edition, in any of the same formats")
+    arg_parser.add_argument("--json", help="write the change list to this JSON file")
+    args = arg_parser.parse_args()
+    
+    diff = diff_editions(args.old, args.new)
+    print_diff(diff)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(diff.to_dict(), f, indent=2)
+        print(f"\n[OK] Change list written to {args.json}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,309 @@
+"""
+Geometry-learned fast table extraction.
+Every page of a roomwise timetable PDF draws the same grid: a slot header
+row, one row per day and eight slot columns. Instead of running pdfplumber's
+generic line/edge detection on every page, the grid's row and column
+boundaries are learned from the first page of each layout with find_tables.
+Other pages are read with pdfium (already a pdfplumber dependency): their
+ruling lines are checked against the template, which also reveals merged
+cells, and their characters are binned by center straight into cells and
+joined with pdfplumber's own extract_text, as extract_tables would. Pages
+whose ruling fits no template fall back to extract_tables.
+"""
+
+import math
+import ctypes
+from bisect import bisect_right
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from tt_metrics import NULL_METRICS, NullMetrics
+
+# pdfplumber's default snap/join tolerance for table edges
+TOLERANCE = 3.0
+
+# Grid layouts remembered per PDF; older ones are dropped first
+MAX_TEMPLATES = 4
+
+# A table as extract_tables returns it: None marks the continuation of a merged cell
+Table = List[List[Optional[str]]]
+
+# Vertical edges as (x, top, bottom), horizontal edges as (y, x0, x1)
+Edges = Tuple[List[Tuple[float, float, float]], List[Tuple[float, float, float]]]
+
+
+class GridTemplate(NamedTuple):
+    """Row and column boundaries of a timetable grid, in pdfplumber's top-down coordinates"""
+    page_width: float
+    page_height: float
+    xs: List[float]
+    ys: List[float]
+    
+    @classmethod
+    def learn(cls, page, table) -> Optional["GridTemplate"]:
+        """Learn the grid of a pdfplumber page from one of its find_tables results"""
+        xs = _cluster([x for cell in table.cells for x in (cell[0], cell[2])])
+        ys = _cluster([y for cell in table.cells for y in (cell[1], cell[3])])
+        if len(xs) < 3 or len(ys) < 3:
+            return None
+        return cls(float(page.width), float(page.height), xs, ys)
+    
+    def _index(self, bounds: List[float], value: float) -> Optional[int]:
+        """Position of the boundary within TOLERANCE of value, if any"""
+        i = bisect_right(bounds, value)
+        for j in (i - 1, i):
+            if 0 <= j < len(bounds) and abs(bounds[j] - value) <= TOLERANCE:
+                return j
+        return None
+    
+    def cell_spans(self, edges: Edges) -> Optional[List[List[Tuple[int, int]]]]:
+        """
+        Per row, the [first, last) column ranges of the page's cells, or None
+        when the page's ruling does not fit the template.
+        Interior column boundaries may be missing (merged cells); anything
+        else - extra lines, missing row boundaries - is a mismatch.
+        """
+        vertical, horizontal = edges
+        left, right, top, bottom = self.xs[0], self.xs[-1], self.ys[0], self.ys[-1]
+        n_rows, n_cols = len(self.ys) - 1, len(self.xs) - 1
+        
+        # Horizontal rules: on a template row boundary, spanning the table
+        covered_rows: Dict[int, List[Tuple[float, float]]] = {}
+        for y, x0, x1 in horizontal:
+            if x1 < left - TOLERANCE or x0 > right + TOLERANCE or \
+                    y < top - TOLERANCE or y > bottom + TOLERANCE:
+                continue
+            row = self._index(self.ys, y)
+            if row is None:
+                return None
+            covered_rows.setdefault(row, []).append((x0, x1))
+        for row in range(n_rows + 1):
+            if not _covers(covered_rows.get(row, []), left, right):
+                return None
+        
+        # Vertical rules: on a template column boundary
+        covered_cols: Dict[int, List[Tuple[float, float]]] = {}
+        for x, y0, y1 in vertical:
+            if y1 < top - TOLERANCE or y0 > bottom + TOLERANCE or \
+                    x < left - TOLERANCE or x > right + TOLERANCE:
+                continue
+            col = self._index(self.xs, x)
+            if col is None:
+                return None
+            covered_cols.setdefault(col, []).append((y0, y1))
+        
+        spans = []
+        for row in range(n_rows):
+            y0, y1 = self.ys[row], self.ys[row + 1]
+            present = [_covers(covered_cols.get(col, []), y0, y1) for col in range(n_cols + 1)]
+            if not (present[0] and present[-1]):
+                return None
+            row_spans, start = [], 0
+            for col in range(1, n_cols + 1):
+                if present[col]:
+                    row_spans.append((start, col))
+                    start = col
+            spans.append(row_spans)
+        return spans
+
+
+def _cluster(values: List[float]) -> List[float]:
+    """Sorted distinct values, merging those within TOLERANCE of each other"""
+    result: List[float] = []
+    for value in sorted(values):
+        if result and value - result[-1] <= TOLERANCE:
+            continue
+        result.append(value)
+    return result
+
+
+def _covers(segments: List[Tuple[float, float]], start: float, end: float) -> bool:
+    """Whether segments (joined across gaps up to TOLERANCE) cover [start, end]"""
+    reach = start + TOLERANCE
+    for a, b in sorted(segments):
+        if a > reach + TOLERANCE:
+            break
+        reach = max(reach, b)
+    return reach >= end - TOLERANCE
+
+
+def _page_edges(page, page_height: float) -> Optional[Edges]:
+    """
+    Straight ruling lines and rectangle sides of a pdfium page, as
+    pdfplumber would turn them into table edges; None for other paths.
+    """
+    import pypdfium2.raw as pdfium_c
+    
+    vertical, horizontal = [], []
+    x, y = ctypes.c_float(), ctypes.c_float()
+    for obj in page.get_objects(filter=(pdfium_c.FPDF_PAGEOBJ_PATH,), max_depth=1):
+        a, b, c, d, e, f = obj.get_matrix().get()
+        points = []
+        for i in range(pdfium_c.FPDFPath_CountSegments(obj)):
+            segment = pdfium_c.FPDFPath_GetPathSegment(obj, i)
+            if pdfium_c.FPDFPathSegment_GetType(segment) == pdfium_c.FPDF_SEGMENT_BEZIERTO:
+                return None
+            pdfium_c.FPDFPathSegment_GetPoint(segment, x, y)
+            points.append((a * x.value + c * y.value + e,
+                           page_height - (b * x.value + d * y.value + f)))
+        if len(points) < 2:
+            continue
+        xs = [px for px, _ in points]
+        ys = [py for _, py in points]
+        x0, x1, top, bottom = min(xs), max(xs), min(ys), max(ys)
+        if len(points) == 2:
+            if x1 - x0 < 0.01:
+                vertical.append((x0, top, bottom))
+            elif bottom - top < 0.01:
+                horizontal.append((top, x0, x1))
+            else:
+                return None  # Diagonal line
+        elif all(px in (x0, x1) and py in (top, bottom) for px, py in points):
+            # Axis-aligned rectangle: all four sides become edges
+            vertical += [(x0, top, bottom), (x1, top, bottom)]
+            horizontal += [(top, x0, x1), (bottom, x0, x1)]
+        else:
+            return None
+    return vertical, horizontal
+
+
+def _page_chars(page, page_height: float) -> List[Dict]:
+    """Characters of a pdfium page as pdfplumber-style char dicts"""
+    import pypdfium2.raw as pdfium_c
+    
+    textpage = page.get_textpage()
+    try:
+        raw_page = textpage.raw
+        rect, matrix = pdfium_c.FS_RECTF(), pdfium_c.FS_MATRIX()
+        chars = []
+        for i in range(pdfium_c.FPDFText_CountChars(raw_page)):
+            if pdfium_c.FPDFText_IsGenerated(raw_page, i) == 1:
+                continue
+            code = pdfium_c.FPDFText_GetUnicode(raw_page, i)
+            if code in (0, 10, 13):
+                continue
+            # The loose box's bottom sits at the font descent, like pdfminer's
+            # chars; pdfminer's box is then one (scaled) font size tall
+            pdfium_c.FPDFText_GetLooseCharBox(raw_page, i, rect)
+            pdfium_c.FPDFText_GetMatrix(raw_page, i, matrix)
+            size = pdfium_c.FPDFText_GetFontSize(raw_page, i) * math.hypot(matrix.b, matrix.d)
+            bottom = page_height - rect.bottom
+            chars.append({
+                "text": chr(code), "x0": rect.left, "x1": rect.right,
+                "top": bottom - size, "bottom": bottom, "doctop": bottom - size,
+                "height": size, "size": size, "upright": True,
+            })
+        return chars
+    finally:
+        textpage.close()
+
+
+def extract_table(page, template: GridTemplate) -> Optional[Table]:
+    """
+    Read a pdfium page's timetable through the template.
+    Returns the table in extract_tables form, or None if the page does not
+    match the template.
+    """
+    from pdfplumber.utils import extract_text
+    
+    width, height = page.get_size()
+    if abs(width - template.page_width) > 1 or abs(height - template.page_height) > 1:
+        return None
+    
+    edges = _page_edges(page, height)
+    spans = template.cell_spans(edges) if edges is not None else None
+    if spans is None:
+        return None
+    
+    xs, ys = template.xs, template.ys
+    n_cols = len(xs) - 1
+    binned: List[List[List[Dict]]] = [[[] for _ in range(n_cols)] for _ in spans]
+    # Cell of each column per row; merged cells collect into their first column
+    owner = [[0] * n_cols for _ in spans]
+    for row, row_spans in enumerate(spans):
+        for start, end in row_spans:
+            for col in range(start, end):
+                owner[row][col] = start
+    
+    for char in _page_chars(page, height):
+        cx = (char["x0"] + char["x1"]) / 2
+        cy = (char["top"] + char["bottom"]) / 2
+        col = bisect_right(xs, cx) - 1
+        row = bisect_right(ys, cy) - 1
+        if 0 <= row < len(spans) and 0 <= col < n_cols:
+            binned[row][owner[row][col]].append(char)
+    
+    table: Table = []
+    for row, row_spans in enumerate(spans):
+        cells: List[Optional[str]] = [None] * n_cols
+        for start, _ in row_spans:
+            chars = binned[row][start]
+            cells[start] = extract_text(chars) if chars else ""
+        table.append(cells)
+    return table
+
+
+def iter_page_occupancy_fast(pdf_path: str, page_numbers: Optional[List[int]] = None,
+                             metrics: NullMetrics = NULL_METRICS) -> Iterator:
+    """
+    iter_page_occupancy with geometry-learned extraction.
+    A page that matches none of the templates learned so far goes through
+    pdfplumber's find_tables, and its grid becomes a new template, so each
+    distinct layout in the PDF pays for generic detection only once.
+    Fingerprints still come from pdfplumber so they match a normal parse.
+    """
+    import time
+    import pypdfium2 as pdfium
+    from tt_parser import PageOccupancy, _open_pdf, _source_name, _table_records, page_fingerprint
+    
+    enabled = metrics.enabled
+    source = _source_name(pdf_path)
+    templates: List[GridTemplate] = []
+    
+    with metrics.stage("open"):
+        pdf = _open_pdf(pdf_path, page_numbers)
+        document = pdfium.PdfDocument(pdf_path)
+    
+    try:
+        for page in pdf.pages:
+            if enabled:
+                start = time.perf_counter()
+            try:
+                with metrics.stage("fingerprint"):
+                    fingerprint = page_fingerprint(page)
+                
+                table = None
+                with metrics.stage("extract_fast"):
+                    pdfium_page = document[page.page_number - 1]
+                    try:
+                        # Most recently learned first: layouts come in runs of pages
+                        for template in reversed(templates):
+                            table = extract_table(pdfium_page, template)
+                            if table is not None:
+                                break
+                    finally:
+                        pdfium_page.close()
+                
+                if table is None:
+                    metrics.count("template_fallbacks")
+                    with metrics.stage("extract_tables"):
+                        found = page.find_tables()
+                        table = found[0].extract() if found else None
+                    template = GridTemplate.learn(page, found[0]) if found else None
+                    if template is not None:
+                        templates = templates[-(MAX_TEMPLATES - 1):] + [template]
+                
+                with metrics.stage("process_table"):
+                    records = _table_records(table, metrics) if table else []
+            finally:
+                page.close()
+            
+            if enabled:
+                metrics.page(source, page.page_number, time.perf_counter() - start)
+                metrics.count("pages")
+                if not table:
+                    metrics.count("pages_without_table")
+            
+            yield PageOccupancy(page.page_number, fingerprint, records)
+    finally:
+        document.close()
+        pdf.close()
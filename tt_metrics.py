@@ -0,0 +1,226 @@
+"""
+Instrumentation hooks for the parse pipeline.
+TimetableParser reports stage timings, counters and per-page timings to a
+metrics sink. The default NullMetrics sink ignores everything and the hot
+loops check `metrics.enabled` before taking any timestamp, so the hooks can
+stay in production code. RecordingMetrics keeps the numbers in memory and
+can optionally run cProfile and tracemalloc around a whole parse.
+"""
+
+import io
+import time
+import heapq
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# (seconds, source, page_number)
+PageTiming = Tuple[float, str, int]
+
+
+class _NullStage:
+    """Reusable no-op context manager returned by NullMetrics.stage"""
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class NullMetrics:
+    """Metrics sink that discards everything (the default)"""
+    
+    enabled = False
+    
+    def stage(self, name: str):
+        """Context manager timing one stage"""
+        return _NULL_STAGE
+    
+    def add_time(self, name: str, seconds: float):
+        """Add time spent in a stage"""
+    
+    def count(self, name: str, n: int = 1):
+        """Increase a counter"""
+    
+    def page(self, source: str, page_number: int, seconds: float):
+        """Record how long one page took to extract"""
+    
+    def timed(self, func: Callable, name: str) -> Callable:
+        """Wrap a function so its calls are timed as a stage"""
+        return func
+    
+    def profile(self):
+        """Context manager around a whole parse (cProfile/tracemalloc when enabled)"""
+        return _NULL_STAGE
+    
+    def state(self) -> Dict:
+        """Picklable snapshot, used to send worker metrics to the parent process"""
+        return {}
+    
+    def merge(self, state: Dict):
+        """Add a snapshot produced by state() in another process"""
+
+
+NULL_METRICS = NullMetrics()
+
+
+class RecordingMetrics(NullMetrics):
+    """
+    Metrics sink that keeps stage times, counters and the slowest pages.
+    
+    Args:
+        outliers: Number of slowest pages to keep
+        profile_cpu: Run cProfile around each parse (main process only)
+        trace_memory: Track peak Python memory with tracemalloc during each parse
+    """
+    
+    enabled = True
+    
+    def __init__(self, outliers: int = 10, profile_cpu: bool = False, trace_memory: bool = False):
+        self.outliers = outliers
+        self.profile_cpu = profile_cpu
+        self.trace_memory = trace_memory
+        self.stage_seconds: Dict[str, float] = {}
+        self.stage_calls: Dict[str, int] = {}
+        self.counters: Dict[str, int] = {}
+        self.page_count = 0
+        self.page_seconds = 0.0
+        # Min-heap of the slowest pages seen so far
+        self._slowest: List[PageTiming] = []
+        self.cpu_profile: Optional[str] = None
+        self.peak_memory_bytes: Optional[int] = None
+    
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+    
+    def add_time(self, name: str, seconds: float):
+        self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + seconds
+        self.stage_calls[name] = self.stage_calls.get(name, 0) + 1
+    
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+    
+    def page(self, source: str, page_number: int, seconds: float):
+        self.page_count += 1
+        self.page_seconds += seconds
+        self._keep_if_slow((seconds, source, page_number))
+    
+    def _keep_if_slow(self, entry: PageTiming):
+        if len(self._slowest) < self.outliers:
+            heapq.heappush(self._slowest, entry)
+        elif entry > self._slowest[0]:
+            heapq.heapreplace(self._slowest, entry)
+    
+    def timed(self, func: Callable, name: str) -> Callable:
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add_time(name, time.perf_counter() - start)
+        return wrapper
+    
+    @contextmanager
+    def profile(self) -> Iterator[None]:
+        profiler = None
+        if self.profile_cpu:
+            import cProfile
+            profiler = cProfile.Profile()
+        tracing = False
+        if self.trace_memory:
+            import tracemalloc
+            tracing = not tracemalloc.is_tracing()
+            if tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        try:
+            if profiler is not None:
+                profiler.enable()
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                import pstats
+                out = io.StringIO()
+                pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(25)
+                self.cpu_profile = out.getvalue()
+            if self.trace_memory:
+                import tracemalloc
+                peak = tracemalloc.get_traced_memory()[1]
+                self.peak_memory_bytes = max(self.peak_memory_bytes or 0, peak)
+                if tracing:
+                    tracemalloc.stop()
+    
+    def slowest_pages(self) -> List[PageTiming]:
+        """Slowest pages, slowest first"""
+        return sorted(self._slowest, reverse=True)
+    
+    def state(self) -> Dict:
+        return {
+            "stage_seconds": dict(self.stage_seconds),
+            "stage_calls": dict(self.stage_calls),
+            "counters": dict(self.counters),
+            "page_count": self.page_count,
+            "page_seconds": self.page_seconds,
+            "slowest": list(self._slowest),
+        }
+    
+    def merge(self, state: Dict):
+        if not state:
+            return
+        for name, seconds in state["stage_seconds"].items():
+            self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + seconds
+        for name, calls in state["stage_calls"].items():
+            self.stage_calls[name] = self.stage_calls.get(name, 0) + calls
+        for name, n in state["counters"].items():
+            self.count(name, n)
+        self.page_count += state["page_count"]
+        self.page_seconds += state["page_seconds"]
+        for entry in state["slowest"]:
+            self._keep_if_slow(tuple(entry))
+    
+    def summary(self) -> Dict:
+        """JSON-serializable view of everything recorded"""
+        return {
+            "stages": {
+                name: {"seconds": round(seconds, 6), "calls": self.stage_calls[name]}
+                for name, seconds in sorted(self.stage_seconds.items(), key=lambda item: -item[1])
+            },
+            "counters": dict(sorted(self.counters.items())),
+            "pages": {
+                "count": self.page_count,
+                "seconds": round(self.page_seconds, 6),
+                "mean_ms": round(self.page_seconds / self.page_count * 1000, 3)
+                if self.page_count else None,
+                "slowest": [{"source": source, "page": page_number, "ms": round(seconds * 1000, 3)}
+                            for seconds, source, page_number in self.slowest_pages()],
+            },
+            "peak_memory_bytes": self.peak_memory_bytes,
+        }
+    
+    def report(self):
+        """Print a readable summary of the recorded metrics"""
+        print(f"\n{'='*60}")
+        print("PARSE METRICS")
+        print(f"{'='*60}")
+        for name, seconds in sorted(self.stage_seconds.items(), key=lambda item: -item[1]):
+            print(f"  {name:24} {seconds:10.3f} s  ({self.stage_calls[name]} calls)")
+        for name, n in sorted(self.counters.items()):
+            print(f"  {name:24} {n:10}")
+        if self.page_count:
+            print(f"  {'mean page time':24} {self.page_seconds / self.page_count * 1000:10.1f} ms")
+        for seconds, source, page_number in self.slowest_pages():
+            print(f"  [SLOW] {source} page {page_number}: {seconds * 1000:.1f} ms")
+        if self.peak_memory_bytes is not None:
+            print(f"  {'peak Python memory':24} {self.peak_memory_bytes / (1024 * 1024):10.1f} MB")
+        print(f"{'='*60}")
+        if self.cpu_profile:
+            print(self.cpu_profile)
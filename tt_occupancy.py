@@ -0,0 +1,150 @@
+"""
+Bitset occupancy engine for timetable queries.
+Every room gets an integer ID (its position in the sorted room list) and
+occupancy is stored as Python int bitmasks:
+- one mask per (day, slot) cell with a bit per room
+- one mask per room with a bit per (day, slot) cell
+Vacancy and "free in all of these slots" queries become AND/OR/NOT on
+those masks, and because room IDs follow sort order, decoding a mask
+yields an already sorted room list.
+Free-run tables ("how many consecutive free slots start here") are built
+on first use, so window and "free until" questions are O(1) per room.
+"""
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+class OccupancyIndex:
+    """Rooms x (day, slot) occupancy stored as bitmasks"""
+    
+    def __init__(self, days: List[str], slots: List[int], rooms: Iterable[str]):
+        self.days = list(days)
+        self.slots = list(slots)
+        # Room ID == index in the sorted room list, so bit order is sort order
+        self.rooms: List[str] = sorted(rooms)
+        self.room_ids: Dict[str, int] = {room: i for i, room in enumerate(self.rooms)}
+        self.all_rooms_mask = (1 << len(self.rooms)) - 1
+        
+        self._cell_ids: Dict[Tuple[str, int], int] = {
+            (day, slot): d * len(self.slots) + s
+            for d, day in enumerate(self.days)
+            for s, slot in enumerate(self.slots)
+        }
+        # cell_masks[cell_id]: bit r set if room r is occupied in that cell
+        self.cell_masks: List[int] = [0] * len(self._cell_ids)
+        # room_masks[room_id]: bit c set if the room is occupied in cell c
+        self.room_masks: List[int] = [0] * len(self.rooms)
+        # Built lazily by _build_free_runs; masks must not change afterwards
+        self._free_runs: Optional[List[bytes]] = None
+        self._longest_runs: Optional[List[List[Tuple[int, int]]]] = None
+    
+    @classmethod
+    def from_sets(cls, days: List[str], slots: List[int], all_rooms: Set[str],
+                  occupied_rooms: Dict[str, Dict[int, Set[str]]]) -> "OccupancyIndex":
+        """Build an index from the parser's occupied_rooms[day][slot] sets"""
+        index = cls(days, slots, all_rooms)
+        room_ids = index.room_ids
+        for day in index.days:
+            for slot in index.slots:
+                cell_id = index._cell_ids[(day, slot)]
+                cell_bit = 1 << cell_id
+                mask = 0
+                for room in occupied_rooms[day][slot]:
+                    room_id = room_ids.get(room)
+                    if room_id is None:
+                        continue
+                    mask |= 1 << room_id
+                    index.room_masks[room_id] |= cell_bit
+                index.cell_masks[cell_id] = mask
+        return index
+    
+    def cell_id(self, day: str, slot: int) -> int:
+        """Position of a (day, slot) cell in the week"""
+        return self._cell_ids[(day, slot)]
+    
+    def rooms_from_mask(self, mask: int) -> List[str]:
+        """Decode a room bitmask into a sorted list of room numbers"""
+        rooms = self.rooms
+        # Least significant bit first, so positions are room IDs
+        bits = bin(mask)[:1:-1]
+        result = []
+        pos = bits.find('1')
+        while pos != -1:
+            result.append(rooms[pos])
+            pos = bits.find('1', pos + 1)
+        return result
+    
+    def occupied_mask(self, day: str, slot: int) -> int:
+        """Bitmask of rooms occupied in a (day, slot) cell"""
+        return self.cell_masks[self._cell_ids[(day, slot)]]
+    
+    def vacant_mask(self, day: str, slot: int) -> int:
+        """Bitmask of rooms vacant in a (day, slot) cell"""
+        return self.all_rooms_mask & ~self.cell_masks[self._cell_ids[(day, slot)]]
+    
+    def vacant_in_all_mask(self, cells: Iterable[Tuple[str, int]]) -> int:
+        """Bitmask of rooms vacant in every one of the given (day, slot) cells"""
+        busy = 0
+        for day, slot in cells:
+            busy |= self.cell_masks[self._cell_ids[(day, slot)]]
+        return self.all_rooms_mask & ~busy
+    
+    def vacant_rooms(self, day: str, slot: int) -> List[str]:
+        """Sorted list of rooms vacant in a (day, slot) cell"""
+        return self.rooms_from_mask(self.vacant_mask(day, slot))
+    
+    def vacant_in_all(self, cells: Iterable[Tuple[str, int]]) -> List[str]:
+        """Sorted list of rooms vacant in every one of the given cells"""
+        return self.rooms_from_mask(self.vacant_in_all_mask(cells))
+    
+    def is_occupied(self, room: str, day: str, slot: int) -> bool:
+        """Whether a room is occupied in a (day, slot) cell"""
+        room_id = self.room_ids.get(room)
+        if room_id is None:
+            return False
+        return bool(self.room_masks[room_id] >> self._cell_ids[(day, slot)] & 1)
+    
+    def room_mask(self, room: str) -> int:
+        """Bitmask of the cells in which a room is occupied"""
+        return self.room_masks[self.room_ids[room]]
+    
+    def _build_free_runs(self):
+        """
+        Precompute, for every room and cell, how many consecutive free slots
+        start there (until the end of that day), plus each room's longest
+        free stretch per day.
+        """
+        n_slots = len(self.slots)
+        free_runs = []
+        longest_runs = []
+        for mask in self.room_masks:
+            row = bytearray(len(self.cell_masks))
+            longest = []
+            for d in range(len(self.days)):
+                base = d * n_slots
+                run = best_start = best_len = 0
+                # Walk the day backwards so each run extends the one after it
+                for s in range(n_slots - 1, -1, -1):
+                    run = 0 if mask >> (base + s) & 1 else run + 1
+                    row[base + s] = run
+                    # >= keeps the earliest start among equally long stretches
+                    if run and run >= best_len:
+                        best_start, best_len = s, run
+                longest.append((best_start, best_len))
+            free_runs.append(bytes(row))
+            longest_runs.append(longest)
+        self._free_runs = free_runs
+        self._longest_runs = longest_runs
+    
+    def free_run(self, room: str, day: str, slot: int) -> int:
+        """Number of consecutive free slots for a room starting at (day, slot)"""
+        if self._free_runs is None:
+            self._build_free_runs()
+        return self._free_runs[self.room_ids[room]][self._cell_ids[(day, slot)]]
+    
+    def longest_free_run(self, room: str, day: str) -> Tuple[Optional[int], int]:
+        """(first slot, length) of a room's longest free stretch on a day"""
+        if self._longest_runs is None:
+            self._build_free_runs()
+        start, length = self._longest_runs[self.room_ids[room]][self.days.index(day)]
+        return (self.slots[start] if length else None), length
@@ -0,0 +1,132 @@
+"""
+Table of contents of a timetable PDF.
+Maps every page's label (the room or section name printed above its table,
+e.g. "104", "L-102A") and every section code that appears on the page
+(e.g. "23BCS_F") to page numbers, alongside each page's content
+fingerprint. It is built without any table extraction or layout analysis
+and stored in the parse cache keyed by the PDF's content hash, so
+TimetableParser can extract just the pages a query needs.
+"""
+
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from tt_cache import ParseCache
+
+
+# Bump when the label/section rules change so stored indexes are rebuilt
+PAGE_INDEX_VERSION = "1"
+
+# Label printed above the table: 104, 110B, L-102A, SS-107A, 201(Apple lab)
+_LABEL_RE = re.compile(r'^(\d{3}[A-Z]?|[A-Z]{1,3}-\d+[A-Z]?)(\s*\(.*\))?$')
+
+# Section codes as the cell tokenizer reads them: 23BCS_F, 23BET_N
+_SECTION_RE = re.compile(r'\d{2}[A-Z]{2,4}_[A-Z]')
+
+# The label is one of the first lines, after the department/semester heading
+LABEL_SEARCH_LINES = 10
+
+
+class PageEntry(NamedTuple):
+    """What the index knows about one page"""
+    page_number: int
+    fingerprint: str
+    label: Optional[str]
+    sections: List[str]
+
+
+def page_label(text: str) -> Optional[str]:
+    """The room/section label of a page, from its text; None if there is none"""
+    for line in text.splitlines()[:LABEL_SEARCH_LINES]:
+        line = line.strip()
+        if _LABEL_RE.match(line):
+            return line
+    return None
+
+
+def page_sections(text: str) -> List[str]:
+    """Section codes mentioned anywhere on a page, sorted"""
+    return sorted(set(_SECTION_RE.findall(text)))
+
+
+def _page_texts(pdf_path: str) -> Iterable[str]:
+    """Plain text of every page, read with pdfium (far cheaper than pdfminer)"""
+    import pypdfium2 as pdfium
+    
+    document = pdfium.PdfDocument(pdf_path)
+    try:
+        for i in range(len(document)):
+            page = document[i]
+            textpage = page.get_textpage()
+            try:
+                yield textpage.get_text_range()
+            finally:
+                textpage.close()
+                page.close()
+    finally:
+        document.close()
+
+
+class PageIndex:
+    """Page labels and section codes of one PDF, mapped to page numbers"""
+    
+    def __init__(self, pages: List[PageEntry]):
+        self.pages = pages
+        self.by_number: Dict[int, PageEntry] = {page.page_number: page for page in pages}
+        self.by_label: Dict[str, List[int]] = {}
+        self.by_section: Dict[str, List[int]] = {}
+        for page in pages:
+            if page.label:
+                self.by_label.setdefault(page.label, []).append(page.page_number)
+            for section in page.sections:
+                self.by_section.setdefault(section, []).append(page.page_number)
+    
+    @classmethod
+    def build(cls, pdf_path: str) -> "PageIndex":
+        """
+        Index a PDF in one walk over its pages; no tables are extracted.
+        
+        Each page is read by two libraries: pdfium for the text (labels and
+        sections), and pdfminer for the fingerprint. The fingerprint must be
+        the one the parser stores with its page data, a hash of the raw
+        content streams, and pdfium has no API for raw stream bytes.
+        pdfminer only decodes the streams here, with no layout analysis,
+        so this costs about as much as the pdfium text (0.2 s each for
+        the bundled 76-page PDF).
+        """
+        from tt_parser import _open_pdf, page_fingerprint
+        
+        with _open_pdf(pdf_path) as pdf:
+            pages = [
+                PageEntry(page.page_number, page_fingerprint(page),
+                          page_label(text), page_sections(text))
+                for page, text in zip(pdf.pages, _page_texts(pdf_path))
+            ]
+        return cls(pages)
+    
+    @classmethod
+    def load(cls, pdf_path: str, cache: Optional[ParseCache] = None) -> "PageIndex":
+        """The stored index of a PDF, built and stored first if it has none"""
+        cache = cache or ParseCache()
+        key = cache.key_for(pdf_path, f"index{PAGE_INDEX_VERSION}")
+        data = cache.load(key)
+        if data is not None:
+            return cls.from_dict(data)
+        index = cls.build(pdf_path)
+        cache.store(key, index.to_dict())
+        return index
+    
+    def to_dict(self) -> Dict:
+        return {"pages": [list(page) for page in self.pages]}
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "PageIndex":
+        return cls([PageEntry(*page) for page in data["pages"]])
+    
+    def pages_for(self, identifier: str) -> List[int]:
+        """Pages labelled with, or mentioning the section, identifier"""
+        return sorted(set(self.by_label.get(identifier, [])) |
+                      set(self.by_section.get(identifier, [])))
+    
+    def fingerprint(self, page_number: int) -> str:
+        return self.by_number[page_number].fingerprint
@@ -4,13 +4,25 @@ This parser understands that the PDF contains SECTION-WISE timetables,
 where each page shows where a section has classes, not what's in a room.
 """
 
+import os
 import re
 import json
-from typing import Dict, List, Set, Optional
-from datetime import datetime
+import time
+import hashlib
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Set, Optional, Tuple, Union
+from datetime import date, datetime, timedelta
 from dataclasses import dataclass, asdict
-import pdfplumber
+from functools import lru_cache
 from collections import defaultdict
+from tt_cache import ParseCache
+from tt_occupancy import OccupancyIndex
+from tt_records import CellRecordStore, Schedule
+from tt_rooms import RoomInfo, RoomModel
+from tt_calendar import OccupancyCalendar
+from tt_snapshot import Snapshot, write_snapshot
+from tt_shards import LocalShardWriter, SyncResult, sync_shards
+from tt_clock import SlotClock
+from tt_metrics import NULL_METRICS, NullMetrics, RecordingMetrics
 
 
 @dataclass
@@ -35,105 +47,765 @@ TIME_SLOTS = {
 
 DAYS = ["Mo", "Tu", "We", "Th", "Fr"]
 
+# Minute-of-week boundaries of TIME_SLOTS, computed once
+SLOT_CLOCK = SlotClock(DAYS, TIME_SLOTS)
+
+# Bump whenever parsing output changes so cached results are invalidated
+PARSER_VERSION = "4"
+
+# A single occupied cell: (day, slot_number, room)
+Occupancy = Tuple[str, int, str]
+
+# Pages are tracked per source PDF: (source, page_number)
+PageKey = Tuple[str, int]
+
+# Snapshots and JSON exports written before page data was exported only
+# store which rooms are occupied, not by which section
+NO_SECTION_DATA = ("The loaded timetable has no section data; "
+                   "load the PDF(s) or a JSON export written by export_to_json")
+
+
+class CellRecord(NamedTuple):
+    """One occupied cell of a section's timetable"""
+    section: Optional[str]
+    day: str
+    slot: int
+    room: str
+    subject: Optional[str]
+
+
+class PageOccupancy(NamedTuple):
+    """Everything the parser keeps from one PDF page"""
+    page_number: int
+    fingerprint: str
+    records: List[CellRecord]
+
+
+class CellTokens(NamedTuple):
+    """Fields pulled out of one timetable cell"""
+    room: Optional[str]
+    section: Optional[str]
+    subject: Optional[str]
+
+
+# Room patterns in priority order: the first pattern with a match that is
+# not a year/ID wins, so 23BCS_F\nS-606 yields S-606 even if a 3-digit
+# number appears earlier in the cell
+_ROOM_RES = (
+    re.compile(r'\b([A-Z]{2,3}-\d+)\b'),         # SS-101, OT-801, PP-802
+    re.compile(r'\b([A-Z]-\d{3,4})\b'),          # S-606, L-307, M-703
+    re.compile(r'(?<!\d)(\d{3})(?!\d)'),         # 104, 605, 801 (not part of longer number)
+)
+# Only the 3-digit pattern can match a cell without a dash
+_PLAIN_ROOM_RES = _ROOM_RES[2:]
+
+_SECTION_RE = re.compile(r'\d{2}[A-Z]{2,4}_[A-Z]')  # 23BCS_F, 23BET_N
+
+# Leading subject code (CE, TOC, FS-LAB) before the teacher name or line end
+_SUBJECT_RE = re.compile(r'([A-Z]{2,}?(?:-LAB)?)(?:[A-Z]?[a-z]|\s|$)')
+
+# Years and employee IDs that look like room numbers
+_NOT_A_ROOM_RE = re.compile(r'(18|19|20)\d{2,3}|[Ee]\d{4,5}')
+
+_EMPTY_CELL = CellTokens(None, None, None)
+
+
+@lru_cache(maxsize=8192)
+def tokenize_cell(cell_text: str) -> CellTokens:
+    """
+    Extract room, section code and subject from a cell with precompiled
+    patterns, skipping the ones a cell cannot match (no dash: no lettered
+    room; no underscore: no section). Uncached this costs about what the
+    old room-only regexes did; the speedup on real parses comes from the
+    memoization, since cell strings repeat a lot across pages.
+    """
+    if not cell_text or cell_text.strip() in ("", "None"):
+        return _EMPTY_CELL
+    
+    room = None
+    for pattern in (_ROOM_RES if "-" in cell_text else _PLAIN_ROOM_RES):
+        match = pattern.search(cell_text)
+        if match and not _NOT_A_ROOM_RE.search(match[1]):
+            room = match[1]
+            break
+    
+    section = _SECTION_RE.search(cell_text) if "_" in cell_text else None
+    subject = _SUBJECT_RE.match(cell_text)
+    return CellTokens(room, section and section[0], subject and subject[1])
+
+
+def _notifying(base: type, name: str) -> Callable:
+    """A mutating method of base that calls self._on_change afterwards"""
+    method = getattr(base, name)
+    
+    def mutate(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self._on_change()
+        return result
+    
+    mutate.__name__ = name
+    return mutate
+
+
+class _TrackedSet(set):
+    """
+    Set that reports in-place changes, so an edit of the parser's public
+    occupied_rooms/all_rooms drops the indexes derived from them
+    """
+    
+    __slots__ = ("_on_change",)
+    
+    def __init__(self, items: Iterable = (), on_change: Callable = None):
+        super().__init__(items)
+        self._on_change = on_change
+    
+    def __reduce__(self):
+        # Copied and pickled as a plain set
+        return (set, (list(self),))
+
+
+for _name in ("add", "discard", "remove", "pop", "clear", "update", "difference_update",
+              "intersection_update", "symmetric_difference_update",
+              "__ior__", "__iand__", "__isub__", "__ixor__"):
+    setattr(_TrackedSet, _name, _notifying(set, _name))
+
+
+class _TrackedDict(dict):
+    """Dict that reports changes and wraps the values stored in it (see _TrackedSet)"""
+    
+    __slots__ = ("_on_change", "_wrap")
+    
+    def __init__(self, items: Dict, on_change: Callable, wrap: Callable):
+        super().__init__()
+        self._on_change = on_change
+        self._wrap = wrap
+        for key, value in items.items():
+            dict.__setitem__(self, key, wrap(value, on_change))
+    
+    def __reduce__(self):
+        return (dict, (dict(self),))
+    
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, self._wrap(value, self._on_change))
+        self._on_change()
+    
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            dict.__setitem__(self, key, self._wrap(value, self._on_change))
+        self._on_change()
+    
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+
+for _name in ("__delitem__", "pop", "popitem", "clear"):
+    setattr(_TrackedDict, _name, _notifying(dict, _name))
+
+
+def _tracked_set(items: Iterable, on_change: Callable) -> _TrackedSet:
+    if isinstance(items, _TrackedSet) and items._on_change == on_change:
+        return items
+    return _TrackedSet(items, on_change)
+
+
+def _tracked_slots(slots: Dict, on_change: Callable) -> _TrackedDict:
+    if isinstance(slots, _TrackedDict) and slots._on_change == on_change:
+        return slots
+    return _TrackedDict(slots, on_change, _tracked_set)
+
 
 class TimetableParser:
     """Parser that correctly handles section-wise timetables to find vacant rooms"""
     
-    def __init__(self):
+    def __init__(self, metrics: Optional[NullMetrics] = None):
+        # Stage timings and counters of parse runs (see tt_metrics); the
+        # default sink discards them
+        self.metrics = metrics or NULL_METRICS
         # Store which rooms are OCCUPIED at each day/slot
         # Structure: occupied_rooms[day][slot_number] = Set of room numbers
-        self.occupied_rooms: Dict[str, Dict[int, Set[str]]] = {
+        # (both are public; editing them drops the derived indexes)
+        self.occupied_rooms = {
             day: {slot: set() for slot in range(1, 9)}
             for day in DAYS
         }
         # All unique room numbers found across all timetables
-        self.all_rooms: Set[str] = set()
-        # Section timetables for reference
-        self.section_schedules: Dict[str, List] = defaultdict(list)
+        self.all_rooms = set()
+        # Occupancy contributed by each page and the page's content fingerprint,
+        # so a changed page can be retracted and re-applied on its own
+        self.page_records: Dict[PageKey, List[CellRecord]] = {}
+        self.page_fingerprints: Dict[PageKey, str] = {}
+        # Number of page records backing each occupied cell, per source PDF,
+        # and number of records backing each room
+        self._occupancy_refs: Dict[Occupancy, Dict[str, int]] = defaultdict(dict)
+        self._room_refs: Dict[str, int] = defaultdict(int)
+        # Bitset view of occupied_rooms, rebuilt lazily after changes
+        self._index: Optional[OccupancyIndex] = None
+        # Columnar cell-record store, rebuilt lazily after changes
+        self._records: Optional[CellRecordStore] = None
+        # Full-week vacancy matrix and its JSON payload, built lazily
+        self._vacancy_matrix: Optional[Dict[str, Dict[int, List[str]]]] = None
+        self._vacancy_payload: Optional[str] = None
+        # Per-section 40-bit masks of the cells each section has class in
+        self._section_masks: Optional[Dict[str, int]] = None
+        # Room locations (see tt_rooms) and the config correcting them
+        self.room_config: Optional[Dict] = None
+        self._room_model: Optional[RoomModel] = None
+        # Holidays, day swaps, cancellations and bookings (see tt_calendar)
+        # and the per-date occupancy compiled from them
+        self._calendar: Optional[OccupancyCalendar] = None
+        self.calendar_config = None
+    
+    @classmethod
+    def from_json(cls, json_path: str) -> "TimetableParser":
+        """
+        Rebuild a parser from a file written by export_to_json.
+        No PDF is read, so pdfplumber is never imported. Page data (with
+        sections and subjects) is restored when the export has it; older
+        exports only have bare occupancy.
+        """
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        parser = cls()
+        base_dir = os.path.dirname(os.path.abspath(json_path))
+        for source, pages in data.get("pages", {}).items():
+            parser._load_state({"pages": pages}, _source_name(os.path.join(base_dir, source)))
+        from_pages = set(parser._occupancy_refs)
+        parser._load_occupancy(
+            (cell
+             for cell in ((day, int(slot), room)
+                          for day, slots in data["occupied_rooms"].items()
+                          for slot, rooms in slots.items()
+                          for room in rooms)
+             if cell not in from_pages),
+            data["all_rooms"], _source_name(json_path),
+        )
+        return parser
+    
+    @classmethod
+    def from_snapshot(cls, snapshot_path: str) -> "TimetableParser":
+        """
+        Rebuild a parser from a binary snapshot written by export_snapshot.
+        The snapshot's bitset index is used as-is instead of being rebuilt.
+        """
+        with Snapshot(snapshot_path) as snapshot:
+            index = snapshot.to_index()
+        
+        parser = cls()
+        parser._load_occupancy(
+            ((day, slot, room)
+             for day in index.days
+             for slot in index.slots
+             for room in index.rooms_from_mask(index.occupied_mask(day, slot))),
+            index.rooms, _source_name(snapshot_path),
+        )
+        parser._index = index
+        return parser
+    
+    @classmethod
+    def from_file(cls, path: str, cache: Optional[ParseCache] = None,
+                  metrics: Optional[NullMetrics] = None) -> "TimetableParser":
+        """
+        Build a parser from whatever timetable source a path points to:
+        a JSON export, a binary snapshot, a PDF or a folder of PDFs.
+        Exports that cannot be read raise; PDF errors are reported and
+        counted in metrics ("errors"), like parse_pdf does.
+        """
+        if path.lower().endswith(".json"):
+            return cls.from_json(path)
+        if path.lower().endswith(".snap"):
+            return cls.from_snapshot(path)
+        
+        parser = cls(metrics=metrics)
+        if os.path.isdir(path):
+            parser.parse_pdfs(path, cache=cache)
+        else:
+            parser.parse_pdf(path, cache=cache)
+        return parser
+    
+    def copy(self, metrics: Optional[NullMetrics] = None) -> "TimetableParser":
+        """
+        Independent parser with the same occupancy and page data, so a new
+        edition can be applied to the copy while this parser keeps serving.
+        Page record lists are shared; they are replaced, never mutated.
+        """
+        parser = TimetableParser(metrics=metrics)
+        parser.occupied_rooms = {day: {slot: set(rooms) for slot, rooms in slots.items()}
+                                 for day, slots in self.occupied_rooms.items()}
+        parser.all_rooms = set(self.all_rooms)
+        parser.page_records = dict(self.page_records)
+        parser.page_fingerprints = dict(self.page_fingerprints)
+        parser._occupancy_refs = defaultdict(dict, {entry: dict(refs) for entry, refs
+                                                    in self._occupancy_refs.items()})
+        parser._room_refs = defaultdict(int, self._room_refs)
+        parser.room_config = self.room_config
+        parser.calendar_config = self.calendar_config
+        return parser
+    
+    @property
+    def occupied_rooms(self) -> Dict[str, Dict[int, Set[str]]]:
+        return self._occupied_rooms
+    
+    @occupied_rooms.setter
+    def occupied_rooms(self, occupied_rooms: Dict[str, Dict[int, Set[str]]]):
+        self._occupied_rooms = _TrackedDict(occupied_rooms, self.invalidate_index, _tracked_slots)
+        self.invalidate_index()
+    
+    @property
+    def all_rooms(self) -> Set[str]:
+        return self._all_rooms
+    
+    @all_rooms.setter
+    def all_rooms(self, all_rooms: Set[str]):
+        self._all_rooms = _TrackedSet(all_rooms, self.invalidate_index)
+        self.invalidate_index()
+    
+    def _load_occupancy(self, occupancy: Iterable[Occupancy], rooms: Iterable[str], source: str):
+        """Load bare (day, slot, room) occupancy from an export that has no page data"""
+        self._apply_occupancy([CellRecord(None, day, slot, room, None)
+                               for day, slot, room in occupancy], source)
+        # Rooms that are never occupied still belong to the index
+        for room in rooms:
+            if room not in self.all_rooms:
+                self._room_refs[room] += 1
+                self.all_rooms.add(room)
+    
+    @property
+    def index(self) -> OccupancyIndex:
+        """Bitset occupancy index built from occupied_rooms on first use"""
+        if self._index is None:
+            self._index = OccupancyIndex.from_sets(
+                DAYS, list(TIME_SLOTS), self.all_rooms, self.occupied_rooms
+            )
+        return self._index
+    
+    @property
+    def records(self) -> CellRecordStore:
+        """
+        Columnar store of every cell record, built on first use.
+        Occupancy loaded from an export has no page data and is stored
+        without section and subject.
+        """
+        if self._records is None:
+            records = [record for records in self.page_records.values() for record in records]
+            from_pages = {(record.day, record.slot, record.room) for record in records}
+            records.extend(
+                CellRecord(None, day, slot, room, None)
+                for day, slots in self.occupied_rooms.items()
+                for slot, rooms in slots.items()
+                for room in rooms
+                if (day, slot, room) not in from_pages
+            )
+            self._records = CellRecordStore.from_records(DAYS, records)
+        return self._records
+    
+    @property
+    def section_schedules(self) -> Dict[str, Schedule]:
+        """{section: {day: {slot: [(room, subject), ...]}}} for every section"""
+        store = self.records
+        return {section: store.section_schedule(section) for section in store.sections}
+    
+    @property
+    def section_masks(self) -> Dict[str, int]:
+        """
+        {section: bitmask of the (day, slot) cells it has class in}, using
+        the bit layout of the occupancy index (bit = index.cell_id(day, slot))
+        """
+        if self._section_masks is None:
+            self._section_masks = self.records.section_masks(list(TIME_SLOTS))
+        return self._section_masks
+    
+    def invalidate_index(self):
+        """Drop the derived indexes; runs on every change of occupied_rooms/all_rooms"""
+        self._index = None
+        self._records = None
+        self._vacancy_matrix = None
+        self._vacancy_payload = None
+        self._section_masks = None
+        self._room_model = None
+        self._calendar = None
     
     def extract_room_from_cell(self, cell_text: str) -> Optional[str]:
         """
         Extract room number from a timetable cell.
         Cells contain patterns like "23BCS_F\\nS-606" or "23BCS_K\\nRG-1"
         """
-        if not cell_text or cell_text.strip() in ["", "None"]:
-            return None
-        
-        # Look for room patterns (more specific patterns first)
-        room_patterns = [
-            r'\b([A-Z]{2,3}-\d+)\b',  # SS-101, OT-801, PP-802
-            r'\b([A-Z]-\d{3,4})\b',    # S-606, L-307, M-703
-            r'(?<!\d)(\d{3})(?!\d)',   # 104, 605, 801 (not part of longer number)
-        ]
-        
-        for pattern in room_patterns:
-            match = re.search(pattern, cell_text)
-            if match:
-                room = match.group(1)
-                # Validate it's not a year or ID number
-                if not re.search(r'(18|19|20)\d{2,3}|[Ee]\d{4,5}', room):
-                    return room
-        
-        return None
+        return tokenize_cell(cell_text).room
     
-    def parse_pdf(self, pdf_path: str):
+    def parse_pdf(self, pdf_path: str, workers: Optional[int] = 1,
+                  cache: Optional[ParseCache] = None, fast: bool = False):
         """
         Parse section-wise timetable PDF and build room occupancy data
+        
+        Args:
+            pdf_path: Path to the timetable PDF
+            workers: Number of worker processes for page extraction.
+                1 parses serially, None uses every available CPU.
+            cache: Optional parse cache. On a hit the PDF is not opened at all.
+            fast: Extract tables through a grid template learned from the PDF
+                itself (see tt_geometry) instead of extract_tables on every page
         """
         print(f"[PDF] Parsing section timetables: {pdf_path}")
         
+        if workers is None:
+            workers = os.cpu_count() or 1
+        
+        source = _source_name(pdf_path)
+        metrics = self.metrics
+        
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                for page_num, page in enumerate(pdf.pages, 1):
-                    tables = page.extract_tables()
-                    
-                    if not tables:
-                        continue
-                    
-                    # Process the main timetable table
-                    self._process_table(tables[0], page_num)
-            
-            print(f"\n[OK] Parsing complete!")
-            print(f"  Total unique rooms found: {len(self.all_rooms)}")
-            print(f"  Sample rooms: {', '.join(sorted(list(self.all_rooms))[:10])}")
-            
+            with metrics.profile(), metrics.stage("parse_pdf"):
+                cache_key = None
+                if cache is not None:
+                    cache_key = cache.key_for(pdf_path, PARSER_VERSION)
+                    with metrics.stage("cache_load"):
+                        cached = cache.load(cache_key)
+                    if cached is not None:
+                        metrics.count("cache_hits")
+                        self._load_state(cached, source)
+                        print(f"[CACHE] Loaded parsed timetable ({len(self.all_rooms)} rooms)")
+                        return
+                    metrics.count("cache_misses")
+                
+                if workers > 1:
+                    pages = sorted(_extract_pages_parallel(pdf_path, workers, metrics=metrics,
+                                                           fast=fast))
+                else:
+                    # Serial parses stream pages straight from the generator
+                    pages = _page_reader(fast)(pdf_path, metrics=metrics)
+                
+                # Merge in page order so the result matches a serial parse
+                for page_num, fingerprint, records in pages:
+                    with metrics.stage("merge"):
+                        self._set_page((source, page_num), fingerprint, records)
+                
+                print(f"\n[OK] Parsing complete!")
+                print(f"  Total unique rooms found: {len(self.all_rooms)}")
+                print(f"  Sample rooms: {', '.join(sorted(list(self.all_rooms))[:10])}")
+                
+                if cache_key is not None:
+                    with metrics.stage("cache_store"):
+                        cache.store(cache_key, self._dump_state(source))
+                        
         except FileNotFoundError:
+            metrics.count("errors")
             print(f"[ERROR] File not found - {pdf_path}")
         except Exception as e:
+            metrics.count("errors")
             print(f"[ERROR] Error parsing PDF: {str(e)}")
             import traceback
             traceback.print_exc()
     
-    def _process_table(self, table: List[List[str]], page_num: int):
-        """Process a single timetable table from a section's page"""
-        if not table or len(table) < 2:
-            return
+    def parse_pdfs(self, pdf_paths: Union[str, Iterable[str]], workers: Optional[int] = None,
+                   cache: Optional[ParseCache] = None, fast: bool = False):
+        """
+        Parse many timetable PDFs (e.g. every batch and year) into one index.
         
-        # Skip header row (row 0), process data rows (Mo, Tu, We, Th, Fr)
-        for row_idx in range(1, len(table)):
-            row = table[row_idx]
-            if not row or len(row) < 2:
-                continue
-            
-            # Get day from first column
-            day = str(row[0]).strip() if row[0] else ""
-            if day not in DAYS:
-                continue
-            
-            # Process each time slot (columns 1-8)
-            for slot_num in range(1, 9):
-                if slot_num >= len(row):
-                    continue
+        Pages of all PDFs are extracted concurrently in one process pool and
+        merged in (PDF, page) order. Every occupied cell remembers which
+        PDF(s) it came from, see get_occupancy_sources.
+        
+        Args:
+            pdf_paths: A directory of PDFs, or a list of PDF files/directories
+            workers: Number of worker processes (None = all CPUs, 1 = serial)
+            cache: Optional parse cache, checked per PDF
+            fast: Use template-based table extraction, as in parse_pdf
+        """
+        paths = _expand_pdf_paths(pdf_paths)
+        print(f"[PDF] Parsing {len(paths)} timetable PDF(s)")
+        
+        if workers is None:
+            workers = os.cpu_count() or 1
+        
+        metrics = self.metrics
+        
+        try:
+            with metrics.profile(), metrics.stage("parse_pdfs"):
+                pending = []
+                for pdf_path in paths:
+                    cached = None
+                    if cache is not None:
+                        with metrics.stage("cache_load"):
+                            cached = cache.load(cache.key_for(pdf_path, PARSER_VERSION))
+                        metrics.count("cache_hits" if cached is not None else "cache_misses")
+                    if cached is not None:
+                        self._load_state(cached, _source_name(pdf_path))
+                        print(f"[CACHE] Loaded {pdf_path}")
+                    else:
+                        pending.append(pdf_path)
                 
-                cell_text = str(row[slot_num]) if row[slot_num] else ""
+                results = _extract_many(pending, workers, metrics, fast)
                 
-                # Extract room number from cell
-                room = self.extract_room_from_cell(cell_text)
+                for pdf_path in pending:
+                    source = _source_name(pdf_path)
+                    with metrics.stage("merge"):
+                        for page_num, fingerprint, records in results[pdf_path]:
+                            self._set_page((source, page_num), fingerprint, records)
+                    if cache is not None:
+                        with metrics.stage("cache_store"):
+                            cache.store(cache.key_for(pdf_path, PARSER_VERSION),
+                                        self._dump_state(source))
                 
-                if room:
-                    # Mark this room as occupied for this day/slot
-                    self.occupied_rooms[day][slot_num].add(room)
-                    self.all_rooms.add(room)
+                print(f"\n[OK] Parsing complete!")
+                print(f"  Source PDFs: {len(self.sources)}")
+                print(f"  Total unique rooms found: {len(self.all_rooms)}")
+                
+        except FileNotFoundError as e:
+            metrics.count("errors")
+            print(f"[ERROR] File not found - {e.filename}")
+        except Exception as e:
+            metrics.count("errors")
+            print(f"[ERROR] Error parsing PDFs: {str(e)}")
+            import traceback
+            traceback.print_exc()
+    
+    @property
+    def sources(self) -> List[str]:
+        """Source PDFs that currently contribute pages"""
+        return sorted({source for source, _ in self.page_records})
+    
+    def get_occupancy_sources(self, room_number: str, day: str, slot_number: int) -> List[str]:
+        """Source PDFs that book a room in a day/slot (empty if it is vacant)"""
+        return sorted(self._occupancy_refs.get((day, slot_number, room_number), {}))
+    
+    def update_pdf(self, pdf_path: str, workers: Optional[int] = 1,
+                   cache: Optional[ParseCache] = None, fast: bool = False) -> List[int]:
+        """
+        Incrementally re-ingest a new edition of an already parsed PDF.
+        
+        Every page is fingerprinted by its content streams; only pages whose
+        fingerprint is new are run through extract_tables, and only pages
+        that changed have their occupancy retracted and re-applied.
+        
+        Returns:
+            Page numbers that had to be re-extracted
+        """
+        print(f"[PDF] Updating section timetables: {pdf_path}")
+        source = _source_name(pdf_path)
+        
+        if workers is None:
+            workers = os.cpu_count() or 1
+        
+        metrics = self.metrics
+        
+        try:
+            with metrics.profile(), metrics.stage("update_pdf"):
+                with metrics.stage("fingerprint"):
+                    fingerprints = _page_fingerprints(pdf_path)
+                
+                # Entries of every page seen before, by content; this also catches
+                # pages that only moved because others were inserted or removed
+                known = {
+                    self.page_fingerprints[key]: records
+                    for key, records in self.page_records.items()
+                    if key[0] == source
+                }
+                changed = [
+                    page_num for page_num, fingerprint in fingerprints.items()
+                    if self.page_fingerprints.get((source, page_num)) != fingerprint
+                ]
+                to_extract = [page_num for page_num in changed
+                              if fingerprints[page_num] not in known]
+                metrics.count("pages_changed", len(changed))
+                metrics.count("pages_reused", len(fingerprints) - len(to_extract))
+                
+                extracted = {}
+                if to_extract:
+                    for page_num, fingerprint, records in _extract_pages_with(
+                            pdf_path, to_extract, workers, metrics, fast):
+                        extracted[page_num] = (fingerprint, records)
+                
+                with metrics.stage("merge"):
+                    for page_num in changed:
+                        fingerprint, records = extracted.get(
+                            page_num, (fingerprints[page_num], known.get(fingerprints[page_num], []))
+                        )
+                        self._set_page((source, page_num), fingerprint, records)
+                    
+                    # Pages that no longer exist in the new edition
+                    for key in [key for key in self.page_records
+                                if key[0] == source and key[1] not in fingerprints]:
+                        self._drop_page(key)
+                
+                print(f"[OK] {len(changed)} of {len(fingerprints)} page(s) changed, "
+                      f"{len(to_extract)} re-extracted")
+                
+                if cache is not None:
+                    with metrics.stage("cache_store"):
+                        cache.store(cache.key_for(pdf_path, PARSER_VERSION),
+                                    self._dump_state(source))
+                
+                return to_extract
+                
+        except FileNotFoundError:
+            metrics.count("errors")
+            print(f"[ERROR] File not found - {pdf_path}")
+        except Exception as e:
+            metrics.count("errors")
+            print(f"[ERROR] Error updating PDF: {str(e)}")
+            import traceback
+            traceback.print_exc()
+        return []
+    
+    def remove_pdf(self, pdf_path: str) -> int:
+        """
+        Retract every page of a source PDF (e.g. one deleted from a folder).
+        
+        Returns:
+            Number of pages removed
+        """
+        source = _source_name(pdf_path)
+        keys = [key for key in self.page_records if key[0] == source]
+        for key in keys:
+            self._drop_page(key)
+        return len(keys)
+    
+    def parse_section(self, pdf_path: str, identifier: str, workers: Optional[int] = 1,
+                      cache: Optional[ParseCache] = None, fast: bool = False) -> List[int]:
+        """
+        Parse or refresh only the pages of a PDF that one query needs.
+        
+        The PDF's page index (see tt_page_index) maps the identifier - a
+        section code like "23BCS_F" or a page label like "L-102A" - to its
+        pages. Those pages, and any already loaded page of the PDF, are
+        re-extracted only if their fingerprint differs from what is loaded,
+        so calling this again after the PDF changed refreshes just the
+        pages that changed.
+        
+        Args:
+            pdf_path: Path to the timetable PDF
+            identifier: Section code or page label
+            workers: Number of worker processes for page extraction
+            cache: Where the page index is stored (default: ParseCache())
+            fast: Use template-based table extraction, as in parse_pdf
+        
+        Returns:
+            Page numbers that had to be extracted (empty, with an error
+            message, if no page matches the identifier)
+        """
+        print(f"[PDF] Parsing pages of {identifier}: {pdf_path}")
+        from tt_page_index import PageIndex
+        
+        source = _source_name(pdf_path)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        
+        metrics = self.metrics
+        
+        try:
+            with metrics.profile(), metrics.stage("parse_section"):
+                with metrics.stage("page_index"):
+                    index = PageIndex.load(pdf_path, cache)
+                
+                if not index.pages_for(identifier):
+                    metrics.count("errors")
+                    print(f"[ERROR] '{identifier}' not found in {pdf_path} "
+                          f"(no page label or section code matches)")
+                    return []
+                
+                loaded = {key[1] for key in self.page_records if key[0] == source}
+                wanted = sorted(loaded.union(index.pages_for(identifier)) & set(index.by_number))
+                to_extract = [page_num for page_num in wanted
+                              if self.page_fingerprints.get((source, page_num))
+                              != index.fingerprint(page_num)]
+                metrics.count("pages_reused", len(wanted) - len(to_extract))
+                
+                pages = []
+                if to_extract:
+                    pages = _extract_pages_with(pdf_path, to_extract, workers, metrics, fast)
+                
+                with metrics.stage("merge"):
+                    for page_num, fingerprint, records in pages:
+                        self._set_page((source, page_num), fingerprint, records)
+                    
+                    # Loaded pages that no longer exist in the PDF
+                    for page_num in loaded - set(index.by_number):
+                        self._drop_page((source, page_num))
+                
+                print(f"[OK] {len(to_extract)} of {len(index.pages)} page(s) extracted "
+                      f"for {identifier}")
+                return to_extract
+                
+        except FileNotFoundError:
+            metrics.count("errors")
+            print(f"[ERROR] File not found - {pdf_path}")
+        except Exception as e:
+            metrics.count("errors")
+            print(f"[ERROR] Error parsing section: {str(e)}")
+            import traceback
+            traceback.print_exc()
+        return []
+    
+    def _set_page(self, key: PageKey, fingerprint: str, records: List[CellRecord]):
+        """Replace the occupancy contributed by one page"""
+        if key in self.page_records:
+            self._retract_occupancy(self.page_records[key], key[0])
+        self.page_records[key] = records
+        self.page_fingerprints[key] = fingerprint
+        self._apply_occupancy(records, key[0])
+    
+    def _drop_page(self, key: PageKey):
+        """Retract the occupancy of a page that is no longer in its PDF"""
+        self._retract_occupancy(self.page_records.pop(key), key[0])
+        del self.page_fingerprints[key]
+    
+    def _dump_state(self, source: str) -> Dict:
+        """Serializable page data of one source PDF (used by the parse cache)"""
+        pages = sorted(
+            (key[1], self.page_fingerprints[key], records)
+            for key, records in self.page_records.items()
+            if key[0] == source
+        )
+        return {
+            "pages": [
+                [page_num, fingerprint, [list(record) for record in records]]
+                for page_num, fingerprint, records in pages
+            ],
+        }
+    
+    def _load_state(self, data: Dict, source: str):
+        """Restore page data produced by _dump_state"""
+        for page_num, fingerprint, records in data["pages"]:
+            self._set_page((source, page_num), fingerprint,
+                           [CellRecord(*record) for record in records])
+    
+    def _process_table(self, table: List[List[str]], page_num: int):
+        """Process a single timetable table from a section's page"""
+        self._apply_occupancy(_table_records(table))
+    
+    def _apply_occupancy(self, records: List[CellRecord], source: str = ""):
+        """Mark the rooms of the given cell records as occupied"""
+        # Plain set methods skip the per-change notification; the indexes
+        # are dropped once at the end
+        add = set.add
+        for record in records:
+            entry = (record.day, record.slot, record.room)
+            refs = self._occupancy_refs[entry]
+            refs[source] = refs.get(source, 0) + 1
+            self._room_refs[record.room] += 1
+            add(self._occupied_rooms[record.day][record.slot], record.room)
+            add(self._all_rooms, record.room)
+        self.invalidate_index()
+    
+    def _retract_occupancy(self, records: List[CellRecord], source: str = ""):
+        """Undo _apply_occupancy for records that are no longer in the PDF"""
+        discard = set.discard
+        for record in records:
+            entry = (record.day, record.slot, record.room)
+            refs = self._occupancy_refs[entry]
+            refs[source] -= 1
+            if refs[source] <= 0:
+                del refs[source]
+            if not refs:
+                del self._occupancy_refs[entry]
+                discard(self._occupied_rooms[record.day][record.slot], record.room)
+            self._room_refs[record.room] -= 1
+            if self._room_refs[record.room] <= 0:
+                del self._room_refs[record.room]
+                discard(self._all_rooms, record.room)
+        self.invalidate_index()
     
     def find_vacant_rooms(self, day: str, slot_number: int) -> List[str]:
         """
@@ -146,60 +818,398 @@ class TimetableParser:
         Returns:
             List of vacant room numbers (sorted)
         """
+        self._validate_slot(day, slot_number)
+        
+        # Copy, so callers cannot edit the shared matrix
+        return list(self.vacancy_matrix[day][slot_number])
+    
+    @property
+    def vacancy_matrix(self) -> Dict[str, Dict[int, List[str]]]:
+        """
+        Vacant rooms of every (day, slot) cell: {day: {slot: [rooms]}}.
+        Decoded from the bitset index once and reused until the next change;
+        treat the lists as read-only.
+        """
+        if self._vacancy_matrix is None:
+            index = self.index
+            self._vacancy_matrix = {
+                day: {slot: index.vacant_rooms(day, slot) for slot in TIME_SLOTS}
+                for day in DAYS
+            }
+        return self._vacancy_matrix
+    
+    def load_room_config(self, config_path: str):
+        """Load room location overrides and block positions (see tt_rooms)"""
+        with open(config_path, 'r', encoding='utf-8') as f:
+            self.room_config = json.load(f)
+        self._room_model = None
+    
+    @property
+    def room_model(self) -> RoomModel:
+        """Block/floor model of every room, built on first use"""
+        if self._room_model is None:
+            self._room_model = RoomModel(self.index.rooms, self.room_config)
+        return self._room_model
+    
+    def load_calendar(self, config_path: str):
+        """Load holidays, day swaps, cancellations and extra bookings (see tt_calendar)"""
+        with open(config_path, 'r', encoding='utf-8') as f:
+            self.calendar_config = json.load(f)
+    
+    @property
+    def calendar_config(self) -> Optional[Dict]:
+        return self._calendar_config
+    
+    @calendar_config.setter
+    def calendar_config(self, config: Optional[Dict]):
+        # Recompiled on the next date query
+        self._calendar_config = config
+        self._calendar = None
+    
+    @property
+    def calendar(self) -> OccupancyCalendar:
+        """Per-date occupancy with the calendar exceptions applied, built on first use"""
+        if self._calendar is None:
+            self._calendar = OccupancyCalendar(self.index, self.calendar_config)
+        return self._calendar
+    
+    def find_vacant_rooms_on(self, on: date, slot_number: int) -> List[str]:
+        """
+        Vacant rooms in a slot on a calendar date: the weekly timetable of the
+        day the date follows, minus cancellations, plus extra bookings. Every
+        room is vacant on holidays and weekends.
+        """
+        return self.calendar.vacant_rooms(on, slot_number)
+    
+    def find_nearest_vacant_rooms(self, day: str, slot_number: int, near: Optional[str] = None,
+                                  block: Optional[str] = None, floor: Optional[int] = None,
+                                  limit: Optional[int] = 10) -> List[Tuple[str, float]]:
+        """
+        Vacant rooms ranked by distance from a room or a block/floor
+        
+        Args:
+            day: Day of the week (Mo, Tu, We, Th, Fr)
+            slot_number: Time slot number (1-8)
+            near: Room code to measure from, e.g. "S-606" (need not be in the timetable)
+            block: Block to measure from when near is not given ("" = main block)
+            floor: Floor to measure from when near is not given
+            limit: Maximum number of rooms (None = all vacant rooms)
+        
+        Returns:
+            [(room, distance), ...], nearest first
+        """
+        self._validate_slot(day, slot_number)
+        model = self.room_model
+        if near is not None:
+            origin = model.locate(near)
+        elif block is not None or floor is not None:
+            origin = RoomInfo("", block or "", floor, None)
+        else:
+            raise ValueError("Give a room (near) or a block/floor to measure from")
+        return model.nearest(self.index.vacant_mask(day, slot_number), origin, limit)
+    
+    def find_vacant_rooms_batch(self, day_slots: Optional[Iterable[Tuple[str, int]]] = None
+                                ) -> Dict[str, Dict[int, List[str]]]:
+        """
+        Vacant rooms for many (day, slot) pairs in one call
+        
+        Args:
+            day_slots: (day, slot) pairs; None means the whole week
+        
+        Returns:
+            {day: {slot: [vacant rooms]}} for the requested cells
+        """
+        matrix = self.vacancy_matrix
+        if day_slots is None:
+            return {day: {slot: list(rooms) for slot, rooms in slots.items()}
+                    for day, slots in matrix.items()}
+        
+        result: Dict[str, Dict[int, List[str]]] = {}
+        for day, slot_number in day_slots:
+            self._validate_slot(day, slot_number)
+            result.setdefault(day, {})[slot_number] = list(matrix[day][slot_number])
+        return result
+    
+    def vacancy_matrix_json(self) -> str:
+        """
+        The whole week as one JSON payload, serialized once per change:
+        {"days", "time_slots", "all_rooms", "vacant": {day: {slot: [rooms]}}}
+        """
+        if self._vacancy_payload is None:
+            self._vacancy_payload = json.dumps({
+                "days": DAYS,
+                "time_slots": {str(num): asdict(slot) for num, slot in TIME_SLOTS.items()},
+                "all_rooms": self.index.rooms,
+                "vacant": {
+                    day: {str(slot): rooms for slot, rooms in slots.items()}
+                    for day, slots in self.vacancy_matrix.items()
+                },
+            }, ensure_ascii=False)
+        return self._vacancy_payload
+    
+    def find_vacant_rooms_in_all(self, day_slots: List[Tuple[str, int]]) -> List[str]:
+        """
+        Find rooms that are vacant in every one of the given (day, slot) pairs
+        
+        Returns:
+            List of vacant room numbers (sorted)
+        """
+        for day, slot_number in day_slots:
+            self._validate_slot(day, slot_number)
+        
+        return self.index.vacant_in_all(day_slots)
+    
+    def find_vacant_rooms_range(self, day: str, start_slot: int, end_slot: int) -> List[str]:
+        """
+        Find rooms that are vacant for every slot from start_slot to end_slot
+        (inclusive), e.g. a two-hour session in slots 3-5
+        
+        Returns:
+            List of vacant room numbers (sorted)
+        """
+        self._validate_slot(day, start_slot)
+        self._validate_slot(day, end_slot)
+        if end_slot < start_slot:
+            raise ValueError("end_slot must not be before start_slot")
+        
+        return self.index.vacant_in_all(
+            [(day, slot) for slot in range(start_slot, end_slot + 1)]
+        )
+    
+    def free_until(self, room_number: str, day: str, slot_number: int) -> Optional[int]:
+        """
+        Last slot of the free stretch a room is in at (day, slot)
+        
+        Returns:
+            Slot number, or None if the room is occupied (or unknown)
+        """
+        self._validate_slot(day, slot_number)
+        if room_number not in self.all_rooms:
+            return None
+        
+        run = self.index.free_run(room_number, day, slot_number)
+        return slot_number + run - 1 if run else None
+    
+    def find_longest_free_stretches(self, day: str) -> Dict[str, Tuple[int, int]]:
+        """
+        Longest run of consecutive free slots for every room on a day
+        
+        Returns:
+            {room: (first_slot, number_of_slots)} for rooms with any free slot
+        """
+        self._validate_slot(day, 1)
+        
+        index = self.index
+        stretches = {}
+        for room in index.rooms:
+            start, length = index.longest_free_run(room, day)
+            if length:
+                stretches[room] = (start, length)
+        return stretches
+    
+    def _common_free_mask(self, sections: Iterable[str]) -> int:
+        """Cells in which none of the sections has class"""
+        masks = self.section_masks
+        if not masks:
+            raise ValueError(NO_SECTION_DATA)
+        sections = list(sections)
+        unknown = [section for section in sections if section not in masks]
+        if unknown:
+            raise ValueError(f"Unknown section(s): {', '.join(unknown)}")
+        busy = 0
+        for section in sections:
+            busy |= masks[section]
+        return ~busy & ((1 << len(DAYS) * len(TIME_SLOTS)) - 1)
+    
+    def find_common_free_slots(self, sections: Iterable[str]) -> Dict[str, List[int]]:
+        """
+        Slots in which every one of the sections is free
+        
+        Returns:
+            {day: [slot numbers]} (days without a common free slot are left out)
+        """
+        free = self._common_free_mask(sections)
+        slots = list(TIME_SLOTS)
+        result: Dict[str, List[int]] = {}
+        for d, day in enumerate(DAYS):
+            day_free = free >> d * len(slots)
+            free_slots = [slot for s, slot in enumerate(slots) if day_free >> s & 1]
+            if free_slots:
+                result[day] = free_slots
+        return result
+    
+    def find_common_free_windows(self, sections: Iterable[str], min_length: int = 1
+                                 ) -> List[Tuple[str, int, int]]:
+        """
+        Stretches of consecutive slots in which every one of the sections is free
+        
+        Args:
+            sections: Section codes, e.g. ["23BCS_F", "23BCS_K"]
+            min_length: Shortest window to report, in slots
+        
+        Returns:
+            [(day, first_slot, last_slot), ...] in week order
+        """
+        free = self._common_free_mask(sections)
+        slots = list(TIME_SLOTS)
+        day_bits = (1 << len(slots)) - 1
+        windows = []
+        for d, day in enumerate(DAYS):
+            day_free = free >> d * len(slots) & day_bits
+            while day_free:
+                start = _lowest_bit(day_free)
+                run = day_free >> start
+                # Length of the run of ones starting at the lowest bit
+                length = _lowest_bit(~run)
+                if length >= min_length:
+                    windows.append((day, slots[start], slots[start + length - 1]))
+                day_free &= ~(((1 << length) - 1) << start)
+        return windows
+    
+    @staticmethod
+    def _validate_slot(day: str, slot_number: int):
+        """Raise ValueError for an unknown day or slot number"""
         if day not in DAYS:
             raise ValueError(f"Invalid day. Must be one of: {', '.join(DAYS)}")
         
         if slot_number not in range(1, 9):
             raise ValueError("Invalid slot number. Must be between 1 and 8")
+    
+    def _has_classes(self, on: date) -> bool:
+        """Whether a date follows a weekday's timetable or has extra bookings"""
+        calendar = self.calendar
+        return calendar.grid_day(on) is not None or any(calendar.occupied_masks(on))
+    
+    def get_current_slot(self, now: Optional[datetime] = None) -> Optional[Tuple[Optional[str], int]]:
+        """
+        (day, slot) running right now, with the calendar applied like in
+        get_vacancy_slot: day is None on a holiday or weekend with extra
+        bookings. None outside class periods and on days without classes.
+        """
+        now = now or datetime.now()
+        if not self._has_classes(now.date()):
+            return None
+        current, _ = SLOT_CLOCK.locate(SLOT_CLOCK.minute_of_day(now))
+        if current is None:
+            return None
+        return self.calendar.grid_day(now.date()), SLOT_CLOCK.cells[current][1]
+    
+    def get_vacancy_slot(self, now: Optional[datetime] = None) -> Optional[Tuple[Optional[str], int]]:
+        """
+        The (day, slot) a "vacant now" question is about, with the calendar
+        applied: day is the weekday whose timetable the date follows, or
+        None on a holiday or weekend that only has extra bookings. None
+        outside class hours and on days with nothing booked at all.
+        """
+        now = now or datetime.now()
+        if not self._has_classes(now.date()):
+            return None
+        day = self.calendar.grid_day(now.date())
+        # Slot times are the same every day, so holidays and weekends are
+        # mapped onto the first day's slots
+        target = SLOT_CLOCK.slot_for_vacancy(now, day or DAYS[0])
+        return (day, target[1]) if target is not None else None
+    
+    def find_vacant_rooms_now(self, now: Optional[datetime] = None) -> List[str]:
+        """
+        Find vacant rooms at the current time.
+        During a short break between two slots this answers for the slot
+        about to start; before/after class hours, and on weekends and
+        holidays (see load_calendar) without extra bookings, every room is
+        vacant.
+        """
+        now = now or datetime.now()
+        target = self.get_vacancy_slot(now)
         
-        # Rooms that are occupied at this time
-        occupied = self.occupied_rooms[day][slot_number]
-        
-        # Vacant rooms = all rooms - occupied rooms
-        vacant = self.all_rooms - occupied
+        if target is None:
+            return sorted(list(self.all_rooms))  # Outside class hours
         
-        return sorted(list(vacant))
+        return self.calendar.vacant_rooms(now.date(), target[1])
+    
+    def find_rooms_free_for(self, minutes: int, now: Optional[datetime] = None) -> List[str]:
+        """
+        Rooms that stay vacant from now for the next given number of
+        minutes, on the calendar's dates (see load_calendar)
+        """
+        calendar = self.calendar
+        busy = 0
+        for on, positions in SLOT_CLOCK.day_slots_overlapping(now or datetime.now(), minutes):
+            masks = calendar.occupied_masks(on)
+            for i in positions:
+                busy |= masks[i]
+        index = self.index
+        return index.rooms_from_mask(index.all_rooms_mask & ~busy)
     
-    def find_vacant_rooms_now(self) -> List[str]:
-        """Find vacant rooms at the current time"""
-        now = datetime.now()
-        current_day_idx = now.weekday()  # Monday is 0
+    def next_room_transition(self, room_number: str,
+                             now: Optional[datetime] = None) -> Optional[Tuple[datetime, str]]:
+        """
+        When a room next changes state, on the calendar's dates (see
+        load_calendar).
         
-        if current_day_idx >= 5:  # Weekend
-            return sorted(list(self.all_rooms))
+        Returns:
+            (time, "FREE") if the room is occupied now, (time, "BUSY") if it is
+            free now, or None if the room is unknown or never occupied
+        """
+        index = self.index
+        if room_number not in index.room_ids:
+            return None
         
-        day = DAYS[current_day_idx]
-        current_time = now.time()
+        now = now or datetime.now()
+        clock = SLOT_CLOCK
+        calendar = self.calendar
+        room_bit = index.room_ids[room_number]
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
         
-        # Find current slot
-        current_slot = None
-        for slot_num, slot in TIME_SLOTS.items():
-            start = datetime.strptime(slot.start_time, "%H:%M").time()
-            end = datetime.strptime(slot.end_time, "%H:%M").time()
-            
-            if start <= current_time < end:
-                current_slot = slot_num
-                break
+        def day_mask(days_ahead: int) -> int:
+            """The room's occupied slots on a date, bit i = slot position i"""
+            masks = calendar.occupied_masks(now.date() + timedelta(days=days_ahead))
+            return sum((mask >> room_bit & 1) << i for i, mask in enumerate(masks))
         
-        if current_slot is None:
-            return sorted(list(self.all_rooms))  # Outside class hours
+        today = day_mask(0)
+        current, upcoming = clock.locate(clock.minute_of_day(now))
         
-        return self.find_vacant_rooms(day, current_slot)
+        if current is not None and today >> current & 1:
+            # Busy: free once its run of back-to-back occupied slots ends,
+            # at the latest after the last slot of the day
+            run = _lowest_bit(~(today >> current))
+            return midnight + timedelta(minutes=clock.ends[current + run - 1]), "FREE"
+        
+        # Free: busy at the start of its next occupied slot. Past the last
+        # calendar exception the weekly grid repeats, so one more week of
+        # dates settles it
+        start = current if current is not None else upcoming
+        last = max(calendar.last_exception or now.date(), now.date())
+        for days_ahead in range((last - now.date()).days + 8):
+            mask = today >> start << start if days_ahead == 0 else day_mask(days_ahead)
+            if mask:
+                return (midnight + timedelta(days=days_ahead, minutes=clock.starts[_lowest_bit(mask)]),
+                        "BUSY")
+        return None
     
     def get_room_occupancy(self, room_number: str) -> Dict:
         """Get the occupancy schedule for a specific room"""
         if room_number not in self.all_rooms:
             return {}
         
+        index = self.index
+        room_mask = index.room_mask(room_number)
         schedule = {}
         for day in DAYS:
             schedule[day] = {}
             for slot_num in range(1, 9):
-                is_occupied = room_number in self.occupied_rooms[day][slot_num]
+                is_occupied = room_mask >> index.cell_id(day, slot_num) & 1
                 schedule[day][slot_num] = "OCCUPIED" if is_occupied else "VACANT"
         
         return schedule
     
+    def get_room_schedule(self, room_number: str) -> Schedule:
+        """{day: {slot: [(section, subject), ...]}} for the slots a room is booked"""
+        return self.records.room_schedule(room_number)
+    
+    def get_section_schedule(self, section: str) -> Schedule:
+        """{day: {slot: [(room, subject), ...]}} for the slots a section has class"""
+        return self.records.section_schedule(section)
+    
     def print_vacancy_report(self, day: str, slot_number: int):
         """Print a formatted report of vacant rooms"""
         vacant_rooms = self.find_vacant_rooms(day, slot_number)
@@ -231,7 +1241,11 @@ class TimetableParser:
         print(f"{'='*60}\n")
     
     def export_to_json(self, output_path: str):
-        """Export parsed timetable data to JSON"""
+        """
+        Export parsed timetable data to JSON. Besides the occupancy, the
+        page data of every source PDF is kept, so a parser loaded with
+        from_json still knows the section and subject of every class.
+        """
         data = {
             "all_rooms": sorted(list(self.all_rooms)),
             "time_slots": {
@@ -243,13 +1257,313 @@ class TimetableParser:
                     for slot, rooms in slots.items()
                 }
                 for day, slots in self.occupied_rooms.items()
-            }
+            },
+            # Source PDFs relative to the export, so it can be moved along with them
+            "pages": {_relative_source(source, output_path): self._dump_state(source)["pages"]
+                      for source in self.sources},
         }
         
         with open(output_path, 'w', encoding='utf-8') as f:
             json.dump(data, f, indent=2, ensure_ascii=False)
         
         print(f"[OK] Exported to {output_path}")
+    
+    def export_shards(self, output_dir: str) -> SyncResult:
+        """
+        Export one small JSON document per (day, slot) and per room, plus a
+        manifest of their content hashes (see tt_shards). Shards that are
+        unchanged since the last export into output_dir are not rewritten.
+        """
+        result = sync_shards(self, LocalShardWriter(output_dir))
+        
+        print(f"[OK] Exported shards to {output_dir}: {len(result.written)} written, "
+              f"{len(result.deleted)} deleted, {result.unchanged} unchanged")
+        return result
+    
+    def export_vacancy_matrix(self, output_path: str):
+        """Export the full-week vacancy matrix as one JSON file (see vacancy_matrix_json)"""
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(self.vacancy_matrix_json())
+        
+        print(f"[OK] Exported vacancy matrix to {output_path}")
+    
+    def export_snapshot(self, output_path: str):
+        """Export occupancy as a compact binary snapshot (see tt_snapshot)"""
+        write_snapshot(self.index, output_path)
+        
+        print(f"[OK] Exported snapshot to {output_path}")
+
+
+def _lowest_bit(mask: int) -> int:
+    """Position of the lowest set bit of a non-zero mask"""
+    return (mask & -mask).bit_length() - 1
+
+
+def _source_name(pdf_path: str) -> str:
+    """
+    Key under which a PDF's pages are tracked: its absolute path, so the
+    same file given as a relative and an absolute path is one source
+    """
+    return os.path.abspath(pdf_path)
+
+
+def _relative_source(source: str, output_path: str) -> str:
+    """A source key as a path relative to the directory of output_path"""
+    try:
+        return os.path.relpath(source, os.path.dirname(os.path.abspath(output_path)))
+    except ValueError:
+        # Another drive on Windows
+        return source
+
+
+def _open_pdf(pdf_path: str, page_numbers: Optional[List[int]] = None):
+    """Open a PDF with pdfplumber (1-based page_numbers, None = all pages)"""
+    # pdfplumber pulls in pdfminer and Pillow, so it is only imported once a
+    # PDF actually has to be read; query-only processes never pay for it
+    import pdfplumber
+    
+    return pdfplumber.open(pdf_path, pages=page_numbers)
+
+
+def page_fingerprint(page) -> str:
+    """
+    Fingerprint a pdfplumber page by hashing its raw content streams.
+    Much cheaper than extracting text; falls back to the text for pages
+    without a content stream.
+    """
+    from pdfminer.pdftypes import resolve1
+    
+    digest = hashlib.sha256()
+    contents = page.page_obj.contents or []
+    for stream in contents:
+        digest.update(resolve1(stream).get_data())
+    if not contents:
+        digest.update((page.extract_text() or "").encode('utf-8'))
+    return digest.hexdigest()[:32]
+
+
+def _page_fingerprints(pdf_path: str) -> Dict[int, str]:
+    """Fingerprint every page of a PDF without extracting any tables"""
+    with _open_pdf(pdf_path) as pdf:
+        return {page.page_number: page_fingerprint(page) for page in pdf.pages}
+
+
+def _table_records(table: List[List[str]], metrics: NullMetrics = NULL_METRICS) -> List[CellRecord]:
+    """Collect the occupied cells of a section's timetable table"""
+    records: List[CellRecord] = []
+    if not table or len(table) < 2:
+        return records
+    
+    # Time the room/section/subject regexes only when metrics are recorded
+    tokenize = metrics.timed(tokenize_cell, "tokenize") if metrics.enabled else tokenize_cell
+    cells = 0
+    
+    # Skip header row (row 0), process data rows (Mo, Tu, We, Th, Fr)
+    for row_idx in range(1, len(table)):
+        row = table[row_idx]
+        if not row or len(row) < 2:
+            continue
+        
+        # Get day from first column
+        day = str(row[0]).strip() if row[0] else ""
+        if day not in DAYS:
+            continue
+        
+        # Process each time slot (columns 1-8)
+        for slot_num in range(1, 9):
+            if slot_num >= len(row):
+                continue
+            
+            cell_text = str(row[slot_num]) if row[slot_num] else ""
+            cells += 1
+            
+            # Extract room, section and subject from cell
+            tokens = tokenize(cell_text)
+            
+            if tokens.room:
+                records.append(CellRecord(tokens.section, day, slot_num,
+                                          tokens.room, tokens.subject))
+    
+    if metrics.enabled:
+        metrics.count("cells", cells)
+        metrics.count("records", len(records))
+    return records
+
+
+def iter_page_occupancy(pdf_path: str, page_numbers: Optional[List[int]] = None,
+                        metrics: NullMetrics = NULL_METRICS) -> Iterator[PageOccupancy]:
+    """
+    Stream the occupied cells of a timetable PDF one page at a time.
+    
+    Each page's cached layout objects are released as soon as its records
+    are extracted, so memory stays flat no matter how many pages the PDF has.
+    
+    Args:
+        pdf_path: Path to the timetable PDF
+        page_numbers: 1-based page numbers to read (None = all pages)
+        metrics: Sink for stage timings, counters and per-page times
+    """
+    enabled = metrics.enabled
+    source = _source_name(pdf_path)
+    
+    with metrics.stage("open"):
+        pdf = _open_pdf(pdf_path, page_numbers)
+    
+    with pdf:
+        for page in pdf.pages:
+            if enabled:
+                start = time.perf_counter()
+            try:
+                with metrics.stage("fingerprint"):
+                    fingerprint = page_fingerprint(page)
+                with metrics.stage("extract_tables"):
+                    tables = page.extract_tables()
+                
+                # Only the main timetable table of each page is used
+                with metrics.stage("process_table"):
+                    records = _table_records(tables[0], metrics) if tables else []
+            finally:
+                page.close()
+            
+            if enabled:
+                metrics.page(source, page.page_number, time.perf_counter() - start)
+                metrics.count("pages")
+                if not tables:
+                    metrics.count("pages_without_table")
+            
+            yield PageOccupancy(page.page_number, fingerprint, records)
+
+
+def _page_reader(fast: bool) -> Callable[..., Iterator[PageOccupancy]]:
+    """iter_page_occupancy, or its template-based variant from tt_geometry"""
+    if fast:
+        # pypdfium2 comes with pdfplumber; import it only when asked for
+        from tt_geometry import iter_page_occupancy_fast
+        return iter_page_occupancy_fast
+    return iter_page_occupancy
+
+
+def _extract_pages(pdf_path: str, page_numbers: Optional[List[int]],
+                   fast: bool = False) -> List[PageOccupancy]:
+    """Extract the given pages in a worker process (1-based, None = all)"""
+    return list(_page_reader(fast)(pdf_path, page_numbers))
+
+
+def _extract_pages_measured(pdf_path: str, page_numbers: Optional[List[int]],
+                            fast: bool = False) -> Tuple[List[PageOccupancy], Dict]:
+    """_extract_pages that also records metrics, returned for the parent to merge"""
+    metrics = RecordingMetrics()
+    return list(_page_reader(fast)(pdf_path, page_numbers, metrics)), metrics.state()
+
+
+def _chunk_pages(page_numbers: List[int], workers: int, fast: bool = False) -> List[List[int]]:
+    """Split page numbers into a few chunks per worker"""
+    # More chunks than workers keeps the pool busy when some pages are slower;
+    # template extraction relearns its templates per chunk, so it gets one each
+    chunk_size = max(1, -(-len(page_numbers) // (workers * (1 if fast else 4))))
+    return [page_numbers[start:start + chunk_size]
+            for start in range(0, len(page_numbers), chunk_size)]
+
+
+def _extract_pages_parallel(pdf_path: str, workers: int,
+                            page_numbers: Optional[List[int]] = None,
+                            metrics: NullMetrics = NULL_METRICS,
+                            fast: bool = False) -> List[PageOccupancy]:
+    """Split the pages across a process pool and extract them in parallel"""
+    if page_numbers is None:
+        with metrics.stage("open"), _open_pdf(pdf_path) as pdf:
+            page_numbers = list(range(1, len(pdf.pages) + 1))
+    
+    chunks = _chunk_pages(page_numbers, workers, fast)
+    
+    results = []
+    from concurrent.futures import ProcessPoolExecutor
+    
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks) or 1)) as pool:
+        futures = [_submit_extract(pool, pdf_path, chunk, metrics, fast) for chunk in chunks]
+        for future in futures:
+            results.extend(_collect_extract(future, metrics))
+    
+    return results
+
+
+def _submit_extract(pool, pdf_path: str, page_numbers: List[int], metrics: NullMetrics,
+                    fast: bool = False):
+    """Queue a chunk of pages on a process pool, measured if metrics are recorded"""
+    if metrics.enabled:
+        return pool.submit(_extract_pages_measured, pdf_path, page_numbers, fast)
+    return pool.submit(_extract_pages, pdf_path, page_numbers, fast)
+
+
+def _collect_extract(future, metrics: NullMetrics) -> List[PageOccupancy]:
+    """Result of a _submit_extract future; worker metrics are merged into metrics"""
+    if not metrics.enabled:
+        return future.result()
+    pages, state = future.result()
+    metrics.merge(state)
+    return pages
+
+
+def _expand_pdf_paths(pdf_paths: Union[str, Iterable[str]]) -> List[str]:
+    """Turn a directory or a list of files/directories into a list of PDF files"""
+    if isinstance(pdf_paths, str):
+        pdf_paths = [pdf_paths]
+    
+    paths = []
+    for path in pdf_paths:
+        if os.path.isdir(path):
+            # Any case of the extension: exports often end in .PDF
+            paths.extend(sorted(
+                os.path.join(path, name) for name in os.listdir(path)
+                if name.lower().endswith(".pdf") and os.path.isfile(os.path.join(path, name))
+            ))
+        else:
+            paths.append(path)
+    # The same PDF listed twice (even by different paths) would be counted twice
+    unique = {}
+    for path in paths:
+        unique.setdefault(_source_name(path), path)
+    return list(unique.values())
+
+
+def _extract_many(pdf_paths: List[str], workers: int, metrics: NullMetrics = NULL_METRICS,
+                  fast: bool = False) -> Dict[str, List[PageOccupancy]]:
+    """Extract the pages of several PDFs, sharing one process pool across all of them"""
+    results: Dict[str, List[PageOccupancy]] = {pdf_path: [] for pdf_path in pdf_paths}
+    if not pdf_paths:
+        return results
+    
+    if workers <= 1:
+        for pdf_path in pdf_paths:
+            results[pdf_path] = list(_page_reader(fast)(pdf_path, metrics=metrics))
+        return results
+    
+    tasks = []
+    for pdf_path in pdf_paths:
+        with metrics.stage("open"), _open_pdf(pdf_path) as pdf:
+            page_numbers = list(range(1, len(pdf.pages) + 1))
+        tasks.extend((pdf_path, chunk) for chunk in _chunk_pages(page_numbers, workers, fast))
+    
+    from concurrent.futures import ProcessPoolExecutor
+    
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        futures = [(pdf_path, _submit_extract(pool, pdf_path, chunk, metrics, fast))
+                   for pdf_path, chunk in tasks]
+        for pdf_path, future in futures:
+            results[pdf_path].extend(_collect_extract(future, metrics))
+    
+    for pages in results.values():
+        pages.sort()
+    return results
+
+
+def _extract_pages_with(pdf_path: str, page_numbers: Optional[List[int]], workers: int,
+                        metrics: NullMetrics = NULL_METRICS,
+                        fast: bool = False) -> List[PageOccupancy]:
+    """Extract pages serially or in a process pool depending on workers"""
+    if workers > 1:
+        return _extract_pages_parallel(pdf_path, workers, page_numbers, metrics, fast)
+    return list(_page_reader(fast)(pdf_path, page_numbers, metrics))
 
 
 def main():
@@ -0,0 +1,155 @@
+"""
+Columnar store of timetable cell records.
+Records (section, day, slot, room, subject) live in parallel typed arrays
+with every string interned once, instead of one Python object per cell.
+Secondary indexes map a room, section or subject to the array of record
+IDs that mention it, kept in (day, slot) order, so schedule lookups never
+scan the whole store.
+"""
+
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Field order matches tt_parser.CellRecord
+Record = Tuple[Optional[str], str, int, str, Optional[str]]
+
+# {day: {slot: [(a, b), ...]}} as returned by the schedule helpers
+Schedule = Dict[str, Dict[int, List[Tuple[Optional[str], Optional[str]]]]]
+
+
+class CellRecordStore:
+    """Array-backed (section, day, slot, room, subject) records with lookup indexes"""
+    
+    def __init__(self, days: List[str]):
+        self.days = list(days)
+        self._day_ids = {day: i for i, day in enumerate(self.days)}
+        
+        # Interned strings; ID 0 stands for a missing section/subject
+        self.strings: List[Optional[str]] = [None]
+        self._string_ids: Dict[Optional[str], int] = {None: 0}
+        
+        # One entry per record in each column
+        self.section_col = array('I')
+        self.day_col = array('B')
+        self.slot_col = array('B')
+        self.room_col = array('I')
+        self.subject_col = array('I')
+        
+        # string ID -> record IDs, in (day, slot) order
+        self.by_room: Dict[int, array] = {}
+        self.by_section: Dict[int, array] = {}
+        self.by_subject: Dict[int, array] = {}
+    
+    @classmethod
+    def from_records(cls, days: List[str], records: Iterable[Record]) -> "CellRecordStore":
+        """Build a store from cell records; duplicates are stored once"""
+        store = cls(days)
+        day_ids = store._day_ids
+        unique = sorted(
+            set(records),
+            key=lambda r: (day_ids[r[1]], r[2], r[3], r[0] or "", r[4] or ""),
+        )
+        for section, day, slot, room, subject in unique:
+            store.section_col.append(store._intern(section))
+            store.day_col.append(day_ids[day])
+            store.slot_col.append(slot)
+            store.room_col.append(store._intern(room))
+            store.subject_col.append(store._intern(subject))
+        store._build_indexes()
+        return store
+    
+    def _intern(self, value: Optional[str]) -> int:
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.strings.append(value)
+            self._string_ids[value] = string_id
+        return string_id
+    
+    def _build_indexes(self):
+        """Group record IDs by room, section and subject"""
+        for column, index in ((self.room_col, self.by_room),
+                              (self.section_col, self.by_section),
+                              (self.subject_col, self.by_subject)):
+            groups: Dict[int, List[int]] = {}
+            for record_id, string_id in enumerate(column):
+                if string_id:
+                    groups.setdefault(string_id, []).append(record_id)
+            # Records were added in (day, slot) order, so each group is too
+            for string_id, record_ids in groups.items():
+                index[string_id] = array('I', record_ids)
+    
+    def __len__(self) -> int:
+        return len(self.day_col)
+    
+    def record(self, record_id: int) -> Record:
+        """Materialize one record as a (section, day, slot, room, subject) tuple"""
+        strings = self.strings
+        return (strings[self.section_col[record_id]], self.days[self.day_col[record_id]],
+                self.slot_col[record_id], strings[self.room_col[record_id]],
+                strings[self.subject_col[record_id]])
+    
+    def _ids(self, index: Dict[int, array], value: str) -> array:
+        string_id = self._string_ids.get(value)
+        return index.get(string_id, array('I')) if string_id else array('I')
+    
+    def room_record_ids(self, room: str) -> array:
+        """IDs of the records booking a room"""
+        return self._ids(self.by_room, room)
+    
+    def section_record_ids(self, section: str) -> array:
+        """IDs of a section's records"""
+        return self._ids(self.by_section, section)
+    
+    def subject_record_ids(self, subject: str) -> array:
+        """IDs of the records for a subject"""
+        return self._ids(self.by_subject, subject)
+    
+    @property
+    def rooms(self) -> List[str]:
+        return sorted(self.strings[i] for i in self.by_room)
+    
+    @property
+    def sections(self) -> List[str]:
+        return sorted(self.strings[i] for i in self.by_section)
+    
+    @property
+    def subjects(self) -> List[str]:
+        return sorted(self.strings[i] for i in self.by_subject)
+    
+    def _schedule(self, record_ids: array, first: array, second: array) -> Schedule:
+        strings = self.strings
+        schedule: Schedule = {}
+        for record_id in record_ids:
+            day = self.days[self.day_col[record_id]]
+            entries = schedule.setdefault(day, {}).setdefault(self.slot_col[record_id], [])
+            entries.append((strings[first[record_id]], strings[second[record_id]]))
+        return schedule
+    
+    def room_schedule(self, room: str) -> Schedule:
+        """{day: {slot: [(section, subject), ...]}} for the slots a room is booked"""
+        return self._schedule(self.room_record_ids(room), self.section_col, self.subject_col)
+    
+    def section_schedule(self, section: str) -> Schedule:
+        """{day: {slot: [(room, subject), ...]}} for the slots a section has class"""
+        return self._schedule(self.section_record_ids(section), self.room_col, self.subject_col)
+    
+    def section_masks(self, slots: List[int]) -> Dict[str, int]:
+        """
+        {section: bitmask of the (day, slot) cells it has class in}, with
+        bit day_index * len(slots) + slot_index, like OccupancyIndex cell IDs
+        """
+        slot_ids = {slot: i for i, slot in enumerate(slots)}
+        n_slots = len(slots)
+        day_col, slot_col = self.day_col, self.slot_col
+        masks = {}
+        for string_id, record_ids in self.by_section.items():
+            mask = 0
+            for record_id in record_ids:
+                mask |= 1 << (day_col[record_id] * n_slots + slot_ids[slot_col[record_id]])
+            masks[self.strings[string_id]] = mask
+        return masks
+    
+    def subject_records(self, subject: str) -> List[Record]:
+        """Every record for a subject, in (day, slot) order"""
+        return [self.record(record_id) for record_id in self.subject_record_ids(subject)]
@@ -0,0 +1,233 @@
+"""
+Background auto-reload of a timetable.
+A ReloadManager polls the timetable file(s) (a PDF, a folder of PDFs, a
+JSON export or a snapshot) for changes: a cheap stat (mtime, size) every
+poll, and a content hash only for files whose stat changed, so touching a
+file does not trigger a re-parse. A new edition is built in a background
+thread on a copy of the live parser (TimetableParser.copy + update_pdf,
+so only changed pages are re-extracted), its lazy indexes are warmed, and
+only then is it published by replacing one reference. The live parser is
+never modified, so queries keep reading a consistent index while the next
+one is built and never wait for a parse.
+"""
+
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from tt_cache import ParseCache, file_sha256
+from tt_metrics import RecordingMetrics
+
+
+DEFAULT_POLL_INTERVAL = 5.0  # seconds
+
+# File state checked on every poll: (mtime in ns, size)
+FileStat = Tuple[int, int]
+
+
+class ReloadManager:
+    """
+    Keeps a live TimetableParser in step with its timetable file(s).
+    
+    Readers take manager.parser once per query and use that object; it is
+    swapped atomically when a new edition is ready.
+    
+    Args:
+        source: PDF, folder of PDFs, JSON export or .snap snapshot
+        cache: Optional parse cache, used for the initial PDF parse and
+            updated after every reload
+        interval: Seconds between polls of the background thread
+        workers: Worker processes for page extraction
+        fast: Use template-based table extraction (see tt_geometry)
+        calendar_path: Optional holiday/exception calendar (see tt_calendar),
+            loaded into every parser that is published
+    """
+    
+    def __init__(self, source: str, cache: Optional[ParseCache] = None,
+                 interval: float = DEFAULT_POLL_INTERVAL, workers: Optional[int] = 1,
+                 fast: bool = False, calendar_path: Optional[str] = None):
+        self.source = source
+        self.cache = cache
+        self.interval = interval
+        self.workers = workers
+        self.fast = fast
+        self.calendar_path = calendar_path
+        # The published parser; replaced, never modified
+        self.parser = None
+        # Number of parsers published so far
+        self.generation = 0
+        self.last_error: Optional[str] = None
+        self._stats: Dict[str, FileStat] = {}
+        self._hashes: Dict[str, str] = {}
+        # Stats and hashes of an edition that failed to parse, so later polls
+        # skip it without re-hashing or re-parsing until the files change
+        self._failed_stats: Optional[Dict[str, FileStat]] = None
+        self._failed_hashes: Optional[Dict[str, str]] = None
+        self._listeners: List[Callable] = []
+        # Serializes checks from the poller and from explicit reload requests
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def _is_export(self) -> bool:
+        return self.source.lower().endswith((".json", ".snap"))
+    
+    def _files(self) -> List[str]:
+        if os.path.isdir(self.source):
+            from tt_parser import _expand_pdf_paths
+            return _expand_pdf_paths(self.source)
+        return [self.source]
+    
+    def _stat_files(self) -> Dict[str, FileStat]:
+        stats = {}
+        for path in self._files():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            stats[path] = (stat.st_mtime_ns, stat.st_size)
+        return stats
+    
+    def on_reload(self, callback: Callable):
+        """Call callback(parser) from the reload thread after each swap"""
+        self._listeners.append(callback)
+    
+    def load(self):
+        """Build and publish the first parser (blocking); raises on failure"""
+        if not self.check():
+            raise ValueError(self.last_error or f"No timetable found at {self.source}")
+    
+    def check(self) -> bool:
+        """
+        Reload now if the timetable changed since the last published parser.
+        
+        Returns:
+            True if a new parser was published
+        """
+        with self._lock:
+            stats = self._stat_files()
+            if stats == self._stats and self.parser is not None:
+                return False
+            if stats == self._failed_stats:
+                return False
+            if not stats:
+                self.last_error = f"No timetable found at {self.source}"
+                return False
+            
+            # Only files whose stat changed are hashed again
+            hashes = {
+                path: (self._hashes[path] if self._stats.get(path) == stat and path in self._hashes
+                       else file_sha256(path))
+                for path, stat in stats.items()
+            }
+            if self.parser is not None and hashes == self._hashes:
+                self._stats = stats
+                return False
+            if hashes == self._failed_hashes:
+                self._failed_stats = stats
+                return False
+            
+            try:
+                parser = self._build(hashes)
+            except Exception as e:
+                self.last_error = str(e)
+                self._failed_stats, self._failed_hashes = stats, hashes
+                print(f"[ERROR] Reload of {self.source} failed: {e}")
+                return False
+            
+            # A file that is still being written: keep the current parser
+            # and pick the finished file up on a later poll
+            if self._stat_files() != stats:
+                print(f"[INFO] {self.source} changed during reload, retrying")
+                return False
+            
+            self._stats, self._hashes = stats, hashes
+            self._failed_stats = self._failed_hashes = None
+            self.last_error = None
+            # The swap: one reference assignment, atomic for readers
+            self.parser = parser
+            self.generation += 1
+        
+        print(f"[OK] Timetable loaded from {self.source} "
+              f"({len(parser.all_rooms)} rooms, generation {self.generation})")
+        for callback in self._listeners:
+            callback(parser)
+        return True
+    
+    def _build(self, hashes: Dict[str, str]):
+        """A fully indexed parser for the given edition, built off to the side"""
+        from tt_parser import TimetableParser
+        
+        if self._is_export:
+            parser = TimetableParser.from_file(self.source)
+            if self.parser is not None:
+                parser.room_config = self.parser.room_config
+                parser.calendar_config = self.parser.calendar_config
+        else:
+            # The parse methods report errors instead of raising; the
+            # errors counter tells a failed parse from an empty one
+            metrics = RecordingMetrics()
+            if self.parser is None:
+                parser = TimetableParser(metrics=metrics)
+                if os.path.isdir(self.source):
+                    parser.parse_pdfs(list(hashes), workers=self.workers,
+                                      cache=self.cache, fast=self.fast)
+                else:
+                    parser.parse_pdf(self.source, workers=self.workers,
+                                     cache=self.cache, fast=self.fast)
+            else:
+                parser = self.parser.copy(metrics=metrics)
+                for path in hashes:
+                    if self._hashes.get(path) != hashes[path]:
+                        parser.update_pdf(path, workers=self.workers,
+                                          cache=self.cache, fast=self.fast)
+                for path in self._hashes:
+                    if path not in hashes:
+                        parser.remove_pdf(path)
+            if metrics.counters.get("errors"):
+                raise ValueError("could not parse the timetable PDF(s)")
+        
+        if self.calendar_path:
+            parser.load_calendar(self.calendar_path)
+        
+        # Build the lazy indexes here, not in the first query after the swap
+        parser.index
+        parser.records
+        parser.calendar
+        parser.vacancy_matrix_json()
+        return parser
+    
+    def request_check(self):
+        """Ask the background thread to check for changes now"""
+        self._wake.set()
+    
+    def _poll(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.check()
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"[ERROR] Checking {self.source} failed: {e}")
+    
+    def start(self):
+        """Start polling in a daemon thread"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._poll, name="tt-reload", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop polling; a reload in progress is finished first"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
@@ -0,0 +1,185 @@
+"""
+Spatial model of rooms for "nearest vacant room" queries.
+Room codes carry their location: S-606 is block S, floor 6, room 606;
+OT-801 is block OT, floor 8; a plain 604 is floor 6 of the main block ("");
+RG-1 has no floor digit. A JSON config can correct any room and place
+blocks on a grid:
+
+    {
+        "block_cost": 5,
+        "blocks": {"S": {"x": 0, "y": 0}, "OT": {"x": 2, "y": 1}},
+        "rooms": {"RG-1": {"block": "RG", "floor": 0}}
+    }
+
+Distances count floors; changing block costs block_cost floors per unit
+of grid distance (1 unit for blocks without coordinates), and the position
+along the corridor (the room number without its floor digits, 06 for
+S-606) breaks ties within a floor. Rooms are grouped into per-(block,
+floor) buckets held as bitmasks over an OccupancyIndex's room IDs. A query
+ANDs the vacant mask with buckets in order of distance and stops once the
+nearer buckets have filled the result, so only the rooms it returns are
+ever sorted.
+"""
+
+import re
+import json
+import math
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+# Cost of moving one unit between blocks, in floors
+DEFAULT_BLOCK_COST = 5.0
+# Floor distance when only one of two rooms has a known floor
+UNKNOWN_FLOOR_DISTANCE = 1.0
+# Cost per unit of corridor position difference, so rooms on the same floor
+# rank by how far along the corridor they are
+NUMBER_WEIGHT = 0.01
+
+_ROOM_CODE_RE = re.compile(r'^(?:(?P<block>[A-Z]+)-)?(?P<number>\d+)')
+
+# (block, floor) bucket key
+Bucket = Tuple[str, Optional[int]]
+
+
+class RoomInfo(NamedTuple):
+    """Where a room is: block ("" for the main block), floor and room number"""
+    code: str
+    block: str
+    floor: Optional[int]
+    number: Optional[int]
+
+
+def parse_room(code: str) -> RoomInfo:
+    """Read block, floor and number from a room code like S-606, OT-801, 604 or RG-1"""
+    match = _ROOM_CODE_RE.match(code)
+    if not match:
+        return RoomInfo(code, "", None, None)
+    digits = match.group("number")
+    number = int(digits)
+    # Three or more digits: the leading digit(s) are the floor
+    floor = number // 100 if len(digits) >= 3 else None
+    return RoomInfo(code, match.group("block") or "", floor, number)
+
+
+class RoomModel:
+    """
+    Room locations plus distance-ordered bucket masks.
+    
+    Args:
+        rooms: Room table in room ID order (OccupancyIndex.rooms)
+        config: Parsed room config (see module docstring), or None
+    """
+    
+    def __init__(self, rooms: List[str], config: Optional[Dict] = None):
+        config = config or {}
+        self.block_cost = float(config.get("block_cost", DEFAULT_BLOCK_COST))
+        self.block_positions: Dict[str, Tuple[float, float]] = {
+            block: (float(position.get("x", 0)), float(position.get("y", 0)))
+            for block, position in config.get("blocks", {}).items()
+        }
+        self.overrides: Dict[str, Dict] = config.get("rooms", {})
+        
+        self.rooms = list(rooms)
+        self.info: Dict[str, RoomInfo] = {room: self._parse(room) for room in self.rooms}
+        self.buckets: Dict[Bucket, int] = {}
+        for room_id, room in enumerate(self.rooms):
+            info = self.info[room]
+            key = (info.block, info.floor)
+            self.buckets[key] = self.buckets.get(key, 0) | 1 << room_id
+        # Bucket visiting order per origin bucket, built on first use
+        self._orders: Dict[Bucket, List[Tuple[float, Bucket, int]]] = {}
+    
+    @classmethod
+    def from_config_file(cls, rooms: List[str], config_path: str) -> "RoomModel":
+        with open(config_path, "r", encoding="utf-8") as f:
+            return cls(rooms, json.load(f))
+    
+    def _parse(self, room: str) -> RoomInfo:
+        info = parse_room(room)
+        override = self.overrides.get(room)
+        if override:
+            info = info._replace(**{field: override[field] for field in ("block", "floor", "number")
+                                    if field in override})
+        return info
+    
+    def locate(self, room: str) -> RoomInfo:
+        """Location of any room code, with config overrides applied"""
+        info = self.info.get(room)
+        return info if info is not None else self._parse(room)
+    
+    def block_distance(self, a: str, b: str) -> float:
+        """Grid distance between two blocks (1 if either has no position)"""
+        if a == b:
+            return 0.0
+        if a in self.block_positions and b in self.block_positions:
+            (ax, ay), (bx, by) = self.block_positions[a], self.block_positions[b]
+            return math.hypot(ax - bx, ay - by)
+        return 1.0
+    
+    def _bucket_distance(self, a: Bucket, b: Bucket) -> float:
+        """Distance between two (block, floor) buckets, ignoring room numbers"""
+        (block_a, floor_a), (block_b, floor_b) = a, b
+        if floor_a is not None and floor_b is not None:
+            floors = abs(floor_a - floor_b)
+        elif floor_a is None and floor_b is None:
+            floors = 0.0
+        else:
+            floors = UNKNOWN_FLOOR_DISTANCE
+        return self.block_distance(block_a, block_b) * self.block_cost + floors
+    
+    @staticmethod
+    def corridor_position(info: RoomInfo) -> Optional[int]:
+        """Position of a room along its floor: 606 -> 6; the whole number if there is no floor"""
+        if info.number is None or info.floor is None:
+            return info.number
+        # The floor is already counted by the bucket distance
+        return info.number % 100
+    
+    def distance(self, a: RoomInfo, b: RoomInfo) -> float:
+        """Distance between two rooms"""
+        distance = self._bucket_distance((a.block, a.floor), (b.block, b.floor))
+        position_a, position_b = self.corridor_position(a), self.corridor_position(b)
+        if position_a is not None and position_b is not None:
+            distance += abs(position_a - position_b) * NUMBER_WEIGHT
+        return distance
+    
+    def _bucket_order(self, origin: Bucket) -> List[Tuple[float, Bucket, int]]:
+        """(distance, bucket, mask) of every bucket, nearest first"""
+        order = self._orders.get(origin)
+        if order is None:
+            order = sorted(
+                ((self._bucket_distance(origin, key), key, mask) for key, mask in self.buckets.items()),
+                key=lambda item: (item[0], item[1][0], -1 if item[1][1] is None else item[1][1]),
+            )
+            self._orders[origin] = order
+        return order
+    
+    def nearest(self, vacant_mask: int, origin: RoomInfo,
+                limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Rooms of vacant_mask ranked by distance from origin, nearest first.
+        
+        Returns:
+            [(room, distance), ...], at most limit entries
+        """
+        if limit == 0:
+            return []
+        rooms = self.rooms
+        found: List[Tuple[float, str]] = []
+        for bucket_distance, _, mask in self._bucket_order((origin.block, origin.floor)):
+            # Room numbers only add distance, so once enough rooms are found,
+            # no later bucket can beat them
+            if limit and len(found) >= limit and bucket_distance > found[limit - 1][0]:
+                break
+            mask &= vacant_mask
+            if not mask:
+                continue
+            while mask:
+                low = mask & -mask
+                room = rooms[low.bit_length() - 1]
+                found.append((self.distance(origin, self.info[room]), room))
+                mask ^= low
+            found.sort()
+        if limit is not None:
+            found = found[:limit]
+        return [(room, round(distance, 4)) for distance, room in found]
@@ -0,0 +1,355 @@
+"""
+HTTP/JSON query service for room vacancy
+Loads a timetable once (JSON export, snapshot, PDF or folder of PDFs) and
+answers queries from the in-memory index on an asyncio event loop. Loading
+runs in a worker thread, so the server accepts connections right away and
+answers 503 until the timetable is ready. The timetable file is then
+polled for changes (see tt_reload); a new edition is parsed in the
+background and swapped in without interrupting queries.
+
+Endpoints (GET):
+    /health                          {"status": "ok" | "loading", ...}
+    /rooms                           every known room
+    /vacant?day=Mo&slot=3            vacant rooms in one slot
+    /vacant?date=2026-10-20&slot=3   ... on a date (holidays and other exceptions applied)
+    /vacant/now[?at=2025-01-06T11:30]  vacant rooms right now
+    /vacant/batch?cells=Mo-3,Mo-4    vacant rooms for many cells at once
+    /vacant/nearest?day=Mo&slot=3&near=S-606[&limit=10]
+                                     vacant rooms nearest first (or &block=S&floor=6)
+    /vacancy-matrix                  the whole week in one payload
+    /rooms/<room>/schedule           {day: {slot: [{section, subject}]}}
+    /sections/free?sections=23BCS_F,23BCS_K[&min_length=2]
+                                     slots and windows in which all sections are free
+
+Usage: python tt_server.py [timetable_path] [port] [host] [reload_interval]
+                            [--calendar calendar.json]
+       (reload_interval in seconds, 0 disables reloading; the calendar of
+       holidays and other exceptions is applied to every reloaded edition)
+"""
+
+import json
+import asyncio
+import argparse
+from datetime import date, datetime
+from typing import Dict, Optional, Tuple, Union
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from tt_parser import TimetableParser, TIME_SLOTS, NO_SECTION_DATA
+from tt_cache import ParseCache
+from tt_reload import DEFAULT_POLL_INTERVAL, ReloadManager
+
+
+DEFAULT_SOURCE = "timetable_data.json"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Request line plus headers; larger requests are rejected
+MAX_HEADER_BYTES = 16 * 1024
+
+_REASONS = {
+    200: "OK", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 431: "Request Header Fields Too Large",
+    500: "Internal Server Error", 503: "Service Unavailable",
+}
+
+
+class HTTPError(Exception):
+    """Error turned into a JSON error response"""
+    
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# A response body: a JSON-able dict, or an already serialized JSON string
+Payload = Union[Dict, str, None]
+
+
+def _slot_info(day: str, slot_number: int) -> Dict:
+    slot = TIME_SLOTS[slot_number]
+    return {"day": day, "slot": slot_number,
+            "start_time": slot.start_time, "end_time": slot.end_time}
+
+
+class TimetableService:
+    """Routes query requests to a loaded TimetableParser"""
+    
+    def __init__(self, source: str, cache: Optional[ParseCache] = None,
+                 reload_interval: float = DEFAULT_POLL_INTERVAL,
+                 calendar_path: Optional[str] = None):
+        self.source = source
+        self.cache = cache
+        self.reload_interval = reload_interval
+        # Owns the live parser and swaps in new editions of the timetable
+        self.reloader = ReloadManager(source, cache=cache, interval=reload_interval,
+                                      calendar_path=calendar_path)
+        self.load_error: Optional[str] = None
+    
+    @property
+    def parser(self) -> Optional[TimetableParser]:
+        return self.reloader.parser
+    
+    async def load(self):
+        """Load the timetable in a worker thread, then watch it for changes"""
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self.reloader.load)
+            print(f"[OK] Serving {len(self.parser.all_rooms)} rooms from {self.source}")
+        except Exception as e:
+            self.load_error = str(e)
+            print(f"[ERROR] Failed to load {self.source}: {e}")
+        # Polling also picks up a timetable that failed to load once fixed
+        if self.reload_interval > 0:
+            self.reloader.start()
+    
+    def _require_parser(self) -> TimetableParser:
+        # One read per request: a reload may swap the parser at any time
+        parser = self.parser
+        if parser is None:
+            if self.load_error:
+                raise HTTPError(503, f"Timetable failed to load: {self.load_error}")
+            raise HTTPError(503, "Timetable is still loading")
+        return parser
+    
+    def handle(self, path: str, params: Dict[str, str]) -> Payload:
+        """Answer one GET request; raises HTTPError for bad requests"""
+        if path == "/health":
+            parser = self.parser
+            if parser is None:
+                return {"status": "error" if self.load_error else "loading"}
+            return {"status": "ok", "rooms": len(parser.all_rooms),
+                    "generation": self.reloader.generation,
+                    "reload_error": self.reloader.last_error}
+        
+        parser = self._require_parser()
+        
+        if path == "/rooms":
+            return {"rooms": sorted(parser.all_rooms)}
+        
+        if path == "/vacant" and "date" in params:
+            slot = params.get("slot", "")
+            try:
+                on = date.fromisoformat(params["date"])
+            except ValueError:
+                raise HTTPError(400, "Invalid 'date', expected YYYY-MM-DD")
+            if not slot.isdigit():
+                raise HTTPError(400, "Expected ?date=<YYYY-MM-DD>&slot=<1-8>")
+            try:
+                vacant = parser.find_vacant_rooms_on(on, int(slot))
+            except ValueError as e:
+                raise HTTPError(400, str(e))
+            return {"date": on.isoformat(), "day": parser.calendar.grid_day(on),
+                    "slot": int(slot), "vacant_rooms": vacant,
+                    "total_rooms": len(parser.all_rooms)}
+        
+        if path == "/vacant":
+            day, slot = params.get("day"), params.get("slot", "")
+            if not day or not slot.isdigit():
+                raise HTTPError(400, "Expected ?day=<Mo..Fr>&slot=<1-8>")
+            slot_number = int(slot)
+            try:
+                vacant = parser.find_vacant_rooms(day, slot_number)
+            except ValueError as e:
+                raise HTTPError(400, str(e))
+            return dict(_slot_info(day, slot_number), vacant_rooms=vacant,
+                        total_rooms=len(parser.all_rooms))
+        
+        if path == "/vacant/batch":
+            try:
+                cells = [(day, int(slot)) for day, _, slot in
+                         (cell.partition("-") for cell in params.get("cells", "").split(",") if cell)]
+                vacant = parser.find_vacant_rooms_batch(cells)
+            except ValueError as e:
+                raise HTTPError(400, f"Expected ?cells=Mo-3,Tu-4,... ({e})")
+            return {"vacant": {day: {str(slot): rooms for slot, rooms in slots.items()}
+                               for day, slots in vacant.items()}}
+        
+        if path == "/vacant/nearest":
+            day, slot = params.get("day"), params.get("slot", "")
+            limit, floor = params.get("limit", "10"), params.get("floor")
+            if not day or not slot.isdigit() or not limit.isdigit() or \
+                    (floor is not None and not floor.lstrip("-").isdigit()):
+                raise HTTPError(400, "Expected ?day=<Mo..Fr>&slot=<1-8>&near=<room> "
+                                     "(or &block=<block>&floor=<n>)[&limit=<n>]")
+            try:
+                ranked = parser.find_nearest_vacant_rooms(
+                    day, int(slot), near=params.get("near"), block=params.get("block"),
+                    floor=int(floor) if floor is not None else None, limit=int(limit))
+            except ValueError as e:
+                raise HTTPError(400, str(e))
+            return dict(_slot_info(day, int(slot)),
+                        rooms=[{"room": room, "distance": distance} for room, distance in ranked])
+        
+        if path == "/vacancy-matrix":
+            # Serialized once per parse and sent as-is
+            return parser.vacancy_matrix_json()
+        
+        if path == "/vacant/now":
+            try:
+                now = datetime.fromisoformat(params["at"]) if "at" in params else datetime.now()
+            except ValueError:
+                raise HTTPError(400, "Invalid 'at' timestamp, expected ISO 8601")
+            # The same calendar-aware target the rooms are looked up for
+            target = parser.get_vacancy_slot(now)
+            if target is None:
+                result = {"day": None, "slot": None}
+                vacant = sorted(parser.all_rooms)
+            else:
+                result = _slot_info(*target)
+                vacant = parser.calendar.vacant_rooms(now.date(), target[1])
+            return dict(result, date=now.date().isoformat(), vacant_rooms=vacant,
+                        total_rooms=len(parser.all_rooms))
+        
+        if path == "/sections/free":
+            sections = [section for section in params.get("sections", "").split(",") if section]
+            min_length = params.get("min_length", "1")
+            if not sections or not min_length.isdigit():
+                raise HTTPError(400, "Expected ?sections=<section>,<section>,...[&min_length=<n>]")
+            if not parser.section_masks:
+                raise HTTPError(503, NO_SECTION_DATA)
+            try:
+                free_slots = parser.find_common_free_slots(sections)
+                windows = parser.find_common_free_windows(sections, int(min_length))
+            except ValueError as e:
+                raise HTTPError(404, str(e))
+            return {
+                "sections": sections,
+                "free_slots": free_slots,
+                "windows": [{"day": day, "start_slot": start, "end_slot": end}
+                            for day, start, end in windows],
+            }
+        
+        parts = path.strip("/").split("/")
+        if len(parts) == 3 and parts[0] == "rooms" and parts[2] == "schedule":
+            room = unquote(parts[1])
+            if room not in parser.all_rooms:
+                raise HTTPError(404, f"Room '{room}' not found")
+            schedule = {
+                day: {
+                    str(slot): [{"section": section, "subject": subject}
+                                for section, subject in entries]
+                    for slot, entries in slots.items()
+                }
+                for day, slots in parser.get_room_schedule(room).items()
+            }
+            return {"room": room, "schedule": schedule}
+        
+        raise HTTPError(404, f"Unknown endpoint: {path}")
+    
+    def respond(self, method: str, target: str) -> Tuple[int, Payload]:
+        """(status, JSON payload) for a request line"""
+        if method == "OPTIONS":
+            return 204, None
+        if method not in ("GET", "HEAD"):
+            return 405, {"error": f"Method {method} not allowed"}
+        
+        url = urlsplit(target)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            return 200, self.handle(url.path.rstrip("/") or "/", params)
+        except HTTPError as e:
+            return e.status, {"error": str(e)}
+        except Exception as e:
+            return 500, {"error": str(e)}
+    
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve HTTP/1.1 requests on one connection, with keep-alive"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    break
+                except asyncio.LimitOverrunError:
+                    self._write(writer, 431, {"error": "Request headers too large"}, False)
+                    break
+                
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ")
+                except ValueError:
+                    self._write(writer, 400, {"error": "Malformed request line"}, False)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip().lower()
+                
+                # Request bodies are not used by any endpoint; skip them
+                length = headers.get("content-length", "0")
+                if not length.isdigit():
+                    self._write(writer, 400, {"error": "Invalid Content-Length"}, False)
+                    break
+                if int(length):
+                    await reader.readexactly(int(length))
+                
+                connection = headers.get("connection", "")
+                keep_alive = (connection == "keep-alive" if version == "HTTP/1.0"
+                              else connection != "close")
+                
+                status, payload = self.respond(method, target)
+                self._write(writer, status, payload, keep_alive, method == "HEAD")
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    
+    @staticmethod
+    def _write(writer: asyncio.StreamWriter, status: int, payload: Payload,
+               keep_alive: bool, head_only: bool = False):
+        if payload is None:
+            body = b""
+        elif isinstance(payload, str):
+            body = payload.encode("utf-8")
+        else:
+            body = json.dumps(payload).encode("utf-8")
+        headers = [
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            # The Next.js app calls the service from the browser
+            "Access-Control-Allow-Origin: *",
+            "Access-Control-Allow-Methods: GET, OPTIONS",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1"))
+        if not head_only:
+            writer.write(body)
+    
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        """Start listening, load the timetable, and serve until cancelled"""
+        server = await asyncio.start_server(self.handle_connection, host, port,
+                                            limit=MAX_HEADER_BYTES)
+        print(f"[INFO] Listening on http://{host}:{port}")
+        async with server:
+            await self.load()
+            try:
+                await server.serve_forever()
+            finally:
+                self.reloader.stop()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="HTTP/JSON room vacancy service")
+    arg_parser.add_argument("source", nargs="?", default=DEFAULT_SOURCE,
+                            help="JSON export, snapshot, PDF or folder of PDFs")
+    arg_parser.add_argument("port", nargs="?", type=int, default=DEFAULT_PORT)
+    arg_parser.add_argument("host", nargs="?", default=DEFAULT_HOST)
+    arg_parser.add_argument("interval", nargs="?", type=float, default=DEFAULT_POLL_INTERVAL,
+                            help="seconds between reload checks, 0 disables reloading")
+    arg_parser.add_argument("--calendar", help="holiday/exception calendar (see tt_calendar)")
+    args = arg_parser.parse_args()
+    
+    service = TimetableService(args.source, cache=ParseCache(), reload_interval=args.interval,
+                               calendar_path=args.calendar)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n[INFO] Server stopped")
+
+
+if __name__ == "__main__":
+    main()
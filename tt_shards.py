@@ -0,0 +1,186 @@
+"""
+Sharded timetable export for incremental sync.
+Instead of one monolithic timetable_data.json, the export is split into
+small JSON documents:
+
+    slots/<day>-<slot>.json   occupied and vacant rooms of one (day, slot)
+    rooms/<room>.json         one room's week: occupied slots and who is there
+    manifest.json             {"shards": {path: hash, ...}}, written last
+
+Every shard carries the SHA-256 of its canonical JSON content. A sync run
+compares the new hashes with the previous manifest and only writes the
+shards that changed (and deletes shards that no longer exist), so a new
+edition that moves a few classes touches a few files. Writers are
+pluggable: LocalShardWriter mirrors the shards into a directory; a backend
+uploader only has to implement the same read/write/delete methods.
+Usage: python tt_shards.py timetable_path output_dir
+"""
+
+import os
+import sys
+import json
+import hashlib
+from dataclasses import asdict
+from typing import Dict, List, NamedTuple, Optional
+from urllib.parse import quote
+
+
+MANIFEST_PATH = "manifest.json"
+SHARD_FORMAT_VERSION = 1
+
+
+def _canonical(content: Dict) -> bytes:
+    return json.dumps(content, sort_keys=True, separators=(',', ':'),
+                      ensure_ascii=False).encode('utf-8')
+
+
+def content_hash(content: Dict) -> str:
+    """SHA-256 of a document's canonical JSON (sorted keys, no whitespace)"""
+    return hashlib.sha256(_canonical(content)).hexdigest()
+
+
+def _with_hash(content: Dict) -> Dict:
+    return dict(content, hash=content_hash(content))
+
+
+def room_shard_path(room: str) -> str:
+    """Shard path of a room; names like "201(Apple lab)" are percent-encoded"""
+    return f"rooms/{quote(room, safe='')}.json"
+
+
+def build_shards(parser) -> Dict[str, Dict]:
+    """Every shard document of a parsed timetable, by shard path"""
+    from tt_parser import DAYS, TIME_SLOTS
+    
+    index = parser.index
+    matrix = parser.vacancy_matrix
+    shards: Dict[str, Dict] = {}
+    
+    for day in DAYS:
+        for slot_number, slot in TIME_SLOTS.items():
+            shards[f"slots/{day}-{slot_number}.json"] = _with_hash({
+                "day": day,
+                "slot": slot_number,
+                "start_time": slot.start_time,
+                "end_time": slot.end_time,
+                "occupied": index.rooms_from_mask(index.occupied_mask(day, slot_number)),
+                "vacant": matrix[day][slot_number],
+            })
+    
+    for room in index.rooms:
+        room_mask = index.room_mask(room)
+        occupied = {
+            day: [slot for slot in TIME_SLOTS if room_mask >> index.cell_id(day, slot) & 1]
+            for day in DAYS
+        }
+        schedule = {
+            day: {str(slot): [{"section": section, "subject": subject}
+                              for section, subject in entries]
+                  for slot, entries in slots.items()}
+            for day, slots in parser.get_room_schedule(room).items()
+        }
+        shards[room_shard_path(room)] = _with_hash({
+            "room": room,
+            "occupied": {day: slots for day, slots in occupied.items() if slots},
+            "schedule": schedule,
+        })
+    
+    return shards
+
+
+def build_manifest(shards: Dict[str, Dict]) -> Dict:
+    """Manifest listing the hash of every shard"""
+    from tt_parser import DAYS, TIME_SLOTS
+    
+    return {
+        "version": SHARD_FORMAT_VERSION,
+        "days": DAYS,
+        "time_slots": {str(num): asdict(slot) for num, slot in TIME_SLOTS.items()},
+        "shards": {path: shard["hash"] for path, shard in sorted(shards.items())},
+    }
+
+
+class LocalShardWriter:
+    """Shard storage in a local directory (no backend needed)"""
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+    
+    def _path(self, path: str) -> str:
+        return os.path.join(self.directory, *path.split("/"))
+    
+    def read(self, path: str) -> Optional[bytes]:
+        try:
+            with open(self._path(path), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+    
+    def write(self, path: str, data: bytes):
+        """Write a file atomically, so readers never see half a shard"""
+        full_path = self._path(path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        tmp_path = f"{full_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, full_path)
+    
+    def delete(self, path: str):
+        try:
+            os.remove(self._path(path))
+        except FileNotFoundError:
+            pass
+
+
+class SyncResult(NamedTuple):
+    """Shard paths touched by a sync run"""
+    written: List[str]
+    deleted: List[str]
+    unchanged: int
+
+
+def sync_shards(parser, writer) -> SyncResult:
+    """
+    Bring the shards held by writer up to date with the parser.
+    Only shards whose hash differs from the previous manifest are written;
+    the new manifest goes last, so it never lists a shard that is missing.
+    """
+    shards = build_shards(parser)
+    manifest = build_manifest(shards)
+    
+    previous: Dict[str, str] = {}
+    data = writer.read(MANIFEST_PATH)
+    if data is not None:
+        try:
+            old_manifest = json.loads(data)
+            if old_manifest.get("version") == SHARD_FORMAT_VERSION:
+                previous = old_manifest["shards"]
+        except (ValueError, KeyError):
+            pass
+    
+    written = [path for path, shard_hash in manifest["shards"].items()
+               if previous.get(path) != shard_hash]
+    for path in written:
+        writer.write(path, _canonical(shards[path]))
+    deleted = sorted(set(previous) - set(shards))
+    for path in deleted:
+        writer.delete(path)
+    
+    writer.write(MANIFEST_PATH, json.dumps(manifest, indent=2, ensure_ascii=False).encode('utf-8'))
+    return SyncResult(written, deleted, len(shards) - len(written))
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: python tt_shards.py timetable_path output_dir")
+        return 1
+    
+    from tt_parser import TimetableParser
+    
+    parser = TimetableParser.from_file(sys.argv[1])
+    parser.export_shards(sys.argv[2])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
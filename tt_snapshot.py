@@ -0,0 +1,201 @@
+"""
+Compact binary snapshot of parsed timetable occupancy.
+A snapshot holds an interned room table and packed occupancy bit matrices.
+The loader memory-maps the file, and queries read straight from the mapped
+buffer: nothing is decoded up front, and room names are only decoded for
+rooms that appear in a result.
+
+Layout (little-endian):
+    header          see _HEADER
+    day codes       n_days * 2 bytes ASCII ("Mo", "Tu", ...)
+    slot numbers    n_slots * 1 byte
+    room offsets    (n_rooms + 1) * uint32, offsets into the name blob
+    room names      UTF-8 blob of the sorted room names
+    cell matrix     n_cells rows of ceil(n_rooms / 8) bytes, bit r = room r busy
+    room matrix     n_rooms rows of ceil(n_cells / 8) bytes, bit c = busy in cell c
+"""
+
+import mmap
+import struct
+from typing import List, Optional
+
+from tt_occupancy import OccupancyIndex
+
+
+SNAPSHOT_MAGIC = b"TTSNAP\x00\x00"
+SNAPSHOT_VERSION = 1
+
+# magic, version, n_days, n_slots, n_rooms, offsets of: room offsets,
+# room names, cell matrix, room matrix
+_HEADER = struct.Struct("<8sHBBIIIII")
+
+
+def _row_bytes(bits: int) -> int:
+    return (bits + 7) // 8
+
+
+def write_snapshot(index: OccupancyIndex, output_path: str):
+    """Write an occupancy index to a binary snapshot file"""
+    n_rooms = len(index.rooms)
+    n_cells = len(index.cell_masks)
+    
+    names = [room.encode('utf-8') for room in index.rooms]
+    offsets = [0]
+    for name in names:
+        offsets.append(offsets[-1] + len(name))
+    
+    days = b"".join(day.encode('ascii') for day in index.days)
+    slots = bytes(index.slots)
+    room_offsets_at = _HEADER.size + len(days) + len(slots)
+    names_at = room_offsets_at + 4 * (n_rooms + 1)
+    cells_at = names_at + offsets[-1]
+    rooms_at = cells_at + n_cells * _row_bytes(n_rooms)
+    
+    header = _HEADER.pack(
+        SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(index.days), len(index.slots),
+        n_rooms, room_offsets_at, names_at, cells_at, rooms_at,
+    )
+    
+    with open(output_path, 'wb') as f:
+        f.write(header)
+        f.write(days)
+        f.write(slots)
+        f.write(struct.pack(f"<{n_rooms + 1}I", *offsets))
+        f.write(b"".join(names))
+        for mask in index.cell_masks:
+            f.write(mask.to_bytes(_row_bytes(n_rooms), 'little'))
+        for mask in index.room_masks:
+            f.write(mask.to_bytes(_row_bytes(n_cells), 'little'))
+
+
+class Snapshot:
+    """Memory-mapped, read-only view of a snapshot file"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Empty snapshot file: {path}")
+        if len(self._buf) < _HEADER.size:
+            self.close()
+            raise ValueError(f"Not a timetable snapshot (too short): {path}")
+        
+        (magic, version, n_days, n_slots, self.n_rooms, self._offsets_at,
+         self._names_at, self._cells_at, self._rooms_at) = _HEADER.unpack_from(self._buf, 0)
+        if magic != SNAPSHOT_MAGIC:
+            self.close()
+            raise ValueError(f"Not a timetable snapshot: {path}")
+        if version != SNAPSHOT_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported snapshot version {version} (expected {SNAPSHOT_VERSION})")
+        
+        pos = _HEADER.size
+        days = self._buf[pos:pos + 2 * n_days].decode('ascii')
+        self.days = [days[i:i + 2] for i in range(0, len(days), 2)]
+        self.slots = list(self._buf[pos + 2 * n_days:pos + 2 * n_days + n_slots])
+        
+        self._cell_ids = {
+            (day, slot): d * n_slots + s
+            for d, day in enumerate(self.days)
+            for s, slot in enumerate(self.slots)
+        }
+        self._cell_row = _row_bytes(self.n_rooms)
+        self._room_row = _row_bytes(len(self._cell_ids))
+        self.all_rooms_mask = (1 << self.n_rooms) - 1
+        if len(self._buf) < self._rooms_at + self.n_rooms * self._room_row:
+            self.close()
+            raise ValueError(f"Truncated snapshot file: {path}")
+    
+    def close(self):
+        self._buf.close()
+        self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def room_name(self, room_id: int) -> str:
+        """Decode one room name from the interned room table"""
+        start, end = struct.unpack_from("<II", self._buf, self._offsets_at + 4 * room_id)
+        return self._buf[self._names_at + start:self._names_at + end].decode('utf-8')
+    
+    def room_id(self, room: str) -> Optional[int]:
+        """Binary search the sorted room table; None if the room is unknown"""
+        lo, hi = 0, self.n_rooms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            name = self.room_name(mid)
+            if name < room:
+                lo = mid + 1
+            elif name > room:
+                hi = mid
+            else:
+                return mid
+        return None
+    
+    @property
+    def rooms(self) -> List[str]:
+        """Every room in the snapshot (sorted)"""
+        return [self.room_name(i) for i in range(self.n_rooms)]
+    
+    def cell_id(self, day: str, slot: int) -> int:
+        """Position of a (day, slot) cell in the week"""
+        return self._cell_ids[(day, slot)]
+    
+    def occupied_mask(self, day: str, slot: int) -> int:
+        """Bitmask of rooms occupied in a (day, slot) cell"""
+        start = self._cells_at + self._cell_ids[(day, slot)] * self._cell_row
+        return int.from_bytes(self._buf[start:start + self._cell_row], 'little')
+    
+    def vacant_mask(self, day: str, slot: int) -> int:
+        """Bitmask of rooms vacant in a (day, slot) cell"""
+        return self.all_rooms_mask & ~self.occupied_mask(day, slot)
+    
+    def rooms_from_mask(self, mask: int) -> List[str]:
+        """Decode a room bitmask into a sorted list of room numbers"""
+        bits = bin(mask)[:1:-1]
+        result = []
+        pos = bits.find('1')
+        while pos != -1:
+            result.append(self.room_name(pos))
+            pos = bits.find('1', pos + 1)
+        return result
+    
+    def vacant_rooms(self, day: str, slot: int) -> List[str]:
+        """Sorted list of rooms vacant in a (day, slot) cell"""
+        return self.rooms_from_mask(self.vacant_mask(day, slot))
+    
+    def room_mask(self, room: str) -> int:
+        """Bitmask of the cells in which a room is occupied"""
+        room_id = self.room_id(room)
+        if room_id is None:
+            raise KeyError(room)
+        start = self._rooms_at + room_id * self._room_row
+        return int.from_bytes(self._buf[start:start + self._room_row], 'little')
+    
+    def is_occupied(self, room: str, day: str, slot: int) -> bool:
+        """Whether a room is occupied in a (day, slot) cell"""
+        room_id = self.room_id(room)
+        if room_id is None:
+            return False
+        # Read just the byte holding this room's bit
+        start = self._cells_at + self._cell_ids[(day, slot)] * self._cell_row
+        return bool(self._buf[start + room_id // 8] >> (room_id % 8) & 1)
+    
+    def to_index(self) -> OccupancyIndex:
+        """Materialize the snapshot as an in-memory OccupancyIndex"""
+        index = OccupancyIndex(self.days, self.slots, self.rooms)
+        for cell_id in range(len(self._cell_ids)):
+            start = self._cells_at + cell_id * self._cell_row
+            index.cell_masks[cell_id] = int.from_bytes(
+                self._buf[start:start + self._cell_row], 'little')
+        for room_id in range(self.n_rooms):
+            start = self._rooms_at + room_id * self._room_row
+            index.room_masks[room_id] = int.from_bytes(
+                self._buf[start:start + self._room_row], 'little')
+        return index
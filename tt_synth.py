@@ -0,0 +1,186 @@
+"""
+Synthetic timetable PDF generator for benchmarks
+Writes PDFs in the layout of the bundled roomwise timetables: one landscape
+page per timetable with a ruled 6 x 9 table (slot header row, Mo-Fr rows),
+and cells holding "<subject> <teacher><employee id>", the section and the
+room. Output is deterministic for a given seed, so benchmark runs at 10x or
+100x the size of the real PDF stay comparable.
+
+The PDF is written by hand (Helvetica, ruled lines, Flate-compressed content
+streams), so no PDF library is needed to generate it.
+Usage: python tt_synth.py output.pdf [--scale 10] [--pages N] [--seed 0]
+"""
+
+import sys
+import zlib
+import random
+import argparse
+from typing import List, Optional
+
+from tt_parser import TIME_SLOTS, DAYS
+
+
+# Page count of "B3 3rd year roomwise_5th Jan.pdf"; --scale multiplies it
+REFERENCE_PAGES = 76
+
+PAGE_WIDTH = 841.92
+PAGE_HEIGHT = 595.32
+
+# Table geometry in top-down coordinates, close to the real PDF
+TABLE_LEFT = 20.0
+TABLE_TOP = 119.0
+DAY_COLUMN_WIDTH = 40.0
+SLOT_COLUMN_WIDTH = 95.0
+HEADER_ROW_HEIGHT = 50.0
+DAY_ROW_HEIGHT = 85.0
+
+CELL_FONT_SIZE = 6.5
+LINE_HEIGHT = 9.0
+
+SUBJECTS = ["CC-LAB", "TOC", "NDM", "SD", "APT", "AI", "EA", "EI", "ET", "CLOUD",
+            "FS", "NM", "IOT-LAB", "SS", "DAA", "OS", "CN", "DBMS", "SE", "ML"]
+TEACHERS = ["Er. Kaur", "Er. Singh", "Dr. Sharma", "Ms Chugh", "Er. Dhiman",
+            "Dr. Rattan", "Er. Mupnesh", "Mr. Bishnoi", "Er. Samal", "Dr. Behki"]
+DEPARTMENTS = ["BCS", "BIT", "BAI", "BDS", "BCE", "BME"]
+# Room formats the parser recognizes: S-606, PP-802, RG-1, 104
+SINGLE_LETTER_BLOCKS = ["S", "L", "M", "N", "B", "C"]
+MULTI_LETTER_BLOCKS = ["PP", "OT", "SS", "LT"]
+ROOMS_PER_FLOOR = 30
+
+
+def _room_pool(size: int, rng: random.Random) -> List[str]:
+    """Distinct room numbers across blocks and floors (up to a few thousand)"""
+    numbers = [f"{floor}{room:02d}" for floor in range(1, 10)
+               for room in range(1, ROOMS_PER_FLOOR + 1)]
+    candidates = [f"{block}-{number}"
+                  for block in SINGLE_LETTER_BLOCKS + MULTI_LETTER_BLOCKS
+                  for number in numbers]
+    candidates += [f"RG-{i}" for i in range(1, 10)] + numbers
+    return sorted(rng.sample(candidates, min(size, len(candidates))))
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _text(x: float, top: float, size: float, text: str) -> str:
+    return f"BT /F1 {size} Tf {x:.2f} {PAGE_HEIGHT - top:.2f} Td ({_escape(text)}) Tj ET\n"
+
+
+def _page_content(identifier: str, rows: List[List[Optional[List[str]]]]) -> bytes:
+    """Content stream of one timetable page; rows[day][slot] is a cell's lines or None"""
+    columns = [TABLE_LEFT, TABLE_LEFT + DAY_COLUMN_WIDTH]
+    columns += [columns[1] + SLOT_COLUMN_WIDTH * i for i in range(1, len(TIME_SLOTS) + 1)]
+    row_tops = [TABLE_TOP, TABLE_TOP + HEADER_ROW_HEIGHT]
+    row_tops += [row_tops[1] + DAY_ROW_HEIGHT * i for i in range(1, len(DAYS) + 1)]
+    
+    out = [
+        _text(300, 40, 14, "Department of Computer Science & Engineering"),
+        _text(330, 62, 12, "CSE 3rd year Jan 2026-Jun 2026"),
+        _text(400, 95, 20, identifier),
+        "0.5 w\n",
+    ]
+    # Ruled grid, which pdfplumber's default table finder relies on
+    for x in columns:
+        out.append(f"{x:.2f} {PAGE_HEIGHT - row_tops[0]:.2f} m "
+                   f"{x:.2f} {PAGE_HEIGHT - row_tops[-1]:.2f} l S\n")
+    for top in row_tops:
+        out.append(f"{columns[0]:.2f} {PAGE_HEIGHT - top:.2f} m "
+                   f"{columns[-1]:.2f} {PAGE_HEIGHT - top:.2f} l S\n")
+    
+    for slot_num, slot in TIME_SLOTS.items():
+        x = columns[slot_num] + 4
+        out.append(_text(x, row_tops[0] + 18, 9, str(slot_num)))
+        out.append(_text(x, row_tops[0] + 32, 8, f"{slot.start_time.lstrip('0')} - {slot.end_time}"))
+    
+    for d, day in enumerate(DAYS):
+        top = row_tops[d + 1]
+        out.append(_text(columns[0] + 4, top + DAY_ROW_HEIGHT / 2, 9, day))
+        for s, lines in enumerate(rows[d]):
+            for i, line in enumerate(lines or []):
+                out.append(_text(columns[s + 1] + 3, top + 14 + i * LINE_HEIGHT,
+                                 CELL_FONT_SIZE, line))
+    return "".join(out).encode("latin-1")
+
+
+def _timetable_rows(rng: random.Random, section: str, rooms: List[str],
+                    fill_rate: float) -> List[List[Optional[List[str]]]]:
+    """Random week for one section, mostly in a few nearby rooms"""
+    home = rng.sample(rooms, min(3, len(rooms)))
+    rows = []
+    for _ in DAYS:
+        row = []
+        for _ in TIME_SLOTS:
+            if rng.random() >= fill_rate:
+                row.append(None)
+                continue
+            room = rng.choice(home) if rng.random() < 0.8 else rng.choice(rooms)
+            teacher = f"{rng.choice(TEACHERS)}E{rng.randint(1000, 19999)}"
+            row.append([f"{rng.choice(SUBJECTS)} {teacher}", section, room])
+        rows.append(row)
+    return rows
+
+
+def write_timetable_pdf(output_path: str, pages: int = REFERENCE_PAGES, seed: int = 0,
+                        fill_rate: float = 0.6):
+    """
+    Write a synthetic timetable PDF with the given number of pages.
+    The room pool grows with the page count (about one room per four
+    timetables), like a campus with more blocks.
+    """
+    rng = random.Random(seed)
+    rooms = _room_pool(max(70, pages // 4), rng)
+    sections = [f"{23 + i // 600 % 4}{DEPARTMENTS[i // 26 % len(DEPARTMENTS)]}_{chr(65 + i % 26)}"
+                for i in range(pages)]
+    
+    # Objects: 1 catalog, 2 page tree, 3 font, then (page, content) pairs
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    }
+    kids = []
+    for i in range(pages):
+        page_id, content_id = 4 + 2 * i, 5 + 2 * i
+        kids.append(f"{page_id} 0 R")
+        identifier = rooms[i % len(rooms)]
+        content = zlib.compress(_page_content(
+            identifier, _timetable_rows(rng, sections[i], rooms, fill_rate)))
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode("latin-1")
+        objects[content_id] = (f"<< /Length {len(content)} /Filter /FlateDecode >>\nstream\n"
+                               .encode("latin-1") + content + b"\nendstream")
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>".encode("latin-1")
+    
+    with open(output_path, "wb") as f:
+        f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = {}
+        for obj_id in sorted(objects):
+            offsets[obj_id] = f.tell()
+            f.write(f"{obj_id} 0 obj\n".encode("latin-1") + objects[obj_id] + b"\nendobj\n")
+        xref_at = f.tell()
+        size = max(objects) + 1
+        f.write(f"xref\n0 {size}\n0000000000 65535 f \n".encode("latin-1"))
+        for obj_id in range(1, size):
+            f.write(f"{offsets[obj_id]:010d} 00000 n \n".encode("latin-1"))
+        f.write(f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref_at}\n%%EOF\n"
+                .encode("latin-1"))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Generate a synthetic timetable PDF")
+    arg_parser.add_argument("output", help="PDF file to write")
+    arg_parser.add_argument("--scale", type=float, default=1.0,
+                            help=f"size relative to the bundled PDF ({REFERENCE_PAGES} pages)")
+    arg_parser.add_argument("--pages", type=int, help="exact page count (overrides --scale)")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args()
+    
+    pages = args.pages or max(1, round(REFERENCE_PAGES * args.scale))
+    write_timetable_pdf(args.output, pages, args.seed)
+    print(f"[OK] Wrote {pages} page(s) to {args.output}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())